@@ -7,224 +7,357 @@ Compares two cleaning modes:
 2. Strict mode: Only Chinese + basic 5 punctuation marks
 
 Goal: Identify noise patterns and quantify quality improvement.
+
+Both modes share the same metadata/URL/header/email removal, so each line
+runs that common prefix once and then branches into the mode-specific
+filters. The full corpus is analyzed in line-aligned shards across worker
+processes. More modes can be compared by adding them to CLEANING_MODES.
 """
 
+import argparse
+import os
 import re
-from collections import Counter, defaultdict
-from typing import Dict, Tuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+from corpus_sampling import HeadSampler
+from corpus_shards import DEFAULT_SHARD_BYTES, iter_shard_lines, plan_shards
+from process_raw_text import add_sampling_arguments, sampler_from_args
 
-def clean_ptt_current(text: str) -> str:
-    """Current cleaning mode (from process_raw_text.py)."""
-    # Remove PTT metadata
-    text = re.sub(r"※ .*?(\n|$)", " ", text)
-    text = re.sub(r"◆ .*?(\n|$)", " ", text)
 
-    # Remove URLs
-    text = re.sub(r"https?://\S+", " ", text)
+# Shared prefix: noise every mode removes the same way
+_NOISE_PATTERNS = [
+    re.compile(r"※ .*?(\n|$)"),      # PTT metadata
+    re.compile(r"◆ .*?(\n|$)"),
+    re.compile(r"https?://\S+"),     # URLs
+    re.compile(r"Re: \[.*?\]"),      # Reply headers
+    re.compile(r"\S+@\S+"),          # Emails
+]
 
-    # Remove reply headers
-    text = re.sub(r"Re: \[.*?\]", " ", text)
+# Current mode: keep Chinese + Bopomofo + full punctuation
+_CURRENT_DISALLOWED = re.compile(r"[^\u4e00-\u9fa5\u3100-\u312f。，！？、（）「」『』【】\s]")
+_WHITESPACE = re.compile(r"\s+")
 
-    # Remove emails
-    text = re.sub(r"\S+@\S+", " ", text)
+# 【嚴格模式】只保留漢字 + 5個基本標點
+# 移除：注音、英文、數字、其他標點
+_STRICT_DISALLOWED = re.compile(r"[^\u4e00-\u9fa5，。！？、]")
 
-    # Keep Chinese + Bopomofo + full punctuation
-    text = re.sub(r"[^\u4e00-\u9fa5\u3100-\u312f。，！？、（）「」『』【】\s]", " ", text)
-
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text)
-    text = text.strip()
 
+def strip_ptt_noise(text: str) -> str:
+    """Remove PTT metadata, URLs, reply headers and emails (shared by all modes)."""
+    for pattern in _NOISE_PATTERNS:
+        text = pattern.sub(" ", text)
     return text
 
 
-def clean_ptt_strict(text: str) -> str:
-    """Strict cleaning mode (Chinese + 5 basic punctuation only)."""
-    # Remove PTT metadata
-    text = re.sub(r"※ .*?(\n|$)", " ", text)
-    text = re.sub(r"◆ .*?(\n|$)", " ", text)
+def finish_current(text: str) -> str:
+    """Current-mode filter, applied after strip_ptt_noise()."""
+    text = _CURRENT_DISALLOWED.sub(" ", text)
+
+    # Normalize whitespace
+    return _WHITESPACE.sub(" ", text).strip()
 
-    # Remove URLs
-    text = re.sub(r"https?://\S+", " ", text)
 
-    # Remove reply headers
-    text = re.sub(r"Re: \[.*?\]", " ", text)
+def finish_strict(text: str) -> str:
+    """Strict-mode filter, applied after strip_ptt_noise()."""
+    # No need for whitespace normalization (all spaces removed)
+    return _STRICT_DISALLOWED.sub("", text)
 
-    # Remove emails
-    text = re.sub(r"\S+@\S+", " ", text)
 
-    # 【嚴格模式】只保留漢字 + 5個基本標點
-    # 移除：注音、英文、數字、其他標點
-    text = re.sub(r"[^\u4e00-\u9fa5，。！？、]", "", text)
+# Mode name → filter applied to strip_ptt_noise() output. The first mode is
+# the baseline that removed characters are measured against.
+CLEANING_MODES: Dict[str, Callable[[str], str]] = {
+    'current': finish_current,
+    'strict': finish_strict,
+}
 
-    # No need for whitespace normalization (all spaces removed)
 
-    return text
+def clean_ptt_current(text: str) -> str:
+    """Current cleaning mode (from process_raw_text.py)."""
+    return finish_current(strip_ptt_noise(text))
+
+
+def clean_ptt_strict(text: str) -> str:
+    """Strict cleaning mode (Chinese + 5 basic punctuation only)."""
+    return finish_strict(strip_ptt_noise(text))
 
 
 def extract_removed_chars(current: str, strict: str) -> Dict[str, int]:
     """Extract characters that were removed by strict mode."""
-    removed = []
-    for char in current:
-        if char not in strict:
-            removed.append(char)
+    kept = set(strict)
+    return Counter(char for char in current if char not in kept)
 
-    return Counter(removed)
 
+def is_noise_bigram(bigram: str) -> bool:
+    """Bigrams containing Bopomofo (注音) or a space."""
+    return ' ' in bigram or any('\u3100' <= char <= '\u312f' for char in bigram)
 
-def count_bigrams(text: str) -> Dict[str, int]:
-    """Count bigram frequencies in text."""
-    bigrams = defaultdict(int)
 
-    for i in range(len(text) - 1):
-        bigram = text[i:i+2]
-        if len(bigram) == 2:
-            bigrams[bigram] += 1
+# ============================================================================
+# Single-pass analysis
+# ============================================================================
 
-    return dict(bigrams)
+def _new_mode_stats() -> Dict:
+    """Running statistics for one cleaning mode."""
+    return {
+        'lines_kept': 0,
+        'total_chars': 0,
+        'unigrams': Counter(),
+        'bigrams': Counter(),
+        'removed': Counter(),  # chars the baseline mode kept but this mode removed
+        'first': '',           # first / last kept char, for bigrams across
+        'last': ''             # line and shard boundaries
+    }
 
 
-def analyze_corpus_sample(
-    file_path: str,
-    max_lines: int = 50000
-) -> Tuple[Dict, Dict]:
+def _analyze_lines(raw_lines: Iterable[bytes], mode_names: List[str]) -> Dict[str, Dict]:
     """
-    Analyze PTT corpus with both cleaning modes.
+    Clean raw lines with every mode and accumulate per-mode statistics.
 
-    Returns:
-        (current_stats, strict_stats)
+    Kept lines are treated as one joined text, so bigrams spanning the end
+    of one line and the start of the next are counted too.
     """
+    filters = [(name, CLEANING_MODES[name]) for name in mode_names]
+    stats = {name: _new_mode_stats() for name in mode_names}
 
-    current_text = []
-    strict_text = []
-    removed_chars_all = Counter()
+    for raw_line in raw_lines:
+        prefix = strip_ptt_noise(raw_line.decode('utf-8', errors='replace'))
 
-    line_count = 0
+        baseline = None
+        for name, finish in filters:
+            cleaned = finish(prefix)
+            mode = stats[name]
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line_count >= max_lines:
-                break
+            if baseline is None:
+                baseline = cleaned
+            else:
+                mode['removed'].update(extract_removed_chars(baseline, cleaned))
 
-            current_cleaned = clean_ptt_current(line)
-            strict_cleaned = clean_ptt_strict(line)
+            if not cleaned:
+                continue
 
-            if current_cleaned:
-                current_text.append(current_cleaned)
+            mode['lines_kept'] += 1
+            mode['total_chars'] += len(cleaned)
+            mode['unigrams'].update(cleaned)
 
-            if strict_cleaned:
-                strict_text.append(strict_cleaned)
+            joined = mode['last'] + cleaned
+            mode['bigrams'].update(joined[i:i + 2] for i in range(len(joined) - 1))
+            mode['first'] = mode['first'] or cleaned[0]
+            mode['last'] = cleaned[-1]
 
-            # Track removed characters
-            removed = extract_removed_chars(current_cleaned, strict_cleaned)
-            removed_chars_all.update(removed)
+    return stats
 
-            line_count += 1
 
-    # Join all text
-    current_full = ''.join(current_text)
-    strict_full = ''.join(strict_text)
+def _analyze_shard(shard: Tuple[str, int, int], mode_names: List[str]) -> Dict[str, Dict]:
+    """Worker entry point: analyze one line-aligned shard."""
+    return _analyze_lines(iter_shard_lines(*shard), mode_names)
 
-    # Count unigrams
-    current_unigrams = Counter(current_full)
-    strict_unigrams = Counter(strict_full)
 
-    # Count bigrams
-    current_bigrams = count_bigrams(current_full)
-    strict_bigrams = count_bigrams(strict_full)
+def _merge_mode_stats(merged: Dict[str, Dict], partial: Dict[str, Dict]) -> None:
+    """Add the next shard's per-mode statistics into the merged statistics (in file order)."""
+    for name, stats in partial.items():
+        target = merged[name]
+        target['lines_kept'] += stats['lines_kept']
+        target['total_chars'] += stats['total_chars']
+        for key in ('unigrams', 'bigrams', 'removed'):
+            target[key].update(stats[key])
 
-    current_stats = {
-        'total_chars': len(current_full),
-        'unique_unigrams': len(current_unigrams),
-        'unique_bigrams': len(current_bigrams),
-        'unigrams': current_unigrams,
-        'bigrams': current_bigrams,
-    }
+        # Bigram across the shard boundary
+        if target['last'] and stats['first']:
+            target['bigrams'][target['last'] + stats['first']] += 1
+        target['first'] = target['first'] or stats['first']
+        target['last'] = stats['last'] or target['last']
 
-    strict_stats = {
-        'total_chars': len(strict_full),
-        'unique_unigrams': len(strict_unigrams),
-        'unique_bigrams': len(strict_bigrams),
-        'unigrams': strict_unigrams,
-        'bigrams': strict_bigrams,
-    }
 
-    return current_stats, strict_stats, removed_chars_all
+def analyze_cleaning_modes(
+    file_path: str,
+    mode_names: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    sampler=None,
+    shard_bytes: int = DEFAULT_SHARD_BYTES
+) -> Dict[str, Dict]:
+    """
+    Analyze a PTT corpus with several cleaning modes in one pass.
+
+    Args:
+        file_path: PTT corpus path
+        mode_names: Modes from CLEANING_MODES, baseline first (default: all)
+        workers: Worker processes for the full-corpus pass
+            (default: CPU count; 1 = in this process)
+        sampler: Sampler from corpus_sampling.py; analyzes only the sample,
+            serially, instead of the full corpus
+        shard_bytes: Target shard size for the full-corpus pass
+
+    Returns:
+        {mode: {'lines_kept', 'total_chars', 'unique_unigrams',
+                'unique_bigrams', 'unigrams', 'bigrams', 'removed'}}
+
+    Raises:
+        FileNotFoundError: If the corpus doesn't exist
+        ValueError: If a mode name is unknown
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Corpus file not found: {file_path}")
+
+    mode_names = list(mode_names or CLEANING_MODES)
+    unknown = [name for name in mode_names if name not in CLEANING_MODES]
+    if unknown:
+        raise ValueError(f"Unknown cleaning modes {unknown}, expected {list(CLEANING_MODES)}")
+
+    if sampler is not None:
+        with open(file_path, 'rb') as f:
+            stats = _analyze_lines(sampler.iter_lines(f), mode_names)
+    else:
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        shards = plan_shards([file_path], shard_bytes)
+        stats = {name: _new_mode_stats() for name in mode_names}
+
+        if workers <= 1:
+            for shard in shards:
+                _merge_mode_stats(stats, _analyze_shard(shard, mode_names))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_analyze_shard, shard, mode_names) for shard in shards]
+                for future in futures:
+                    _merge_mode_stats(stats, future.result())
+
+    for mode in stats.values():
+        del mode['first'], mode['last']
+        mode['unique_unigrams'] = len(mode['unigrams'])
+        mode['unique_bigrams'] = len(mode['bigrams'])
+
+    return stats
+
+
+def analyze_corpus_sample(
+    file_path: str,
+    max_lines: int = 50000,
+    sampler=None
+) -> Tuple[Dict, Dict, Dict]:
+    """
+    Analyze a PTT corpus sample with the current and strict modes.
+
+    Args:
+        file_path: PTT corpus path
+        max_lines: Lines to analyze when no sampler is given (head sample)
+        sampler: Sampler from corpus_sampling.py (overrides max_lines)
+
+    Returns:
+        (current_stats, strict_stats, removed_chars)
+    """
+    if sampler is None:
+        sampler = HeadSampler(max_lines)
+
+    stats = analyze_cleaning_modes(file_path, ['current', 'strict'], sampler=sampler)
+    return stats['current'], stats['strict'], stats['strict']['removed']
 
 
 def main():
     """Main analysis."""
+    parser = argparse.ArgumentParser(
+        description='Compare PTT corpus cleaning modes over the full corpus (or a sample)'
+    )
+    parser.add_argument(
+        '--corpus',
+        default='converter/raw_data/Gossiping-QA-Dataset.txt',
+        help='PTT corpus path (default: converter/raw_data/Gossiping-QA-Dataset.txt)'
+    )
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=list(CLEANING_MODES),
+        default=list(CLEANING_MODES),
+        help='Cleaning modes to compare, baseline first (default: all)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes for the full-corpus pass (default: CPU count)'
+    )
+    add_sampling_arguments(parser)
+    args = parser.parse_args()
+
+    sampler = sampler_from_args(args, args.corpus)
+    baseline_name = args.modes[0]
 
     print("="*70)
     print("PTT Corpus Cleaning Analysis (Action 2)")
     print("="*70)
     print()
-    print("Comparing two cleaning modes:")
-    print("  Current: Chinese + Bopomofo (注音) + full punctuation")
-    print("  Strict:  Chinese + 5 basic punctuation only (，。！？、)")
+    print(f"Comparing {len(args.modes)} cleaning modes (baseline: {baseline_name}):")
+    print("  current: Chinese + Bopomofo (注音) + full punctuation")
+    print("  strict:  Chinese + 5 basic punctuation only (，。！？、)")
     print()
-    print("Analyzing first 50,000 lines of PTT corpus...")
+    if sampler is not None:
+        print(f"Analyzing PTT corpus sample: {sampler.describe()}...")
+    else:
+        print(f"Analyzing full PTT corpus: {args.corpus}...")
     print("="*70)
     print()
 
     # Analyze corpus
-    current, strict, removed = analyze_corpus_sample(
-        'converter/raw_data/Gossiping-QA-Dataset.txt',
-        max_lines=50000
-    )
+    stats = analyze_cleaning_modes(args.corpus, args.modes, workers=args.workers, sampler=sampler)
+    baseline = stats[baseline_name]
 
     # Summary statistics
     print("Summary Statistics:")
     print("-"*70)
-    print(f"{'Metric':<30} {'Current':<20} {'Strict':<20} {'Diff'}")
+    print(f"{'Metric':<20} " + " ".join(f"{name:>14}" for name in args.modes))
     print("-"*70)
 
-    total_chars_diff = strict['total_chars'] - current['total_chars']
-    total_chars_pct = (total_chars_diff / current['total_chars'] * 100)
-    print(f"{'Total characters':<30} {current['total_chars']:<20,} {strict['total_chars']:<20,} {total_chars_pct:+.1f}%")
-
-    unigrams_diff = strict['unique_unigrams'] - current['unique_unigrams']
-    print(f"{'Unique unigrams':<30} {current['unique_unigrams']:<20,} {strict['unique_unigrams']:<20,} {unigrams_diff:+,}")
-
-    bigrams_diff = strict['unique_bigrams'] - current['unique_bigrams']
-    bigrams_pct = (bigrams_diff / current['unique_bigrams'] * 100)
-    print(f"{'Unique bigrams':<30} {current['unique_bigrams']:<20,} {strict['unique_bigrams']:<20,} {bigrams_pct:+.1f}%")
+    for label, key in [('Lines kept', 'lines_kept'),
+                       ('Total characters', 'total_chars'),
+                       ('Unique unigrams', 'unique_unigrams'),
+                       ('Unique bigrams', 'unique_bigrams')]:
+        print(f"{label:<20} " + " ".join(f"{stats[name][key]:>14,}" for name in args.modes))
+
+    for name in args.modes[1:]:
+        mode = stats[name]
+        chars_pct = ((mode['total_chars'] - baseline['total_chars']) / baseline['total_chars'] * 100
+                     if baseline['total_chars'] else 0)
+        bigrams_pct = ((mode['unique_bigrams'] - baseline['unique_bigrams']) / baseline['unique_bigrams'] * 100
+                       if baseline['unique_bigrams'] else 0)
+        print(f"{name} vs {baseline_name}: characters {chars_pct:+.1f}%, unique bigrams {bigrams_pct:+.1f}%")
+
+    for name in args.modes[1:]:
+        print()
+        print("="*70)
+        print(f"Top 30 Removed Characters ({name} mode removes these):")
+        print("="*70)
+        print(f"{'Char':<10} {'Count':<15} {'Type':<20} {'Example'}")
+        print("-"*70)
+
+        for char, count in stats[name]['removed'].most_common(30):
+            # Classify character type
+            if char == ' ':
+                char_type = "Space"
+                example = "(whitespace)"
+            elif '\u3100' <= char <= '\u312f':
+                char_type = "Bopomofo (注音)"
+                example = f"好{char}, {char}{char}"
+            elif char in '（）「」『』【】':
+                char_type = "Full-width punct"
+                example = f"文字{char}文字"
+            elif char.isalpha():
+                char_type = "Latin letter"
+                example = "XD, LOL"
+            elif char.isdigit():
+                char_type = "Digit"
+                example = "123, 456"
+            else:
+                char_type = "Other"
+                example = ""
+
+            display_char = repr(char) if char in [' ', '\n', '\t'] else char
+            print(f"{display_char:<10} {count:<15,} {char_type:<20} {example}")
 
     print()
     print("="*70)
-    print("Top 30 Removed Characters (Strict mode removes these):")
-    print("="*70)
-    print(f"{'Char':<10} {'Count':<15} {'Type':<20} {'Example'}")
-    print("-"*70)
-
-    for char, count in removed.most_common(30):
-        # Classify character type
-        if char == ' ':
-            char_type = "Space"
-            example = "(whitespace)"
-        elif '\u3100' <= char <= '\u312f':
-            char_type = "Bopomofo (注音)"
-            example = f"好{char}, {char}{char}"
-        elif char in '（）「」『』【】':
-            char_type = "Full-width punct"
-            example = f"文字{char}文字"
-        elif char.isalpha():
-            char_type = "Latin letter"
-            example = "XD, LOL"
-        elif char.isdigit():
-            char_type = "Digit"
-            example = "123, 456"
-        else:
-            char_type = "Other"
-            example = ""
-
-        display_char = repr(char) if char in [' ', '\n', '\t'] else char
-        print(f"{display_char:<10} {count:<15,} {char_type:<20} {example}")
-
-    print()
-    print("="*70)
-    print("Noise Bigram Analysis (Current mode keeps these):")
+    print(f"Noise Bigram Analysis ({baseline_name} mode):")
     print("="*70)
     print()
     print("Searching for problematic bigrams containing:")
@@ -233,22 +366,23 @@ def main():
     print("  3. Space-only: '  '")
     print()
 
-    # Find noise bigrams
-    noise_bigrams = []
-    for bigram, count in current['bigrams'].items():
-        if len(bigram) != 2:
-            continue
-
-        # Check if contains Bopomofo
-        has_bopomofo = any('\u3100' <= char <= '\u312f' for char in bigram)
-        has_space = ' ' in bigram
-
-        if has_bopomofo or has_space:
-            noise_bigrams.append((bigram, count))
-
-    noise_bigrams.sort(key=lambda x: x[1], reverse=True)
-
-    print(f"Found {len(noise_bigrams):,} noise bigrams (out of {len(current['bigrams']):,} total)")
+    # Noise contamination per mode
+    contamination = {}
+    for name in args.modes:
+        noise = [(bigram, count) for bigram, count in stats[name]['bigrams'].items()
+                 if is_noise_bigram(bigram)]
+        noise.sort(key=lambda x: x[1], reverse=True)
+        noise_count = sum(count for _, count in noise)
+        total_bigram_count = sum(stats[name]['bigrams'].values())
+        contamination[name] = {
+            'noise_bigrams': noise,
+            'noise_count': noise_count,
+            'total_bigram_count': total_bigram_count,
+            'noise_pct': (noise_count / total_bigram_count * 100) if total_bigram_count else 0
+        }
+
+    noise_bigrams = contamination[baseline_name]['noise_bigrams']
+    print(f"Found {len(noise_bigrams):,} noise bigrams (out of {baseline['unique_bigrams']:,} total)")
     print()
     print("Top 20 Noise Bigrams:")
     print("-"*70)
@@ -270,16 +404,15 @@ def main():
     print("="*70)
     print()
 
-    # Calculate noise percentage
-    noise_count = sum(count for _, count in noise_bigrams)
-    total_bigram_count = sum(current['bigrams'].values())
-    noise_pct = (noise_count / total_bigram_count * 100)
-
-    print(f"1. Noise contamination: {noise_pct:.2f}% of bigrams contain noise")
-    print(f"   - {len(noise_bigrams):,} noise bigrams out of {len(current['bigrams']):,} unique")
-    print(f"   - {noise_count:,} noise occurrences out of {total_bigram_count:,} total")
+    print("1. Noise contamination (% of bigram occurrences containing noise):")
+    for name in args.modes:
+        c = contamination[name]
+        print(f"   - {name:<10} {c['noise_pct']:6.2f}%  "
+              f"({len(c['noise_bigrams']):,} noise bigrams, "
+              f"{c['noise_count']:,} of {c['total_bigram_count']:,} occurrences)")
     print()
 
+    noise_pct = contamination[baseline_name]['noise_pct']
     if noise_pct > 5:
         print("✅ RECOMMEND: Use strict mode")
         print("   - Noise level is significant (>5%)")
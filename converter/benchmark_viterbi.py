@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Beam vs Exact Viterbi Benchmark
+
+Turns held-out sentences into Dayi code sequences (each character typed
+with its shortest code), decodes them with exact Viterbi and with beam
+search at several beam widths, and reports the latency / accuracy
+trade-off:
+
+- ms per sentence
+- agreement: beam top-1 sentence equals the exact Viterbi sentence
+- char accuracy: decoded characters matching the original text
+- top-k recall: original sentence among the beam's k results
+
+Usage:
+    python benchmark_viterbi.py --dayi-db mvp1/dayi_db.json \\
+        --model mvp1/ngram_pruned.json --heldout heldout.txt \\
+        --beams 1 4 16 64 --k 5 --output beam_benchmark.json
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from viterbi_decoder import ViterbiDecoder, load_dayi_db
+
+
+DEFAULT_BEAMS = [1, 4, 16, 64]
+
+
+def build_char_codes(dayi_db: Dict[str, List[Dict]]) -> Dict[str, str]:
+    """
+    Map each character to its shortest code (first in code order on ties).
+
+    Args:
+        dayi_db: Code → candidates (dayi_db.json format)
+
+    Returns:
+        Character → code
+    """
+    char_codes = {}
+    for code in sorted(dayi_db, key=lambda c: (len(c), c)):
+        for candidate in dayi_db[code]:
+            char_codes.setdefault(candidate['char'], code)
+    return char_codes
+
+
+def load_code_set(
+    heldout_path: str,
+    char_codes: Dict[str, str],
+    min_chars: int = 2,
+    max_sentences: Optional[int] = None
+) -> List[Tuple[str, List[str]]]:
+    """
+    Read held-out sentences and encode them as code sequences.
+
+    Lines are split at characters without a code (punctuation, Latin text);
+    every run of at least min_chars encodable characters becomes one sentence.
+
+    Returns:
+        List of (reference sentence, codes)
+    """
+    code_set = []
+
+    with open(heldout_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            run = []
+            for char in line.strip() + '\n':
+                if char in char_codes:
+                    run.append(char)
+                    continue
+                if len(run) >= min_chars:
+                    code_set.append((''.join(run), [char_codes[c] for c in run]))
+                    if max_sentences is not None and len(code_set) >= max_sentences:
+                        return code_set
+                run = []
+
+    return code_set
+
+
+def benchmark_beams(
+    decoder: ViterbiDecoder,
+    code_set: List[Tuple[str, List[str]]],
+    beams: List[int],
+    k: int = 5,
+    score_margin: Optional[float] = None
+) -> Dict:
+    """
+    Decode a code set exactly and with each beam width.
+
+    Returns:
+        {'sentences', 'chars', 'exact': row, 'beams': [row, ...]} where a
+        row holds ms_per_sentence, char_accuracy, sentence_accuracy and
+        (beam rows) beam_width, agreement_with_exact, topk_recall
+    """
+    total_chars = sum(len(reference) for reference, _ in code_set)
+
+    def char_hits(reference: str, sentence: str) -> int:
+        return sum(1 for a, b in zip(reference, sentence) if a == b)
+
+    started = time.perf_counter()
+    exact = [decoder.decode(codes)['sentence'] for _, codes in code_set]
+    exact_elapsed = time.perf_counter() - started
+
+    exact_row = {
+        'ms_per_sentence': exact_elapsed * 1000 / max(1, len(code_set)),
+        'char_accuracy': sum(char_hits(r, s) for (r, _), s in zip(code_set, exact)) / max(1, total_chars),
+        'sentence_accuracy': sum(1 for (r, _), s in zip(code_set, exact) if r == s) / max(1, len(code_set))
+    }
+
+    beam_rows = []
+    for beam_width in beams:
+        started = time.perf_counter()
+        results = [
+            decoder.decode_beam(codes, beam_width=beam_width, score_margin=score_margin, k=k)
+            for _, codes in code_set
+        ]
+        elapsed = time.perf_counter() - started
+
+        top1 = [r[0]['sentence'] for r in results]
+        beam_rows.append({
+            'beam_width': beam_width,
+            'ms_per_sentence': elapsed * 1000 / max(1, len(code_set)),
+            'speedup_vs_exact': exact_elapsed / elapsed if elapsed > 0 else None,
+            'agreement_with_exact': sum(1 for a, b in zip(top1, exact) if a == b) / max(1, len(code_set)),
+            'char_accuracy': sum(char_hits(r, s) for (r, _), s in zip(code_set, top1)) / max(1, total_chars),
+            'sentence_accuracy': sum(1 for (r, _), s in zip(code_set, top1) if r == s) / max(1, len(code_set)),
+            'topk_recall': sum(
+                1 for (reference, _), result in zip(code_set, results)
+                if any(hyp['sentence'] == reference for hyp in result)
+            ) / max(1, len(code_set))
+        })
+
+    return {
+        'sentences': len(code_set),
+        'chars': total_chars,
+        'k': k,
+        'score_margin': score_margin,
+        'exact': exact_row,
+        'beams': beam_rows
+    }
+
+
+def print_benchmark(report: Dict) -> None:
+    """Print the trade-off table."""
+    print("=" * 86)
+    print(f"BEAM vs EXACT VITERBI ({report['sentences']:,} sentences, {report['chars']:,} chars, "
+          f"k={report['k']}, margin={report['score_margin']})")
+    print("=" * 86)
+    print(f"{'Decoder':<12} {'ms/sent':>9} {'Speedup':>8} {'=Exact':>8} "
+          f"{'Char acc':>9} {'Sent acc':>9} {'Top-k':>7}")
+    print("-" * 86)
+
+    exact = report['exact']
+    print(f"{'exact':<12} {exact['ms_per_sentence']:>9.3f} {'1.00x':>8} {'100.0%':>8} "
+          f"{exact['char_accuracy']:>9.1%} {exact['sentence_accuracy']:>9.1%} {'-':>7}")
+
+    for row in report['beams']:
+        speedup = f"{row['speedup_vs_exact']:.2f}x" if row['speedup_vs_exact'] else '-'
+        print(f"{'beam=' + str(row['beam_width']):<12} {row['ms_per_sentence']:>9.3f} {speedup:>8} "
+              f"{row['agreement_with_exact']:>8.1%} {row['char_accuracy']:>9.1%} "
+              f"{row['sentence_accuracy']:>9.1%} {row['topk_recall']:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark beam-pruned k-best Viterbi against exact Viterbi'
+    )
+    parser.add_argument('--dayi-db', required=True, help='dayi_db.json (code → candidates)')
+    parser.add_argument('--model', required=True, help='N-gram model JSON')
+    parser.add_argument('--heldout', required=True, help='Held-out text (one sentence per line)')
+    parser.add_argument('--beams', type=int, nargs='+', default=DEFAULT_BEAMS,
+                        help=f'Beam widths to compare (default: {DEFAULT_BEAMS})')
+    parser.add_argument('--k', type=int, default=5, help='Sentences returned per beam decode (default: 5)')
+    parser.add_argument('--margin', type=float, default=None,
+                        help='Score margin in nats for beam pruning (default: none)')
+    parser.add_argument('--smoothing', choices=['probability', 'laplace'], default=None,
+                        help='Scoring (default: probability if the model has it, else laplace)')
+    parser.add_argument('--max-sentences', type=int, default=None,
+                        help='Stop after this many held-out sentences')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    dayi_db = load_dayi_db(args.dayi_db)
+    with open(args.model, 'r', encoding='utf-8') as f:
+        ngram_db = json.load(f)
+
+    code_set = load_code_set(args.heldout, build_char_codes(dayi_db),
+                             max_sentences=args.max_sentences)
+    if not code_set:
+        print("Error: no encodable sentences in held-out file", file=sys.stderr)
+        sys.exit(1)
+
+    decoder = ViterbiDecoder(dayi_db, ngram_db, smoothing=args.smoothing)
+    report = benchmark_beams(decoder, code_set, args.beams, k=args.k, score_margin=args.margin)
+    print_benchmark(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,11 +21,19 @@ import json
 import os
 import sys
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Import processors
-from build_ngram_lib import process_essay_file, apply_pruning
-from process_raw_text import process_corpus
+from build_ngram_lib import process_essay_file, apply_pruning, make_deterministic
+from process_raw_text import (
+    process_corpus,
+    add_sampling_arguments,
+    sampler_from_args,
+    DEFAULT_SNAPSHOT_INTERVAL
+)
+from corpus_dedup import LineDeduplicator, dedup_metadata
+from corpus_pipeline import process_corpus_pipelined
+from model_manifest import write_manifest
 
 
 def merge_counts(
@@ -127,7 +135,14 @@ def build_blended_model(
     pruning_threshold: int = 2,
     pruning_topk: int = 40,
     output_file: str = 'ngram_blended.json',
-    verbose: bool = False
+    verbose: bool = False,
+    ptt_snapshot_path: Optional[str] = None,
+    snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+    resume: bool = False,
+    dedup: bool = False,
+    ptt_sampler=None,
+    pipeline_workers: int = 0,
+    deterministic: bool = False
 ) -> Dict:
     """
     Build blended N-gram model by merging multiple corpora.
@@ -147,6 +162,15 @@ def build_blended_model(
         pruning_topk: Top K next characters per character (default: 40)
         output_file: Output JSON file path
         verbose: Print detailed progress
+        ptt_snapshot_path: Periodic snapshot file for the PTT pass (None = off)
+        snapshot_interval: PTT lines between snapshots (default: 500,000)
+        resume: Continue the PTT pass from ptt_snapshot_path
+        dedup: Skip exact/near-duplicate PTT lines (quotes, reposts)
+        ptt_sampler: Only count a sample of the PTT corpus (see corpus_sampling.py)
+        pipeline_workers: Process PTT with the staged reader/cleaner/counter
+            pipeline using this many cleaner processes (0 = single loop)
+        deterministic: Write sorted tables, fixed float precision and
+            metadata.content_hash (see build_ngram_lib.make_deterministic)
 
     Returns:
         Complete N-gram database dictionary
@@ -200,7 +224,24 @@ def build_blended_model(
     if verbose:
         print(f"[Phase 2/4] Processing PTT-Corpus...")
 
-    uni_ptt, bi_ptt = process_corpus(ptt_corpus_path, verbose=verbose)
+    ptt_dedup = LineDeduplicator() if dedup else None
+
+    if pipeline_workers > 0:
+        uni_ptt, bi_ptt, _ = process_corpus_pipelined(
+            ptt_corpus_path,
+            workers=pipeline_workers,
+            verbose=verbose
+        )
+    else:
+        uni_ptt, bi_ptt = process_corpus(
+            ptt_corpus_path,
+            verbose=verbose,
+            snapshot_path=ptt_snapshot_path,
+            snapshot_interval=snapshot_interval,
+            resume=resume,
+            dedup=ptt_dedup,
+            sampler=ptt_sampler
+        )
 
     if verbose:
         print()
@@ -231,7 +272,8 @@ def build_blended_model(
         merged_bi_int,
         threshold=pruning_threshold,
         topk=pruning_topk,
-        verbose=verbose
+        verbose=verbose,
+        deterministic=deterministic
     )
 
     # Convert merged unigrams to integers (unigrams don't need pruning)
@@ -291,9 +333,19 @@ def build_blended_model(
         }
     }
 
+    if ptt_dedup is not None:
+        output_data["metadata"]["ptt_dedup"] = dedup_metadata(ptt_dedup)
+
+    if ptt_sampler is not None:
+        output_data["metadata"]["ptt_sample"] = ptt_sampler.describe()
+
+    if deterministic:
+        output_data = make_deterministic(output_data)
+
     # Save to file
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output_data, f, ensure_ascii=False, separators=(',', ':'))
+    write_manifest(output_data, output_file)
 
     file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
 
@@ -337,6 +389,20 @@ Examples:
     --threshold 5 \\
     --topk 8 \\
     --output mvp1/ngram_blended_small.json
+
+  # Quick quality estimate on a random 1% of the PTT corpus
+  python3 build_blended.py \\
+    --rime-corpus converter/raw_data/essay.txt \\
+    --ptt-corpus converter/raw_data/ptt_corpus.txt \\
+    --sample seek --sample-rate 0.01 \\
+    --output /tmp/ngram_blended_sample.json
+
+  # Snapshot the PTT pass, then resume it after an interruption
+  python3 build_blended.py \\
+    --rime-corpus converter/raw_data/essay.txt \\
+    --ptt-corpus converter/raw_data/ptt_corpus.txt \\
+    --snapshot ptt.snapshot.json --resume \\
+    --output mvp1/ngram_blended.json
         '''
     )
 
@@ -392,8 +458,67 @@ Examples:
         help='Print detailed progress messages'
     )
 
+    parser.add_argument(
+        '--snapshot',
+        metavar='PATH',
+        help='Write periodic snapshots of the PTT pass to PATH'
+    )
+
+    parser.add_argument(
+        '--snapshot-interval',
+        type=int,
+        default=DEFAULT_SNAPSHOT_INTERVAL,
+        help=f'PTT lines between snapshots (default: {DEFAULT_SNAPSHOT_INTERVAL:,})'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue the PTT pass from the --snapshot file of an interrupted run'
+    )
+
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Skip exact and near-duplicate PTT lines (quotes, reposts) before counting'
+    )
+
+    # Sampling of the PTT corpus (quick quality estimates)
+    add_sampling_arguments(parser)
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Clean PTT in N worker processes with the staged pipeline (default: 0 = single loop)'
+    )
+
+    parser.add_argument(
+        '--deterministic',
+        action='store_true',
+        help='Sorted tables, fixed float precision and metadata.content_hash '
+             '(byte-identical output for identical inputs)'
+    )
+
     args = parser.parse_args()
 
+    if args.resume and not args.snapshot:
+        print("Error: --resume requires --snapshot", file=sys.stderr)
+        sys.exit(1)
+
+    if args.resume and args.dedup:
+        print("Error: --resume cannot be combined with --dedup", file=sys.stderr)
+        sys.exit(1)
+
+    if args.sample and args.snapshot:
+        print("Error: --sample cannot be combined with --snapshot", file=sys.stderr)
+        sys.exit(1)
+
+    if args.workers > 0 and (args.snapshot or args.dedup or args.sample):
+        print("Error: --workers cannot be combined with --snapshot, --dedup or --sample",
+              file=sys.stderr)
+        sys.exit(1)
+
     # Validate weights sum to 1.0
     total_weight = args.weight_rime + args.weight_ptt
     if abs(total_weight - 1.0) > 0.001:
@@ -420,7 +545,14 @@ Examples:
             pruning_threshold=args.threshold,
             pruning_topk=args.topk,
             output_file=args.output,
-            verbose=args.verbose
+            verbose=args.verbose,
+            ptt_snapshot_path=args.snapshot,
+            snapshot_interval=args.snapshot_interval,
+            resume=args.resume,
+            dedup=args.dedup,
+            ptt_sampler=sampler_from_args(args, args.ptt_corpus),
+            pipeline_workers=args.workers,
+            deterministic=args.deterministic
         )
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -11,6 +11,8 @@ Usage:
     python build_ngram.py
     python build_ngram.py --input custom_essay.txt --output custom_ngram.json
     python build_ngram.py --dry-run --verbose
+    python build_ngram.py --freq-map mvp2-predictive/data/freq_map.json
+    python build_ngram.py --deterministic --build-timestamp 2025-01-01T00:00:00Z
 
 Design Document: converter/DESIGN-ngram.md
 """
@@ -28,6 +30,8 @@ from build_ngram_lib import (
     calculate_bigram_probabilities,
     generate_ngram_db,
     write_ngram_db,
+    write_freq_map,
+    canonicalize_json,
     validate_ngram_db,
     calculate_metadata,
     apply_pruning  # NEW: for N-gram pruning
@@ -86,6 +90,31 @@ Examples:
         help='Input file format (default: essay). Use "terra_pinyin" for Rime dict.yaml format'
     )
 
+    parser.add_argument(
+        '--freq-map',
+        help='Also write freq_map.json (char → unigram probability) to this path'
+    )
+
+    parser.add_argument(
+        '--compact-freq-map',
+        action='store_true',
+        help='Write freq_map.json without indentation'
+    )
+
+    # Reproducible output
+    parser.add_argument(
+        '--deterministic',
+        action='store_true',
+        help='Sorted tables, fixed float precision and metadata.content_hash '
+             '(byte-identical output for identical inputs)'
+    )
+
+    parser.add_argument(
+        '--build-timestamp',
+        help='metadata.generated_at to record (default: $SOURCE_DATE_EPOCH, else now; '
+             '1970-01-01T00:00:00Z with --deterministic)'
+    )
+
     # Pruning parameters (N-gram optimization)
     parser.add_argument(
         '--enable-pruning',
@@ -224,7 +253,8 @@ def main():
             bigram_counts,
             threshold=args.threshold,
             topk=args.topk,
-            verbose=True
+            verbose=True,
+            deterministic=args.deterministic
         )
         pruned_count = len(bigram_counts)
 
@@ -249,6 +279,17 @@ def main():
     print_step(prob_step, total_steps, "Calculating probabilities")
 
     unigram_probs = calculate_unigram_probabilities(unigram_counts)
+
+    # freq_map.json is a side output of the unigram phase
+    if args.freq_map and not args.dry_run:
+        try:
+            freq_map = canonicalize_json(unigram_probs) if args.deterministic else unigram_probs
+            write_freq_map(freq_map, args.freq_map, compact=args.compact_freq_map)
+            print_success(f"Freq map: {args.freq_map}")
+        except IOError as e:
+            print(f"  ✗ Error writing file: {e}")
+            sys.exit(1)
+
     bigram_probs = calculate_bigram_probabilities(bigram_counts, unigram_counts)
 
     print_success(f"Unigram probabilities: {format_number(len(unigram_probs))}")
@@ -281,7 +322,9 @@ def main():
             unigram_counts,  # NEW: for Laplace smoothing
             bigram_counts,   # NEW: for Laplace smoothing
             metadata,
-            smoothing_alpha  # NEW: smoothing parameter
+            smoothing_alpha,  # NEW: smoothing parameter
+            build_timestamp=args.build_timestamp,
+            deterministic=args.deterministic
         )
 
         # Validate before writing
@@ -293,7 +336,7 @@ def main():
 
         # Write to file
         try:
-            write_ngram_db(ngram_db, args.output)
+            ngram_db = write_ngram_db(ngram_db, args.output, deterministic=args.deterministic)
 
             # Get file size
             file_size = os.path.getsize(args.output)
@@ -301,6 +344,8 @@ def main():
 
             print_success(f"Output size: {file_size_mb:.1f} MB")
             print_success(f"File: {args.output}")
+            if args.deterministic:
+                print_success(f"Content hash: {ngram_db['metadata']['content_hash']}")
 
         except IOError as e:
             print(f"  ✗ Error writing file: {e}")
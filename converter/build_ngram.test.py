@@ -7,14 +7,14 @@ N-gram Language Model Builder - TDD Test Suite
 This test suite follows Test-Driven Development (TDD) approach.
 All tests are written BEFORE implementation.
 
-Total Tests: 25
+Total Tests: 30
 Categories:
   1. Parsing (5 tests)
   2. Unigram Counting (4 tests)
   3. Bigram Counting (5 tests)
   4. Probability Calculation (6 tests)
-  5. JSON Generation (3 tests)
-  6. Integration (2 tests)
+  5. JSON Generation (7 tests)
+  6. Integration (3 tests)
 
 Design Document: converter/DESIGN-ngram.md
 """
@@ -32,9 +32,15 @@ from build_ngram_lib import (
     calculate_bigram_probabilities,
     generate_ngram_db,
     write_ngram_db,
+    write_freq_map,
+    resolve_build_timestamp,
+    ngram_content_hash,
     validate_ngram_db,
-    calculate_metadata
+    calculate_metadata,
+    prune_bigrams_by_topk
 )
+from build_blended import build_blended_model
+from model_manifest import read_model_header, read_model_members, read_model_section, manifest_path
 
 
 # ============================================================================
@@ -365,7 +371,7 @@ class TestProbabilityCalculation(unittest.TestCase):
 
 
 # ============================================================================
-# Category 5: JSON Generation (3 tests)
+# Category 5: JSON Generation (7 tests)
 # ============================================================================
 
 class TestJSONGeneration(unittest.TestCase):
@@ -419,9 +425,105 @@ class TestJSONGeneration(unittest.TestCase):
         self.assertIn('generated_at', ngram_db['metadata'])
         self.assertIn('version', ngram_db['metadata'])
 
+    def test_build_timestamp_injection(self):
+        """Test generated_at honours an explicit value, SOURCE_DATE_EPOCH, then a fixed value."""
+        ngram_db = generate_ngram_db({'的': 1.0}, {}, {'的': 1}, {}, {}, build_timestamp='2025-01-01T00:00:00Z')
+        self.assertEqual(ngram_db['metadata']['generated_at'], '2025-01-01T00:00:00Z')
+
+        saved = os.environ.get('SOURCE_DATE_EPOCH')
+        try:
+            os.environ['SOURCE_DATE_EPOCH'] = '1700000000'
+            self.assertEqual(resolve_build_timestamp(), '2023-11-14T22:13:20Z')
+            self.assertEqual(resolve_build_timestamp(deterministic=True), '2023-11-14T22:13:20Z')
+            os.environ.pop('SOURCE_DATE_EPOCH')
+            self.assertEqual(resolve_build_timestamp(deterministic=True), '1970-01-01T00:00:00Z')
+            os.environ['SOURCE_DATE_EPOCH'] = 'yesterday'
+            with self.assertRaises(ValueError):
+                resolve_build_timestamp()
+        finally:
+            if saved is None:
+                os.environ.pop('SOURCE_DATE_EPOCH', None)
+            else:
+                os.environ['SOURCE_DATE_EPOCH'] = saved
+
+    def test_deterministic_output(self):
+        """Test corpus order and build time do not change deterministic output."""
+        # Given: The same model built in two orders at two times
+        first = generate_ngram_db(
+            {'的': 0.1 + 0.2, '一': 0.7}, {'的時': 0.8, '一個': 0.5},
+            {'的': 3, '一': 7}, {'的時': 2, '一個': 1}, {'total_chars': 10},
+            build_timestamp='2025-01-01T00:00:00Z')
+        second = generate_ngram_db(
+            {'一': 0.7, '的': 0.3}, {'一個': 0.5, '的時': 0.8},
+            {'一': 7, '的': 3}, {'一個': 1, '的時': 2}, {'total_chars': 10},
+            build_timestamp='2025-06-01T00:00:00Z')
+        self.assertEqual(ngram_content_hash(first), ngram_content_hash(second))
+
+        # When: Written in deterministic mode
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(tmp_dir, 'a.json'), os.path.join(tmp_dir, 'b.json')]
+            first['metadata']['generated_at'] = second['metadata']['generated_at']
+            written = [write_ngram_db(db, path, deterministic=True)
+                       for db, path in zip((first, second), paths)]
+            contents = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+
+            # Then: Byte-identical, sorted tables, metadata still last and hashed
+            self.assertEqual(contents[0], contents[1])
+            loaded = json.loads(contents[0])
+            self.assertEqual(list(loaded)[-1], 'metadata')
+            self.assertEqual(list(loaded['unigrams']), ['一', '的'])
+            self.assertEqual(loaded['unigrams']['的'], 0.3)
+            self.assertEqual(loaded['metadata']['content_hash'], ngram_content_hash(first))
+            self.assertEqual(written[0]['metadata']['content_hash'], loaded['metadata']['content_hash'])
+            self.assertEqual(read_model_header(paths[0])['metadata']['content_hash'], loaded['metadata']['content_hash'])
+        finally:
+            for path in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, path))
+            os.rmdir(tmp_dir)
+
+
+    def test_deterministic_topk_ties(self):
+        """Test deterministic top-K pruning ignores the count table's order."""
+        counts = {'我的': 5, '我是': 5, '我們': 5, '我在': 9}
+        reordered = dict(reversed(list(counts.items())))
+
+        self.assertEqual(prune_bigrams_by_topk(counts, 2, deterministic=True),
+                         {'我在': 9, '我們': 5})
+        self.assertEqual(prune_bigrams_by_topk(reordered, 2, deterministic=True),
+                         prune_bigrams_by_topk(counts, 2, deterministic=True))
+        self.assertEqual(prune_bigrams_by_topk(counts, 2), {'我在': 9, '我的': 5})
+
+    def test_deterministic_blended_build_with_workers(self):
+        """Test pipelined (--workers) deterministic builds give one content hash."""
+        essay = 'test-data/essay-sample.txt'
+        if not os.path.exists(essay):
+            self.skipTest(f"Test data not found: {essay}")
+
+        # Given: A PTT corpus spanning several pipeline batches, full of count ties
+        chars = [chr(0x4e00 + i) for i in range(40)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ptt = os.path.join(tmp_dir, 'ptt.txt')
+            with open(ptt, 'w', encoding='utf-8') as f:
+                for i in range(6000):
+                    f.write(''.join(chars[(i * 7 + j * j) % 40] for j in range(2 + i % 4)) + '\n')
+
+            # When: Built twice with workers and once in a single loop
+            hashes = []
+            for workers in (2, 2, 0):
+                db = build_blended_model(essay, ptt, pruning_threshold=1, pruning_topk=3,
+                                         output_file=os.path.join(tmp_dir, 'blended.json'),
+                                         pipeline_workers=workers, deterministic=True)
+                hashes.append(db['metadata']['content_hash'])
+
+            # Then: Every build has the same content
+            self.assertEqual(len(set(hashes)), 1)
 
 # ============================================================================
-# Category 6: Integration (2 tests)
+# Category 6: Integration (3 tests)
 # ============================================================================
 
 class TestIntegration(unittest.TestCase):
@@ -475,8 +577,55 @@ class TestIntegration(unittest.TestCase):
 
             self.assertEqual(loaded['unigrams'], ngram_db['unigrams'])
             self.assertEqual(loaded['bigrams'], ngram_db['bigrams'])
+
+            # And: A metadata-only manifest is written next to it
+            header = read_model_header(temp_path)
+            self.assertEqual(header['source'], 'manifest')
+            self.assertEqual(header['metadata'], ngram_db['metadata'])
         finally:
             os.unlink(temp_path)
+            if os.path.exists(manifest_path(temp_path)):
+                os.unlink(manifest_path(temp_path))
+
+    def test_streaming_freq_map_extraction(self):
+        """Test unigrams stream out of a model and entries out of freq_map.json, at any chunk size."""
+        # Given: A model with escapes, nested tables and unigrams not first
+        ngram_db = {
+            'bigrams': {'的"時': 0.8, '{[': 0.1, '\\一': 0.2},
+            'unigrams': {'的': 0.5, '一': 0.25, '"': 0.125, '\\': 0.125},
+            'smoothing_alpha': 0.1,
+            'metadata': {'nested': [{'unigrams': 'no'}]}
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = os.path.join(tmp_dir, 'ngram.json')
+            with open(model, 'w', encoding='utf-8') as f:
+                json.dump(ngram_db, f, ensure_ascii=False, indent=2)
+
+            # Then: Every top-level section is recovered without a full load
+            for chunk_bytes in (1, 2, 3, 7, 64 * 1024):
+                for key, value in ngram_db.items():
+                    self.assertEqual(read_model_section(model, key, chunk_bytes), value)
+            with self.assertRaises(ValueError):
+                read_model_section(model, 'nested')
+
+            # And: freq_map.json round-trips in both layouts
+            freq_map = os.path.join(tmp_dir, 'freq_map.json')
+            for compact in (False, True):
+                write_freq_map(read_model_section(model, 'unigrams'), freq_map, compact=compact)
+                with open(freq_map, 'r', encoding='utf-8') as f:
+                    self.assertEqual(json.load(f), ngram_db['unigrams'])
+
+                # And: only the requested entries are read back out of it
+                for chunk_bytes in (1, 3, 64 * 1024):
+                    self.assertEqual(read_model_members(freq_map, {'的', '"', '無'}, chunk_bytes),
+                                     {'的': 0.5, '"': 0.125})
+
+            # And: keys written as \u escapes still match
+            with open(freq_map, 'w', encoding='utf-8') as f:
+                json.dump(ngram_db['unigrams'], f)
+            self.assertEqual(read_model_members(freq_map, {'一', '\\'}), {'一': 0.25, '\\': 0.125})
+            self.assertEqual(read_model_members(freq_map, set()), {})
 
 
 # ============================================================================
@@ -12,8 +12,11 @@ Design Document: converter/DESIGN-ngram.md
 
 import os
 import json
-from datetime import datetime
-from typing import List, Tuple, Dict, Optional
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, List, Tuple, Dict, Optional
+
+from model_manifest import write_manifest
 
 
 # ============================================================================
@@ -345,7 +348,9 @@ def generate_ngram_db(
     unigram_counts: Dict[str, int],
     bigram_counts: Dict[str, int],
     metadata: Dict,
-    smoothing_alpha: float = 0.1
+    smoothing_alpha: float = 0.1,
+    build_timestamp: Optional[str] = None,
+    deterministic: bool = False
 ) -> Dict:
     """
     Create the final ngram_db.json structure with Laplace smoothing parameters.
@@ -359,6 +364,9 @@ def generate_ngram_db(
         bigram_counts: Dictionary of bigram raw counts (for Laplace smoothing)
         metadata: Metadata dictionary (total_chars, unique_chars, etc.)
         smoothing_alpha: Laplace smoothing parameter (default: 0.1)
+        build_timestamp: metadata.generated_at (default: see
+            resolve_build_timestamp(); inject one for reproducible builds)
+        deterministic: Never fall back to the wall clock for generated_at
 
     Returns:
         Complete N-gram database dictionary with smoothing parameters
@@ -410,7 +418,7 @@ def generate_ngram_db(
         # Metadata
         "metadata": {
             **metadata,
-            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "generated_at": resolve_build_timestamp(build_timestamp, deterministic),
             "version": "2.0",  # Upgraded to v2.0 for Laplace smoothing support
             "smoothing_method": "laplace",
             "smoothing_alpha": smoothing_alpha
@@ -418,20 +426,160 @@ def generate_ngram_db(
     }
 
 
-def write_ngram_db(ngram_db: Dict, output_path: str) -> None:
+# ============================================================================
+# Deterministic Output
+# ============================================================================
+
+# Significant digits kept for floats in deterministic output. Probabilities
+# computed in a different summation order differ only in the last bits,
+# far below this.
+FLOAT_SIGNIFICANT_DIGITS = 12
+
+# generated_at for deterministic builds given no timestamp (SOURCE_DATE_EPOCH=0)
+DETERMINISTIC_BUILD_TIMESTAMP = '1970-01-01T00:00:00Z'
+
+# Metadata fields that do not describe the model's content
+_UNHASHED_METADATA_KEYS = ('generated_at', 'content_hash')
+
+
+def resolve_build_timestamp(build_timestamp: Optional[str] = None,
+                            deterministic: bool = False) -> str:
+    """
+    Build timestamp for metadata.generated_at.
+
+    Order: explicit value → SOURCE_DATE_EPOCH (seconds, the reproducible
+    builds convention) → current UTC time, or DETERMINISTIC_BUILD_TIMESTAMP
+    when deterministic (so identical inputs still give identical bytes).
+
+    Raises:
+        ValueError: If SOURCE_DATE_EPOCH is not an integer
+
+    Examples:
+        >>> resolve_build_timestamp('2025-01-01T00:00:00Z')
+        '2025-01-01T00:00:00Z'
+    """
+    if build_timestamp is not None:
+        return build_timestamp
+
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        try:
+            moment = datetime.fromtimestamp(int(epoch), timezone.utc)
+        except ValueError:
+            raise ValueError(f"SOURCE_DATE_EPOCH must be an integer, got {epoch!r}")
+        return moment.replace(tzinfo=None).isoformat() + "Z"
+
+    if deterministic:
+        return DETERMINISTIC_BUILD_TIMESTAMP
+
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def canonicalize_json(value: Any, float_digits: int = FLOAT_SIGNIFICANT_DIGITS) -> Any:
+    """
+    Copy of a JSON value with object keys sorted and floats rounded.
+
+    Lists keep their order (it is meaningful); integers are untouched.
+
+    Examples:
+        >>> canonicalize_json({'b': 0.1 + 0.2, 'a': [2, 1]})
+        {'a': [2, 1], 'b': 0.3}
+    """
+    if isinstance(value, dict):
+        return {key: canonicalize_json(value[key], float_digits) for key in sorted(value)}
+    if isinstance(value, list):
+        return [canonicalize_json(item, float_digits) for item in value]
+    if isinstance(value, float):
+        return float(format(value, f'.{float_digits}g'))
+    return value
+
+
+def canonicalize_ngram_db(ngram_db: Dict, float_digits: int = FLOAT_SIGNIFICANT_DIGITS) -> Dict:
+    """
+    Deterministic form of a model: every table sorted and floats rounded.
+
+    The top-level section order is kept, since readers rely on it (tables
+    first, `metadata` last; see model_manifest.py).
     """
-    Write N-gram database to JSON file.
+    return {section: canonicalize_json(value, float_digits)
+            for section, value in ngram_db.items()}
+
+
+def ngram_content_hash(ngram_db: Dict) -> str:
+    """
+    SHA-256 of a model's content, for cache validation.
+
+    Computed over the canonical form with metadata.generated_at and
+    metadata.content_hash left out, so rebuilding the same model at another
+    time gives the same hash.
+    """
+    canonical = canonicalize_ngram_db(ngram_db)
+    metadata = canonical.get('metadata')
+    if isinstance(metadata, dict):
+        canonical['metadata'] = {key: value for key, value in metadata.items()
+                                 if key not in _UNHASHED_METADATA_KEYS}
+    encoded = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def make_deterministic(ngram_db: Dict) -> Dict:
+    """Canonical copy of a model with metadata.content_hash filled in."""
+    canonical = canonicalize_ngram_db(ngram_db)
+    canonical.setdefault('metadata', {})['content_hash'] = ngram_content_hash(canonical)
+    canonical['metadata'] = dict(sorted(canonical['metadata'].items()))
+    return canonical
+
+
+def write_ngram_db(ngram_db: Dict, output_path: str, deterministic: bool = False) -> Dict:
+    """
+    Write N-gram database to JSON file, plus its metadata-only manifest
+    (see model_manifest.py).
 
     Args:
         ngram_db: N-gram database dictionary
         output_path: Output file path
+        deterministic: Write the canonical form (sorted tables, rounded
+            floats) with metadata.content_hash, so identical inputs give
+            byte-identical files
+
+    Returns:
+        The database as written
 
     Raises:
         IOError: If file cannot be written
     """
+    if deterministic:
+        ngram_db = make_deterministic(ngram_db)
+
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(ngram_db, f, ensure_ascii=False, indent=2)
 
+    write_manifest(ngram_db, output_path)
+    return ngram_db
+
+
+def write_freq_map(unigram_probs: Dict[str, float], output_path: str,
+                   compact: bool = False) -> None:
+    """
+    Write freq_map.json (char → unigram probability) for the IME frontends.
+
+    Written by build_ngram.py as soon as unigram probabilities exist, so the
+    bigram tables are not needed to produce it.
+
+    Args:
+        unigram_probs: Dictionary of unigram probabilities
+        output_path: Output file path
+        compact: Minimal separators instead of indent=2
+
+    Raises:
+        IOError: If file cannot be written
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(unigram_probs, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(unigram_probs, f, ensure_ascii=False, indent=2)
+
 
 # ============================================================================
 # Validation
@@ -518,7 +666,8 @@ def prune_bigrams_by_threshold(
 
 def prune_bigrams_by_topk(
     bigram_counts: Dict[str, int],
-    topk: int
+    topk: int,
+    deterministic: bool = False
 ) -> Dict[str, int]:
     """
     Keep only top-K most frequent next characters for each character (Top-K Pruning).
@@ -530,6 +679,9 @@ def prune_bigrams_by_topk(
     Args:
         bigram_counts: Dictionary of {(char1, char2): count}
         topk: Number of top entries to keep per character (e.g., 10)
+        deterministic: Break count ties by next character. By default ties
+            keep table order, which depends on how the counts were gathered
+            (e.g. which pipeline batch finished first)
 
     Returns:
         Pruned bigram_counts dictionary
@@ -564,7 +716,10 @@ def prune_bigrams_by_topk(
     pruned = {}
     for char1, nexts in char_to_nexts.items():
         # Sort by count (descending) and take top K
-        sorted_nexts = sorted(nexts, key=lambda x: x[1], reverse=True)
+        if deterministic:
+            sorted_nexts = sorted(nexts, key=lambda x: (-x[1], x[0]))
+        else:
+            sorted_nexts = sorted(nexts, key=lambda x: x[1], reverse=True)
         top_k_nexts = sorted_nexts[:topk]
 
         # Reconstruct bigram entries
@@ -579,7 +734,8 @@ def apply_pruning(
     bigram_counts: Dict[str, int],
     threshold: int = 3,
     topk: int = 10,
-    verbose: bool = False
+    verbose: bool = False,
+    deterministic: bool = False
 ) -> Dict[str, int]:
     """
     Apply both threshold and top-K pruning to bigram counts.
@@ -593,6 +749,8 @@ def apply_pruning(
         threshold: Minimum count to keep (default: 3)
         topk: Number of top entries per character (default: 10)
         verbose: Print pruning statistics
+        deterministic: Break top-K count ties by character (see
+            prune_bigrams_by_topk())
 
     Returns:
         Pruned bigram_counts dictionary
@@ -618,7 +776,7 @@ def apply_pruning(
               f"(removed {removed:,}, {percent:.1f}%)")
 
     # Step 2: Top-K pruning
-    after_topk = prune_bigrams_by_topk(after_threshold, topk)
+    after_topk = prune_bigrams_by_topk(after_threshold, topk, deterministic=deterministic)
     final_count = len(after_topk)
 
     if verbose:
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Incremental Build Orchestrator for the Data Artifacts
+
+The data files form a dependency chain that used to be rebuilt by hand,
+one script at a time, always from scratch:
+
+    essay.txt ──▶ ngram_pruned.json ──▶ freq_map.json ──▶ dayi_db.json (+ indexes)
+                          └──────────────────────────────▶ bigram_lite.json
+    lite/data/dayi4.cin ──▶ lite/dayi_db.json
+
+Each step declares its commands, inputs, outputs, parameters and the source
+files that implement it (its code version). A step's key is the SHA-256 of
+all of these (inputs and code by content), and .build_state.json remembers
+the key and output hashes of the last successful run:
+
+- unchanged key and untouched outputs → skipped
+- steps whose dependencies are done run in parallel (--jobs)
+- a step whose inputs are unavailable (e.g. the raw corpus is not checked
+  out) keeps its existing outputs instead of failing
+- --dry-run reports what would rebuild and why, without running anything
+
+File hashes are cached by (size, mtime), so unchanged multi-MB inputs are
+not re-read on every run.
+
+Usage:
+    python converter/build_pipeline.py --dry-run
+    python converter/build_pipeline.py                  # rebuild what changed
+    python converter/build_pipeline.py mvp2_dayi_db -j 2
+    python converter/build_pipeline.py --list
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+STATE_FILENAME = '.build_state.json'
+STATE_VERSION = 1
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+# Step statuses
+REBUILD = 'rebuild'
+SKIP = 'skip'
+KEEP = 'keep'          # inputs unavailable, existing outputs kept
+BLOCKED = 'blocked'    # inputs unavailable and outputs missing, or upstream failed
+FAILED = 'failed'
+
+
+class BuildStep:
+    """
+    One declared build step.
+
+    Paths are relative to the pipeline root. An input that is another
+    step's output makes this step depend on that step.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        commands: Sequence[Sequence[str]],
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+        code: Sequence[str] = (),
+        params: Optional[Dict] = None
+    ):
+        """
+        Args:
+            name: Unique step name (used as a build target)
+            commands: argv lists, run in order from the pipeline root
+            inputs: Data files the step reads
+            outputs: Files the step writes
+            code: Source files whose content is the step's code version
+            params: Parameters baked into the commands (for reports and keys)
+        """
+        if not outputs:
+            raise ValueError(f"Step '{name}' declares no outputs")
+        self.name = name
+        self.commands = [list(command) for command in commands]
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = dict(params or {})
+
+
+class FileHasher:
+    """SHA-256 of files, cached by (size, mtime_ns) across runs."""
+
+    def __init__(self, root: str, cache: Optional[Dict] = None):
+        self.root = root
+        self.cache = cache if cache is not None else {}
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        """Content hash of a file, or None if it does not exist."""
+        path = os.path.join(self.root, rel_path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        cached = self.cache.get(rel_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        self.cache[rel_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+class BuildPipeline:
+    """
+    Content-addressed, parallel runner for a set of BuildSteps.
+
+    Example:
+        >>> pipeline = BuildPipeline(default_steps())
+        >>> [name for name, _, _ in pipeline.plan(['freq_map'])]
+        ['ngram', 'freq_map']
+    """
+
+    def __init__(self, steps: Iterable[BuildStep], root: str = REPO_ROOT,
+                 state_path: Optional[str] = None):
+        """
+        Args:
+            steps: Declared steps
+            root: Directory all step paths are relative to
+            state_path: Build state file (default: .build_state.json in root)
+
+        Raises:
+            ValueError: On duplicate names, outputs claimed twice, or cycles
+        """
+        self.root = root
+        self.state_path = state_path or os.path.join(root, STATE_FILENAME)
+        self.steps: Dict[str, BuildStep] = {}
+        producers: Dict[str, str] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            self.steps[step.name] = step
+            for output in step.outputs:
+                if output in producers:
+                    raise ValueError(f"Output {output} is produced by both "
+                                     f"'{producers[output]}' and '{step.name}'")
+                producers[output] = step.name
+
+        self.producers = producers
+        self.deps = {
+            name: sorted({producers[path] for path in step.inputs
+                          if path in producers and producers[path] != name})
+            for name, step in self.steps.items()
+        }
+        self.order = self._topological_order()
+
+        self.state = self._load_state()
+        self.hasher = FileHasher(root, self.state['files'])
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through step '{name}'")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return order
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('state_version') == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'state_version': STATE_VERSION, 'steps': {}, 'files': {}}
+
+    def _save_state(self) -> None:
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def select(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Steps needed for targets (all steps if None), in topological order.
+
+        Raises:
+            ValueError: On an unknown target
+        """
+        if not targets:
+            return list(self.order)
+
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.steps:
+                raise ValueError(f"Unknown step: {name} (known: {', '.join(self.order)})")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.deps[name])
+        return [name for name in self.order if name in needed]
+
+    def fingerprint(self, step: BuildStep) -> Dict:
+        """Everything that determines a step's outputs, with content hashes."""
+        return {
+            'commands': step.commands,
+            'params': step.params,
+            'inputs': {path: self.hasher.digest(path) for path in step.inputs},
+            'code': {path: self.hasher.digest(path) for path in step.code}
+        }
+
+    @staticmethod
+    def step_key(fingerprint: Dict) -> str:
+        """SHA-256 of a fingerprint."""
+        encoded = json.dumps(fingerprint, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def status(self, name: str, force: bool = False,
+               stale_deps: Iterable[str] = ()) -> Tuple[str, str]:
+        """
+        Decide what a step needs, given the files on disk now.
+
+        Args:
+            name: Step name
+            force: Rebuild even if up to date
+            stale_deps: Upstream steps that will rebuild first (dry runs)
+
+        Returns:
+            (status, reason) with status REBUILD, SKIP, KEEP or BLOCKED
+        """
+        step = self.steps[name]
+        stale = [dep for dep in self.deps[name] if dep in set(stale_deps)]
+        if stale:
+            return REBUILD, f"upstream rebuilds: {', '.join(stale)}"
+
+        fingerprint = self.fingerprint(step)
+        missing = [path for path, digest in fingerprint['inputs'].items() if digest is None]
+        if missing:
+            if all(self.hasher.digest(path) is not None for path in step.outputs):
+                return KEEP, f"inputs unavailable ({', '.join(missing)}), keeping outputs"
+            return BLOCKED, f"missing inputs: {', '.join(missing)}"
+
+        if force:
+            return REBUILD, 'forced'
+
+        record = self.state['steps'].get(name)
+        if record is None:
+            return REBUILD, 'no previous build'
+
+        if record['key'] != self.step_key(fingerprint):
+            previous = record.get('fingerprint', {})
+            changes = []
+            for section in ('inputs', 'code'):
+                changed = [path for path, digest in fingerprint[section].items()
+                           if previous.get(section, {}).get(path) != digest]
+                if changed:
+                    changes.append(f"{section} changed: {', '.join(changed)}")
+            for section in ('params', 'commands'):
+                if previous.get(section) != fingerprint[section]:
+                    changes.append(f"{section} changed")
+            return REBUILD, '; '.join(changes) or 'step definition changed'
+
+        for path in step.outputs:
+            digest = self.hasher.digest(path)
+            if digest is None:
+                return REBUILD, f"output missing: {path}"
+            if digest != record['outputs'].get(path):
+                return REBUILD, f"output modified: {path}"
+
+        return SKIP, 'up to date'
+
+    def plan(self, targets: Optional[Iterable[str]] = None,
+             force: bool = False) -> List[Tuple[str, str, str]]:
+        """
+        Dry run: (name, status, reason) per selected step, nothing executed.
+
+        A step downstream of a rebuild is reported as rebuilding, since its
+        inputs will change; one downstream of a blocked step is blocked.
+        """
+        report, stale, blocked = [], set(), set()
+        for name in self.select(targets):
+            upstream = [dep for dep in self.deps[name] if dep in blocked]
+            if upstream:
+                status, reason = BLOCKED, f"upstream not built: {', '.join(upstream)}"
+            else:
+                status, reason = self.status(name, force=force, stale_deps=stale)
+            if status == REBUILD:
+                stale.add(name)
+            elif status == BLOCKED:
+                blocked.add(name)
+            report.append((name, status, reason))
+        return report
+
+    def _execute(self, name: str) -> Tuple[bool, str, float]:
+        """Run a step's commands; returns (ok, combined output, seconds)."""
+        start = time.perf_counter()
+        logs = []
+        for command in self.steps[name].commands:
+            result = subprocess.run(command, cwd=self.root, capture_output=True, text=True)
+            logs.append(result.stdout + result.stderr)
+            if result.returncode != 0:
+                logs.append(f"Command failed ({result.returncode}): {' '.join(command)}\n")
+                return False, ''.join(logs), time.perf_counter() - start
+        return True, ''.join(logs), time.perf_counter() - start
+
+    def _record(self, name: str) -> None:
+        step = self.steps[name]
+        for path in step.outputs:
+            self.hasher.cache.pop(path, None)
+        fingerprint = self.fingerprint(step)
+        self.state['steps'][name] = {
+            'key': self.step_key(fingerprint),
+            'fingerprint': fingerprint,
+            'outputs': {path: self.hasher.digest(path) for path in step.outputs},
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        self._save_state()
+
+    def run(self, targets: Optional[Iterable[str]] = None, jobs: int = 1,
+            force: bool = False, verbose: bool = False) -> List[Dict]:
+        """
+        Build the selected steps, skipping unchanged ones.
+
+        A step starts once all its dependencies have finished; up to `jobs`
+        steps run at once. Steps downstream of a failed or blocked step are
+        blocked.
+
+        Returns:
+            One {'step', 'status', 'reason', 'seconds'} per selected step,
+            in completion order
+        """
+        selected = self.select(targets)
+        outcome: Dict[str, str] = {}
+        results: List[Dict] = []
+        running = {}
+
+        def finish(name, status, reason, seconds=0.0):
+            outcome[name] = status
+            results.append({'step': name, 'status': status, 'reason': reason,
+                            'seconds': round(seconds, 3)})
+            print(f"[{status:>7}] {name}: {reason}" +
+                  (f" ({seconds:.1f}s)" if seconds else ''))
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            pending = list(selected)
+            while pending or running:
+                for name in list(pending):
+                    deps = [dep for dep in self.deps[name] if dep in selected]
+                    if any(dep not in outcome for dep in deps):
+                        continue
+                    pending.remove(name)
+
+                    failed = [dep for dep in deps if outcome[dep] in (FAILED, BLOCKED)]
+                    if failed:
+                        finish(name, BLOCKED, f"upstream not built: {', '.join(failed)}")
+                        continue
+
+                    status, reason = self.status(name, force=force)
+                    if status != REBUILD:
+                        finish(name, status, reason)
+                        continue
+
+                    print(f"[  start] {name}: {reason}")
+                    running[executor.submit(self._execute, name)] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    ok, log, seconds = future.result()
+                    if verbose or not ok:
+                        for line in log.rstrip().splitlines():
+                            print(f"  {name} | {line}")
+                    if ok:
+                        self._record(name)
+                        finish(name, 'built', 'done', seconds)
+                    else:
+                        finish(name, FAILED, 'command failed', seconds)
+
+        self._save_state()
+        return results
+
+
+def default_steps(python: str = sys.executable) -> List[BuildStep]:
+    """The repository's data artifact chain."""
+    mvp2 = 'mvp2-predictive/data'
+    essay = 'converter/raw_data/essay.txt'
+    ngram = f'{mvp2}/ngram_pruned.json'
+    ngram_params = {'threshold': 3, 'topk': 10}
+
+    return [
+        # --deterministic pins generated_at too (SOURCE_DATE_EPOCH, else a fixed
+        # value), so an unchanged corpus rebuilds to identical bytes
+        BuildStep(
+            'ngram',
+            [[python, 'converter/build_ngram.py', '--input', essay, '--output', ngram,
+              '--enable-pruning', '--threshold', str(ngram_params['threshold']),
+              '--topk', str(ngram_params['topk']), '--deterministic']],
+            inputs=[essay],
+            outputs=[ngram],
+            code=['converter/build_ngram.py', 'converter/build_ngram_lib.py',
+                  'converter/model_manifest.py'],
+            params=ngram_params
+        ),
+        BuildStep(
+            'freq_map',
+            [[python, 'mvp2-predictive/scripts/generate_freq_map.py',
+              '--input', ngram, '--output', f'{mvp2}/freq_map.json']],
+            inputs=[ngram],
+            outputs=[f'{mvp2}/freq_map.json'],
+            code=['mvp2-predictive/scripts/generate_freq_map.py',
+                  'converter/build_ngram_lib.py', 'converter/model_manifest.py']
+        ),
+        BuildStep(
+            'mvp2_dayi_db',
+            [[python, 'mvp2-predictive/scripts/build_db.py',
+              '--cin', f'{mvp2}/dayi4.cin', '--freq-map', f'{mvp2}/freq_map.json',
+              '--output', f'{mvp2}/dayi_db.json', '--ngram', ngram]],
+            inputs=[f'{mvp2}/dayi4.cin', f'{mvp2}/freq_map.json', ngram],
+            outputs=[f'{mvp2}/dayi_db.json', f'{mvp2}/completion_index.json',
+                     f'{mvp2}/context_candidates.json'],
+            code=['mvp2-predictive/scripts/build_db.py', 'converter/cin_compiler.py',
+                  'converter/completion_index.py',
+                  'converter/context_candidates.py', 'converter/model_manifest.py']
+        ),
+        BuildStep(
+            'mvp2_bigram_lite',
+            [['node', 'mvp2-predictive/scripts/build_bigram.js'],
+             ['node', 'mvp2-predictive/scripts/fix_bigrams.js']],
+            inputs=[f'{mvp2}/dayi4.cin', ngram],
+            outputs=[f'{mvp2}/bigram_lite.json'],
+            code=['mvp2-predictive/scripts/build_bigram.js',
+                  'mvp2-predictive/scripts/fix_bigrams.js']
+        ),
+        BuildStep(
+            'lite_dayi_db',
+            [['node', 'converter/convert_cin.js']],
+            inputs=['lite/data/dayi4.cin'],
+            outputs=['lite/dayi_db.json'],
+            code=['converter/convert_cin.js']
+        ),
+    ]
+
+
+def print_plan(report: List[Tuple[str, str, str]]) -> None:
+    """Print a dry-run report."""
+    print("What would rebuild:")
+    for name, status, reason in report:
+        print(f"  [{status:>7}] {name}: {reason}")
+    rebuilds = sum(1 for _, status, _ in report if status == REBUILD)
+    print(f"{rebuilds} of {len(report)} steps would rebuild")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Incrementally rebuild the data artifacts (ngram → freq_map → dayi_db → bundles)'
+    )
+    parser.add_argument('targets', nargs='*', help='Steps to build, with their upstream steps (default: all)')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would rebuild and why')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Steps to run in parallel (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Rebuild selected steps even if up to date')
+    parser.add_argument('--state', help=f'Build state file (default: {STATE_FILENAME} in the repo root)')
+    parser.add_argument('--list', action='store_true', help='List steps and their dependencies')
+    parser.add_argument('--verbose', action='store_true', help='Show command output of successful steps')
+    args = parser.parse_args()
+
+    try:
+        pipeline = BuildPipeline(default_steps(), state_path=args.state)
+        selected = pipeline.select(args.targets)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.list:
+        for name in selected:
+            step = pipeline.steps[name]
+            deps = ', '.join(pipeline.deps[name]) or '-'
+            print(f"{name}  (after: {deps})")
+            for path in step.outputs:
+                print(f"    → {path}")
+        return
+
+    if args.dry_run:
+        print_plan(pipeline.plan(selected, force=args.force))
+        return
+
+    results = pipeline.run(selected, jobs=args.jobs, force=args.force, verbose=args.verbose)
+    failed = [r['step'] for r in results if r['status'] in (FAILED, BLOCKED)]
+    if failed:
+        print(f"Error: not built: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Incremental Build Orchestrator - Test Suite
+
+Categories:
+  1. Step Graph
+  2. Incremental Builds
+  3. Dry Run
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from build_pipeline import BuildStep, BuildPipeline, default_steps, REBUILD, SKIP, KEEP, BLOCKED
+
+
+# Copies (upper-cased) its first argument to the second, logging each run
+COPY_SCRIPT = """import sys
+with open(sys.argv[1], encoding='utf-8') as f:
+    text = f.read()
+with open(sys.argv[2], 'w', encoding='utf-8') as f:
+    f.write(text.upper())
+with open('runs.log', 'a', encoding='utf-8') as f:
+    f.write(sys.argv[2] + '\\n')
+"""
+
+
+def copy_step(name, source, target, **kwargs):
+    """Step running copy.py source → target."""
+    return BuildStep(name, [[sys.executable, 'copy.py', source, target]],
+                     inputs=[source], outputs=[target], code=['copy.py'], **kwargs)
+
+
+class PipelineTestCase(unittest.TestCase):
+    """Temporary root with copy.py and a source file."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.write('copy.py', COPY_SCRIPT)
+        self.write('src.txt', 'hello')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.root, rel_path), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.root, rel_path), encoding='utf-8') as f:
+            return f.read()
+
+    def runs(self):
+        path = os.path.join(self.root, 'runs.log')
+        if not os.path.exists(path):
+            return []
+        return self.read('runs.log').split()
+
+    def chain(self):
+        """src.txt → a.txt → b.txt, plus independent src.txt → c.txt."""
+        return [
+            copy_step('b', 'a.txt', 'b.txt'),
+            copy_step('a', 'src.txt', 'a.txt'),
+            copy_step('c', 'src.txt', 'c.txt', params={'mode': 1}),
+        ]
+
+    def pipeline(self, steps=None):
+        return BuildPipeline(steps or self.chain(), root=self.root)
+
+
+# ============================================================================
+# Category 1: Step Graph
+# ============================================================================
+
+class TestStepGraph(PipelineTestCase):
+    """Test dependency inference, target selection and validation."""
+
+    def test_dependencies_and_order(self):
+        """Test inputs produced by other steps become dependencies."""
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline.deps, {'a': [], 'b': ['a'], 'c': []})
+        self.assertEqual(pipeline.order, ['a', 'b', 'c'])
+        self.assertEqual(pipeline.select(['b']), ['a', 'b'])
+
+        with self.assertRaises(ValueError):
+            pipeline.select(['nope'])
+
+    def test_invalid_graphs(self):
+        """Test cycles and outputs claimed twice are rejected."""
+        with self.assertRaises(ValueError):
+            self.pipeline([copy_step('x', 'y.txt', 'x.txt'), copy_step('y', 'x.txt', 'y.txt')])
+        with self.assertRaises(ValueError):
+            self.pipeline([copy_step('x', 'src.txt', 'o.txt'), copy_step('y', 'src.txt', 'o.txt')])
+
+    def test_default_steps(self):
+        """Test the repository chain is acyclic and ordered ngram first."""
+        pipeline = BuildPipeline(default_steps(), root=self.root)
+        self.assertEqual(pipeline.order[0], 'ngram')
+        self.assertEqual(pipeline.deps['mvp2_dayi_db'], ['freq_map', 'ngram'])
+        self.assertIn('--deterministic', pipeline.steps['ngram'].commands[0])
+
+    def test_default_outputs_exist(self):
+        """Test every declared output of the repository chain is a checked-in file."""
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for step in default_steps():
+            for output in step.outputs:
+                self.assertTrue(os.path.exists(os.path.join(repo_root, output)), output)
+
+
+# ============================================================================
+# Category 2: Incremental Builds
+# ============================================================================
+
+class TestIncrementalBuilds(PipelineTestCase):
+    """Test skipping, content-based rebuilds, failures and parallel runs."""
+
+    def test_second_run_skips(self):
+        """Test an unchanged tree rebuilds nothing."""
+        self.pipeline().run(jobs=2)
+        self.assertEqual(self.read('b.txt'), 'HELLO')
+        self.assertEqual(sorted(self.runs()), ['a.txt', 'b.txt', 'c.txt'])
+
+        results = self.pipeline().run(jobs=2)
+        self.assertEqual({r['status'] for r in results}, {SKIP})
+        self.assertEqual(len(self.runs()), 3)
+
+    def test_content_not_mtime(self):
+        """Test touching a file with identical content does not rebuild."""
+        self.pipeline().run()
+        self.write('src.txt', 'hello')
+        os.utime(os.path.join(self.root, 'src.txt'), (1, 1))
+
+        self.assertEqual({r['status'] for r in self.pipeline().run()}, {SKIP})
+
+    def test_changes_propagate(self):
+        """Test input, code and output changes rebuild the right steps."""
+        self.pipeline().run()
+
+        self.write('src.txt', 'changed')
+        self.pipeline().run(['b'])
+        self.assertEqual(self.read('b.txt'), 'CHANGED')
+        self.assertEqual(self.runs()[-2:], ['a.txt', 'b.txt'])
+
+        self.write('b.txt', 'edited by hand')
+        status, reason = self.pipeline().status('b')
+        self.assertEqual((status, reason), (REBUILD, 'output modified: b.txt'))
+
+        self.write('copy.py', COPY_SCRIPT + '\n')
+        status, reason = self.pipeline().status('c')
+        self.assertEqual(status, REBUILD)
+        self.assertIn('code changed: copy.py', reason)
+
+    def test_missing_inputs(self):
+        """Test unavailable inputs keep existing outputs, or block downstream."""
+        self.pipeline().run()
+        os.remove(os.path.join(self.root, 'src.txt'))
+        statuses = {r['step']: r['status'] for r in self.pipeline().run()}
+        self.assertEqual(statuses, {'a': KEEP, 'b': SKIP, 'c': KEEP})
+
+        os.remove(os.path.join(self.root, 'a.txt'))
+        statuses = {r['step']: r['status'] for r in self.pipeline().run()}
+        self.assertEqual(statuses['a'], BLOCKED)
+        self.assertEqual(statuses['b'], BLOCKED)
+
+    def test_failure_blocks_dependents(self):
+        """Test a failing command is not recorded and blocks its dependents."""
+        steps = [
+            BuildStep('bad', [[sys.executable, '-c', 'raise SystemExit(3)']],
+                      inputs=['src.txt'], outputs=['bad.txt']),
+            copy_step('after', 'bad.txt', 'after.txt'),
+        ]
+        statuses = {r['step']: r['status'] for r in self.pipeline(steps).run()}
+        self.assertEqual(statuses, {'bad': 'failed', 'after': BLOCKED})
+        self.assertNotIn('bad', self.pipeline(steps).state['steps'])
+
+
+# ============================================================================
+# Category 3: Dry Run
+# ============================================================================
+
+class TestDryRun(PipelineTestCase):
+    """Test the "what would rebuild" report."""
+
+    def test_plan_reports_without_running(self):
+        """Test downstream steps of a change are reported and nothing runs."""
+        self.pipeline().run()
+        self.write('src.txt', 'changed')
+
+        report = self.pipeline().plan()
+        self.assertEqual([(name, status) for name, status, _ in report],
+                         [('a', REBUILD), ('b', REBUILD), ('c', REBUILD)])
+        self.assertIn('inputs changed: src.txt', report[0][2])
+        self.assertEqual(report[1][2], 'upstream rebuilds: a')
+        self.assertEqual(len(self.runs()), 3)
+        self.assertEqual(self.read('b.txt'), 'HELLO')
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestStepGraph))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalBuilds))
+    suite.addTests(loader.loadTestsFromTestCase(TestDryRun))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CIN Dictionary Compiler
+
+Compiles a CIN input-method table (dayi4.cin) into dayi_db.json and, in
+the same pass, the reverse char → codes index (char_codes.json):
+
+    {code: [{'char': ..., 'freq': ...}, ...]}   # candidates by freq, descending
+    {char: [code, ...]}                         # codes by length, then CIN order
+
+Shared by mvp2-predictive/scripts/build_db.py and the scripts/ CIN tools so
+the %chardef section is parsed in one place:
+
+- iter_cin_entries() streams (line number, code, char) from %chardef
+  without reading the whole file
+- compile_cin() groups entries per code with a seen-set per code (O(1)
+  duplicate checks), then attaches freq_map scores and sorts
+- compile_cin_tables() returns both tables from one parse
+- write_dayi_db() writes indented JSON or, with compact=True, minimal
+  separators (about 40% smaller for mvp2)
+- ReverseIndex answers "which codes type this char?" (teaching hints,
+  zhuyin cross-reference) with dict lookups instead of grepping the CIN
+
+Usage:
+    python cin_compiler.py --cin ../mvp2-predictive/data/dayi4.cin \\
+        --freq-map ../mvp2-predictive/data/freq_map.json \\
+        --output ../mvp2-predictive/data/dayi_db.json --compact \\
+        --reverse-index ../mvp2-predictive/data/char_codes.json
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Container, Dict, Iterator, List, Optional, Tuple
+
+from model_manifest import read_model_members
+
+
+CHARDEF_BEGIN = '%chardef begin'
+CHARDEF_END = '%chardef end'
+REVERSE_INDEX_FILENAME = 'char_codes.json'
+
+
+def iter_cin_entries(cin_path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Stream the %chardef entries of a CIN file.
+
+    Args:
+        cin_path: CIN file (UTF-8)
+
+    Yields:
+        (line_number, code, char) for every "code char" line inside
+        %chardef begin / %chardef end, in file order (1-based line numbers)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+
+    Example:
+        >>> next(iter_cin_entries('dayi4.cin'))
+        (53, ',', '力')
+    """
+    if not os.path.exists(cin_path):
+        raise FileNotFoundError(f"CIN file not found: {cin_path}")
+
+    in_chardef = False
+    with open(cin_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line == CHARDEF_BEGIN:
+                in_chardef = True
+                continue
+            if line == CHARDEF_END:
+                in_chardef = False
+                continue
+
+            if in_chardef:
+                parts = line.split()
+                if len(parts) >= 2:
+                    yield line_number, parts[0], parts[1]
+
+
+def load_freq_map(freq_path: Optional[str], chars: Container[str],
+                  verbose: bool = False) -> Dict[str, float]:
+    """
+    Load the freq_map.json (char → score) entries of the given chars;
+    missing or unreadable files give {}.
+
+    The file is streamed (model_manifest.read_model_members()), so entries
+    of chars outside the table are never decoded or kept.
+
+    Args:
+        freq_path: freq_map.json path, or None for no frequencies
+        chars: Characters whose scores are needed (a set or dict)
+        verbose: Print a warning when the file cannot be loaded
+    """
+    if not freq_path:
+        return {}
+    try:
+        return read_model_members(freq_path, chars)
+    except (OSError, ValueError) as e:
+        if verbose:
+            print(f"Warning: Could not load freq_map: {e}")
+        return {}
+
+
+def compile_cin_tables(
+    cin_path: str,
+    freq_path: Optional[str] = None,
+    verbose: bool = False
+) -> Tuple[Dict[str, List[Dict]], Dict[str, List[str]]]:
+    """
+    Compile a CIN file into dayi_db.json and its reverse index in one pass.
+
+    Duplicate (code, char) entries keep their first occurrence. Candidates
+    are sorted by freq_map score descending; ties (and chars without a
+    score, freq 0) keep CIN order. Each char's codes are sorted by length,
+    ties keeping CIN order, so the first code is the shortest way to type it.
+
+    Args:
+        cin_path: CIN file
+        freq_path: Optional freq_map.json (char → score); streamed after
+            parsing, and only scores of chars in the table are decoded
+        verbose: Print progress
+
+    Returns:
+        (code → [{'char', 'freq'}, ...], char → [code, ...])
+
+    Raises:
+        FileNotFoundError: If the CIN file does not exist
+    """
+    if verbose:
+        print(f"Parsing {cin_path}...")
+
+    codes: Dict[str, List[str]] = {}
+    char_codes: Dict[str, List[str]] = {}
+    seen: Dict[str, set] = {}
+    for _, code, char in iter_cin_entries(cin_path):
+        chars = codes.get(code)
+        if chars is None:
+            codes[code] = [char]
+            seen[code] = {char}
+        elif char not in seen[code]:
+            chars.append(char)
+            seen[code].add(char)
+        else:
+            continue
+        char_codes.setdefault(char, []).append(code)
+    del seen
+
+    if verbose:
+        print(f"Loading frequencies from {freq_path}...")
+    freq_map = load_freq_map(freq_path, char_codes, verbose=verbose)
+    freqs = {char: freq_map.get(char, 0) for char in char_codes}
+    del freq_map
+
+    if verbose:
+        print("Sorting candidates...")
+    db = {}
+    for code, chars in codes.items():
+        candidates = [{'char': char, 'freq': freqs[char]} for char in chars]
+        candidates.sort(key=lambda x: x['freq'], reverse=True)
+        db[code] = candidates
+
+    for char_code_list in char_codes.values():
+        char_code_list.sort(key=len)
+
+    return db, char_codes
+
+
+def compile_cin(
+    cin_path: str,
+    freq_path: Optional[str] = None,
+    verbose: bool = False
+) -> Dict[str, List[Dict]]:
+    """
+    Compile a CIN file into the dayi_db.json structure.
+
+    See compile_cin_tables() for ordering rules; the reverse index is dropped.
+
+    Raises:
+        FileNotFoundError: If the CIN file does not exist
+    """
+    db, _ = compile_cin_tables(cin_path, freq_path, verbose=verbose)
+    return db
+
+
+def write_dayi_db(db: Dict[str, List[Dict]], output_path: str, compact: bool = False) -> None:
+    """
+    Write dayi_db.json.
+
+    Args:
+        db: Code → candidates
+        output_path: Output file
+        compact: Minimal separators instead of indent=2
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(db, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(db, f, ensure_ascii=False, indent=2)
+
+
+def reverse_index_path(dayi_db_path: str) -> str:
+    """Default reverse index location: char_codes.json beside the dictionary."""
+    return os.path.join(os.path.dirname(dayi_db_path), REVERSE_INDEX_FILENAME)
+
+
+def write_reverse_index(char_codes: Dict[str, List[str]], output_path: str,
+                        compact: bool = False) -> None:
+    """
+    Write the reverse index (char → codes) as JSON.
+
+    Args:
+        char_codes: Char → codes, as returned by compile_cin_tables()
+        output_path: Output file
+        compact: Minimal separators instead of indent=2
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(char_codes, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(char_codes, f, ensure_ascii=False, indent=2)
+
+
+class ReverseIndex:
+    """
+    Char → Dayi codes lookup for Python tools.
+
+    Example:
+        >>> index = ReverseIndex({'明': ['dj'], '大': ['v', 'vv']})
+        >>> index.codes('大'), index.shortest('明'), index.shortest('?')
+        (['v', 'vv'], 'dj', None)
+        >>> index.lookup('明大')
+        [('明', ['dj']), ('大', ['v', 'vv'])]
+    """
+
+    def __init__(self, char_codes: Dict[str, List[str]]):
+        self.char_codes = char_codes
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'ReverseIndex':
+        """Load an index written by write_reverse_index()."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Reverse index not found: {file_path}")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_cin(cls, cin_path: str) -> 'ReverseIndex':
+        """Build the index straight from a CIN file."""
+        _, char_codes = compile_cin_tables(cin_path)
+        return cls(char_codes)
+
+    def codes(self, char: str) -> List[str]:
+        """Codes that type char, shortest first ([] if none)."""
+        return self.char_codes.get(char, [])
+
+    def shortest(self, char: str) -> Optional[str]:
+        """Shortest code for char, or None."""
+        codes = self.char_codes.get(char)
+        return codes[0] if codes else None
+
+    def lookup(self, text: str) -> List[Tuple[str, List[str]]]:
+        """(char, codes) for every char of text, in order."""
+        return [(char, self.codes(char)) for char in text]
+
+    def __contains__(self, char: str) -> bool:
+        return char in self.char_codes
+
+    def __len__(self) -> int:
+        return len(self.char_codes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compile a CIN table (dayi4.cin) into dayi_db.json'
+    )
+    parser.add_argument('--cin', required=True, help='CIN file (dayi4.cin)')
+    parser.add_argument('--freq-map', help='freq_map.json (char → score) for candidate order')
+    parser.add_argument('--output', required=True, help='dayi_db.json output path')
+    parser.add_argument('--compact', action='store_true',
+                        help='Write compact JSON (no indentation)')
+    parser.add_argument('--reverse-index', help='Also write the char → codes index to this path')
+    args = parser.parse_args()
+
+    try:
+        db, char_codes = compile_cin_tables(args.cin, args.freq_map, verbose=True)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Saving to {args.output}...")
+    write_dayi_db(db, args.output, compact=args.compact)
+    if args.reverse_index:
+        print(f"Saving reverse index to {args.reverse_index}...")
+        write_reverse_index(char_codes, args.reverse_index, compact=args.compact)
+    print(f"Done. Total codes: {len(db)}, chars: {len(char_codes)}")
+
+
+if __name__ == '__main__':
+    main()
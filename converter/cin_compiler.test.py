@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CIN Dictionary Compiler - Test Suite
+
+Categories:
+  1. Parsing & Compilation
+  2. Reverse Index
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from cin_compiler import (
+    iter_cin_entries,
+    compile_cin,
+    compile_cin_tables,
+    load_freq_map,
+    write_dayi_db,
+    write_reverse_index,
+    reverse_index_path,
+    ReverseIndex
+)
+
+
+TEST_CIN = """# comment
+%ename test
+%keyname begin
+a 人
+%keyname end
+%chardef begin
+a 大
+a 人
+a 大
+ad 在
+v 夫
+v 大
+
+%chardef end
+zz 外
+"""
+
+
+# ============================================================================
+# Category 1: Parsing & Compilation
+# ============================================================================
+
+class TestParsingAndCompilation(unittest.TestCase):
+    """Test %chardef streaming, dedup, frequency order and output modes."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cin = os.path.join(self.tmp_dir, 'test.cin')
+        self.freq_map = os.path.join(self.tmp_dir, 'freq_map.json')
+        with open(self.cin, 'w', encoding='utf-8') as f:
+            f.write(TEST_CIN)
+        with open(self.freq_map, 'w', encoding='utf-8') as f:
+            json.dump({'大': 0.5, '人': 0.7, '在': 0.1}, f, ensure_ascii=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_only_chardef_entries(self):
+        """Test keyname lines and lines after %chardef end are skipped."""
+        entries = list(iter_cin_entries(self.cin))
+        self.assertEqual(entries[0], (7, 'a', '大'))
+        self.assertEqual([code for _, code, _ in entries], ['a', 'a', 'a', 'ad', 'v', 'v'])
+
+    def test_dedup_and_frequency_order(self):
+        """Test duplicates collapse and candidates sort by freq, ties in CIN order."""
+        db = compile_cin(self.cin, self.freq_map)
+        self.assertEqual(db['a'], [{'char': '人', 'freq': 0.7}, {'char': '大', 'freq': 0.5}])
+        self.assertEqual([c['char'] for c in db['v']], ['大', '夫'])
+        self.assertEqual(db['v'][1]['freq'], 0)
+
+    def test_freq_map_streamed_for_table_chars(self):
+        """Test scores are read for the table's chars only, escaped or not."""
+        with open(self.freq_map, 'w', encoding='utf-8') as f:
+            json.dump({'的': 0.9, '大': 0.5, '人': 0.7, '在': 0.1}, f)  # ensure_ascii
+        self.assertEqual(load_freq_map(self.freq_map, {'大', '人', '夫'}), {'大': 0.5, '人': 0.7})
+        db = compile_cin(self.cin, self.freq_map)
+        self.assertEqual(db['a'], [{'char': '人', 'freq': 0.7}, {'char': '大', 'freq': 0.5}])
+
+    def test_without_freq_map(self):
+        """Test a missing freq map keeps CIN order with freq 0."""
+        db = compile_cin(self.cin, os.path.join(self.tmp_dir, 'missing.json'))
+        self.assertEqual([c['char'] for c in db['a']], ['大', '人'])
+
+    def test_compact_output(self):
+        """Test compact and indented outputs hold the same data."""
+        db = compile_cin(self.cin, self.freq_map)
+        indented = os.path.join(self.tmp_dir, 'indented.json')
+        compact = os.path.join(self.tmp_dir, 'compact.json')
+        write_dayi_db(db, indented)
+        write_dayi_db(db, compact, compact=True)
+
+        with open(indented, encoding='utf-8') as a, open(compact, encoding='utf-8') as b:
+            self.assertEqual(json.load(a), json.load(b))
+        self.assertLess(os.path.getsize(compact), os.path.getsize(indented))
+
+    def test_missing_cin(self):
+        """Test a missing CIN file raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            compile_cin(os.path.join(self.tmp_dir, 'nope.cin'))
+
+
+# ============================================================================
+# Category 2: Reverse Index
+# ============================================================================
+
+class TestReverseIndex(unittest.TestCase):
+    """Test the char → codes index built alongside dayi_db."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cin = os.path.join(self.tmp_dir, 'test.cin')
+        with open(self.cin, 'w', encoding='utf-8') as f:
+            f.write(TEST_CIN.replace('v 大\n', 'vvb 大\nv 大\n'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_codes_sorted_by_length(self):
+        """Test each char lists its distinct codes, shortest first, ties in CIN order."""
+        db, char_codes = compile_cin_tables(self.cin)
+        self.assertEqual(char_codes, {'大': ['a', 'v', 'vvb'], '人': ['a'], '在': ['ad'], '夫': ['v']})
+        self.assertEqual(db, compile_cin(self.cin))
+
+    def test_lookup_api(self):
+        """Test ReverseIndex lookups and the file round trip."""
+        _, char_codes = compile_cin_tables(self.cin)
+        path = reverse_index_path(os.path.join(self.tmp_dir, 'dayi_db.json'))
+        write_reverse_index(char_codes, path, compact=True)
+
+        index = ReverseIndex.from_file(path)
+        self.assertEqual(index.codes('大'), ['a', 'v', 'vvb'])
+        self.assertEqual(index.shortest('在'), 'ad')
+        self.assertIsNone(index.shortest('外'))
+        self.assertEqual(index.lookup('夫外'), [('夫', ['v']), ('外', [])])
+        self.assertIn('人', index)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(ReverseIndex.from_cin(self.cin).char_codes, char_codes)
+
+        with self.assertRaises(FileNotFoundError):
+            ReverseIndex.from_file(os.path.join(self.tmp_dir, 'nope.json'))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestParsingAndCompilation))
+    suite.addTests(loader.loadTestsFromTestCase(TestReverseIndex))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Code Ambiguity Index
+
+Most full-length Dayi codes map to exactly one character (15,480 of the
+16,918 codes in mvp2-predictive/dayi_db.json). A position typed with such
+a code needs no search: the decoder can fix it as an anchor and split the
+sentence into independent segments around it.
+
+The index is produced next to dayi_db.json when the dictionary is built:
+
+    {
+      "candidate_counts": {code: number of distinct candidate chars},
+      "unique_codes": [codes with exactly one candidate, sorted],
+      "stats": {"codes", "unique_codes", "max_candidates", "mean_candidates"}
+    }
+
+Usage:
+    python code_ambiguity.py mvp2-predictive/dayi_db.json
+    python code_ambiguity.py dayi_db.json --output code_ambiguity.json
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+
+AMBIGUITY_INDEX_FILENAME = 'code_ambiguity.json'
+
+
+def build_ambiguity_index(dayi_db: Dict[str, List[Dict]]) -> Dict:
+    """
+    Count distinct candidates per code.
+
+    Args:
+        dayi_db: Code → [{'char', 'freq'}, ...] (dayi_db.json format)
+
+    Returns:
+        {'candidate_counts', 'unique_codes', 'stats'} (see module docstring)
+
+    Example:
+        >>> index = build_ambiguity_index({'a': [{'char': '大'}], 'b': [{'char': '人'}, {'char': '入'}]})
+        >>> index['unique_codes'], index['candidate_counts']['b']
+        (['a'], 2)
+    """
+    candidate_counts = {
+        code: len({candidate['char'] for candidate in candidates})
+        for code, candidates in sorted(dayi_db.items())
+    }
+    unique_codes = [code for code, count in candidate_counts.items() if count == 1]
+
+    return {
+        'candidate_counts': candidate_counts,
+        'unique_codes': unique_codes,
+        'stats': {
+            'codes': len(candidate_counts),
+            'unique_codes': len(unique_codes),
+            'max_candidates': max(candidate_counts.values(), default=0),
+            'mean_candidates': (sum(candidate_counts.values()) / len(candidate_counts)
+                                if candidate_counts else 0.0)
+        }
+    }
+
+
+def ambiguity_index_path(dayi_db_path: str) -> str:
+    """Default index location: code_ambiguity.json beside the dictionary."""
+    return os.path.join(os.path.dirname(dayi_db_path), AMBIGUITY_INDEX_FILENAME)
+
+
+def write_ambiguity_index(index: Dict, output_path: str) -> None:
+    """Write the index as compact JSON (a runtime table, like completion_index.json)."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_ambiguity_index(file_path: str) -> Dict:
+    """Load an index written by write_ambiguity_index()."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the code ambiguity index (candidate counts, unique codes) for a dayi_db.json'
+    )
+    parser.add_argument('dayi_db', help='dayi_db.json (code → candidates)')
+    parser.add_argument('--output', help=f'Index path (default: {AMBIGUITY_INDEX_FILENAME} beside dayi_db)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dayi_db):
+        print(f"Error: File not found: {args.dayi_db}", file=sys.stderr)
+        sys.exit(1)
+
+    with open(args.dayi_db, 'r', encoding='utf-8') as f:
+        index = build_ambiguity_index(json.load(f))
+
+    output_path = args.output or ambiguity_index_path(args.dayi_db)
+    write_ambiguity_index(index, output_path)
+
+    stats = index['stats']
+    print(f"[Ambiguity] {stats['unique_codes']:,} of {stats['codes']:,} codes are unique "
+          f"(max {stats['max_candidates']}, mean {stats['mean_candidates']:.2f} candidates)")
+    print(f"[Ambiguity] Written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Code Ambiguity Index - Test Suite
+
+Categories:
+  1. Index Construction
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+from code_ambiguity import (
+    build_ambiguity_index,
+    ambiguity_index_path,
+    write_ambiguity_index,
+    load_ambiguity_index
+)
+
+
+TEST_DAYI_DB = {
+    '4jp': [{'char': '易', 'freq': 80}, {'char': '義', 'freq': 70}],
+    'ad': [{'char': '在', 'freq': 90}],
+    'v': [{'char': '大', 'freq': 100}, {'char': '大', 'freq': 60}],
+}
+
+
+# ============================================================================
+# Category 1: Index Construction
+# ============================================================================
+
+class TestIndexConstruction(unittest.TestCase):
+    """Test candidate counts and unique codes."""
+
+    def test_counts_distinct_chars(self):
+        """Test duplicate candidates count once, so 'v' is unique."""
+        index = build_ambiguity_index(TEST_DAYI_DB)
+        self.assertEqual(index['candidate_counts'], {'4jp': 2, 'ad': 1, 'v': 1})
+        self.assertEqual(index['unique_codes'], ['ad', 'v'])
+        self.assertEqual(index['stats']['max_candidates'], 2)
+
+    def test_round_trip(self):
+        """Test the index is written beside the dictionary and loads back."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = ambiguity_index_path(os.path.join(tmp_dir, 'dayi_db.json'))
+            self.assertEqual(os.path.dirname(path), tmp_dir)
+
+            index = build_ambiguity_index(TEST_DAYI_DB)
+            write_ambiguity_index(index, path)
+            self.assertEqual(load_ambiguity_index(path), index)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestIndexConstruction))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
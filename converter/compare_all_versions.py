@@ -8,11 +8,23 @@ Compares all experimental versions to identify the optimal configuration:
 - v1.1-smoothed: threshold=2, topk=40 (with Laplace smoothing - Action 1)
 - v1.2-strict: threshold=2, topk=40, strict cleaning (Action 1 + Action 2)
 - v1.3-formal: threshold=2, topk=40, strict cleaning, 80:20 ratio (Action 1 + Action 2 + Action 3)
+
+Models are read through their metadata-only headers (model_manifest.py),
+so the tables below never parse the multi-MB count tables.
+
+Usage:
+    python compare_all_versions.py                     # Full version comparison
+    python compare_all_versions.py inspect mvp1/*.json # Fast version table
 """
 
+import argparse
+import glob
 import json
 import os
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
+
+from model_manifest import read_model_header, write_manifest
 
 
 def load_model(file_path: str) -> Dict:
@@ -24,6 +36,11 @@ def load_model(file_path: str) -> Dict:
         return json.load(f)
 
 
+def load_model_header(file_path: str) -> Optional[Dict]:
+    """Load a model's metadata-only header (see model_manifest.read_model_header)."""
+    return read_model_header(file_path, allow_full_load=True)
+
+
 def get_file_size_mb(file_path: str) -> float:
     """Get file size in MB."""
     if not os.path.exists(file_path):
@@ -31,23 +48,23 @@ def get_file_size_mb(file_path: str) -> float:
     return os.path.getsize(file_path) / (1024 * 1024)
 
 
-def analyze_model(model: Dict, name: str) -> Dict:
-    """Extract key statistics from model."""
-    if model is None:
+def analyze_model(header: Dict, name: str) -> Dict:
+    """Extract key statistics from a model header (model_manifest.model_header)."""
+    if header is None:
         return None
 
     stats = {
         'name': name,
-        'unigrams': len(model.get('unigram_counts', {})),
-        'bigrams': len(model.get('bigram_counts', {})),
-        'has_smoothing': 'smoothing_alpha' in model,
-        'smoothing_alpha': model.get('smoothing_alpha', None),
-        'total_chars': model.get('total_chars', None),
-        'vocab_size': model.get('vocab_size', None),
+        'unigrams': header.get('unigrams') or 0,
+        'bigrams': header.get('bigrams') or 0,
+        'has_smoothing': header.get('smoothing_alpha') is not None,
+        'smoothing_alpha': header.get('smoothing_alpha', None),
+        'total_chars': header.get('total_chars', None),
+        'vocab_size': header.get('vocab_size', None),
     }
 
     # Extract metadata
-    metadata = model.get('metadata', {})
+    metadata = header.get('metadata', {})
     stats['version'] = metadata.get('version', 'unknown')
 
     # Extract corpus weights
@@ -75,12 +92,12 @@ def print_comparison_table(versions: List[Tuple[str, str, str]]):
     print("="*100)
     print()
 
-    # Load all models
+    # Load all model headers
     models = []
     for file_path, name, description in versions:
-        model = load_model(file_path)
-        if model:
-            stats = analyze_model(model, name)
+        header = load_model_header(file_path)
+        if header:
+            stats = analyze_model(header, name)
             stats['file_path'] = file_path
             stats['description'] = description
             stats['file_size_mb'] = get_file_size_mb(file_path)
@@ -245,8 +262,73 @@ def print_comparison_table(versions: List[Tuple[str, str, str]]):
     print()
 
 
+def inspect_models(file_paths: List[str], write_manifests: bool = False) -> None:
+    """
+    Print a one-line-per-model version table from metadata-only headers.
+
+    Args:
+        file_paths: Model JSON files
+        write_manifests: Fully load models that have no fresh manifest once
+            and write one, so the next inspect is instant
+    """
+    started = time.perf_counter()
+
+    print(f"{'Model':<40} {'Version':<14} {'Size MB':>8} {'Unigrams':>10} {'Bigrams':>10} "
+          f"{'Alpha':>6} {'Thr':>4} {'TopK':>5} {'Source':>9}")
+    print("-" * 112)
+
+    for file_path in file_paths:
+        if write_manifests:
+            header = read_model_header(file_path)
+            if header is None or header['source'] != 'manifest':
+                model = load_model(file_path)
+                write_manifest(model, file_path)
+                header = read_model_header(file_path)
+        else:
+            header = load_model_header(file_path)
+
+        if header is None:
+            print(f"{file_path:<40} (not found)")
+            continue
+
+        stats = analyze_model(header, file_path)
+
+        def fmt(value, spec=''):
+            return 'N/A' if value is None else format(value, spec)
+
+        print(f"{file_path:<40} {stats['version']:<14} {get_file_size_mb(file_path):>8.2f} "
+              f"{fmt(header.get('unigrams'), ','):>10} {fmt(header.get('bigrams'), ','):>10} "
+              f"{fmt(stats['smoothing_alpha']):>6} {fmt(stats['threshold']):>4} "
+              f"{fmt(stats['topk']):>5} {header['source']:>9}")
+
+    print("-" * 112)
+    print(f"{len(file_paths)} model(s) inspected in {time.perf_counter() - started:.3f}s")
+
+
 def main():
     """Main comparison."""
+    parser = argparse.ArgumentParser(description='Compare blended N-gram model versions')
+    subparsers = parser.add_subparsers(dest='command')
+
+    inspect_parser = subparsers.add_parser(
+        'inspect', help='Fast version table from model metadata only'
+    )
+    inspect_parser.add_argument(
+        'models', nargs='*',
+        help='Model JSON files (default: mvp1/ngram*.json)'
+    )
+    inspect_parser.add_argument(
+        '--write-manifests', action='store_true',
+        help='Write manifests for models that lack a fresh one (one full load each)'
+    )
+
+    args = parser.parse_args()
+
+    if args.command == 'inspect':
+        model_paths = args.models or sorted(glob.glob('mvp1/ngram*.json'))
+        model_paths = [p for p in model_paths if not p.endswith('.manifest.json')]
+        inspect_models(model_paths, write_manifests=args.write_manifests)
+        return
 
     versions = [
         ('mvp1/ngram_blended_v1.1.json', 'v1.1', 'Baseline (70:30, no smoothing, lenient cleaning)'),
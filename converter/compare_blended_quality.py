@@ -14,6 +14,8 @@ import json
 import sys
 from typing import Dict, List, Tuple
 
+from ngram_index import SuccessorIndex
+
 
 # ============================================================================
 # Test Phrases by Category
@@ -93,7 +95,7 @@ def load_ngram_db(filepath: str) -> Dict:
 
 
 def get_top_next_chars(
-    db: Dict,
+    index: SuccessorIndex,
     char: str,
     top_n: int = 10
 ) -> List[Tuple[str, float]]:
@@ -101,26 +103,14 @@ def get_top_next_chars(
     Get top N most likely next characters for a given character.
 
     Args:
-        db: N-gram database
+        index: Successor index over the model's bigram_counts
         char: Current character
         top_n: Number of top predictions to return
 
     Returns:
         List of (next_char, score) tuples sorted by score descending
     """
-    bigram_counts = db.get('bigram_counts', {})
-
-    # Find all bigrams starting with char
-    candidates = []
-    for bigram, count in bigram_counts.items():
-        if len(bigram) >= 2 and bigram[0] == char:
-            next_char = bigram[1]
-            candidates.append((next_char, count))
-
-    # Sort by count descending
-    candidates.sort(key=lambda x: x[1], reverse=True)
-
-    return candidates[:top_n]
+    return index.top(char, top_n)
 
 
 # ============================================================================
@@ -129,13 +119,19 @@ def get_top_next_chars(
 
 def compare_phrase_predictions(
     phrase: str,
-    rime_db: Dict,
-    blended_db: Dict,
+    rime_index: SuccessorIndex,
+    blended_index: SuccessorIndex,
     verbose: bool = False
 ) -> Tuple[int, int, int, int]:
     """
     Compare predictions for a single phrase between two models.
 
+    Args:
+        phrase: Test phrase
+        rime_index: Successor index of the rime-only model
+        blended_index: Successor index of the blended model
+        verbose: Print per-transition ranks
+
     Returns:
         (rime_matches, rime_partial, blended_matches, blended_partial)
     """
@@ -156,8 +152,8 @@ def compare_phrase_predictions(
 
         # Get predictions from both models
         # Changed from top_n=10 to top_n=40 to match v1.1/v1.2 topk parameter
-        rime_top = get_top_next_chars(rime_db, char1, top_n=40)
-        blended_top = get_top_next_chars(blended_db, char1, top_n=40)
+        rime_top = get_top_next_chars(rime_index, char1, top_n=40)
+        blended_top = get_top_next_chars(blended_index, char1, top_n=40)
 
         rime_chars = [c for c, _ in rime_top]
         blended_chars = [c for c, _ in blended_top]
@@ -192,8 +188,8 @@ def compare_phrase_predictions(
 def compare_category(
     category_name: str,
     phrases: List[str],
-    rime_db: Dict,
-    blended_db: Dict,
+    rime_index: SuccessorIndex,
+    blended_index: SuccessorIndex,
     verbose: bool = False
 ) -> Dict:
     """
@@ -218,7 +214,7 @@ def compare_category(
             continue
 
         r_m, r_p, b_m, b_p = compare_phrase_predictions(
-            phrase, rime_db, blended_db, verbose=verbose
+            phrase, rime_index, blended_index, verbose=verbose
         )
 
         rime_matches += r_m
@@ -296,30 +292,34 @@ def main():
     print(f"Blended:   {len(blended_db.get('unigram_counts', {})):,} unigrams, "
           f"{len(blended_db.get('bigram_counts', {})):,} bigrams")
 
+    # Index successors once per model (not once per query)
+    rime_index = SuccessorIndex.from_model(rime_db)
+    blended_index = SuccessorIndex.from_model(blended_db)
+
     # Compare categories
     results = []
 
     results.append(compare_category(
         "Formal Writing",
         FORMAL_PHRASES,
-        rime_db,
-        blended_db,
+        rime_index,
+        blended_index,
         verbose=verbose
     ))
 
     results.append(compare_category(
         "Chat/Colloquial",
         CHAT_PHRASES,
-        rime_db,
-        blended_db,
+        rime_index,
+        blended_index,
         verbose=verbose
     ))
 
     results.append(compare_category(
         "Mixed Context",
         MIXED_PHRASES,
-        rime_db,
-        blended_db,
+        rime_index,
+        blended_index,
         verbose=verbose
     ))
 
@@ -11,12 +11,15 @@ maintain 80-90% accuracy for everyday usage.
 Usage:
     python compare_ngram_quality.py
     python compare_ngram_quality.py --original mvp1/ngram_db.json --pruned mvp1/ngram_pruned.json
+    python compare_ngram_quality.py --phrases phrases.txt
 """
 
 import json
 import argparse
 from typing import Dict, List, Tuple
 
+from ngram_index import SuccessorIndex
+
 
 def load_ngram_db(filepath: str) -> Dict:
     """Load N-gram database from JSON file."""
@@ -24,30 +27,30 @@ def load_ngram_db(filepath: str) -> Dict:
         return json.load(f)
 
 
-def get_top_next_chars(ngram_db: Dict, char: str, top_n: int = 10) -> List[Tuple[str, float]]:
+def build_successor_index(ngram_db: Dict) -> SuccessorIndex:
+    """Index the database's bigram probabilities once per loaded model."""
+    return SuccessorIndex.from_model(ngram_db, key='bigrams')
+
+
+def get_top_next_chars(index: SuccessorIndex, char: str, top_n: int = 10) -> List[Tuple[str, float]]:
     """
     Get top N most likely next characters for a given character.
 
     Args:
-        ngram_db: N-gram database
+        index: Successor index of an N-gram database (build_successor_index)
         char: Input character
         top_n: Number of top results to return
 
     Returns:
         List of (next_char, probability) tuples, sorted by probability descending
     """
-    bigrams = ngram_db.get('bigrams', {})
+    return index.top(char, top_n)
 
-    # Find all bigrams starting with this character
-    candidates = []
-    for bigram, prob in bigrams.items():
-        if bigram.startswith(char) and len(bigram) == 2:
-            next_char = bigram[1]
-            candidates.append((next_char, prob))
 
-    # Sort by probability (descending) and return top N
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    return candidates[:top_n]
+def load_test_phrases(filepath: str) -> List[str]:
+    """Load test phrases from a text file (one phrase per line)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if len(line.strip()) >= 2]
 
 
 def compare_predictions(
@@ -72,6 +75,9 @@ def compare_predictions(
     partial_matches = 0
     misses = 0
 
+    original_index = build_successor_index(original_db)
+    pruned_index = build_successor_index(pruned_db)
+
     if verbose:
         print("\n" + "=" * 80)
         print("PREDICTION COMPARISON")
@@ -87,8 +93,8 @@ def compare_predictions(
             char2 = phrase[i + 1]  # Actual next character
 
             # Get predictions from both databases
-            original_top = get_top_next_chars(original_db, char1, top_n=10)
-            pruned_top = get_top_next_chars(pruned_db, char1, top_n=10)
+            original_top = get_top_next_chars(original_index, char1, top_n=10)
+            pruned_top = get_top_next_chars(pruned_index, char1, top_n=10)
 
             # Extract just the characters (without probabilities)
             original_chars = [c for c, _ in original_top]
@@ -148,6 +154,11 @@ def main():
         help='Pruned N-gram database'
     )
 
+    parser.add_argument(
+        '--phrases',
+        help='Text file of test phrases, one per line (default: built-in list)'
+    )
+
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -200,7 +211,10 @@ def main():
         "非常好"
     ]
 
-    print(f"\nTesting with {len(test_phrases)} phrases...")
+    if args.phrases:
+        test_phrases = load_test_phrases(args.phrases)
+
+    print(f"\nTesting with {len(test_phrases):,} phrases...")
 
     matches, partial, misses = compare_predictions(
         original_db,
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Code Completion Index
+
+mvp2's PredictionEngine.getExtendedCandidates() answers "which chars have a
+code that extends this buffer?" by scanning every key of dayi_db.json on
+each keystroke. The set of proper prefixes is small (7,356 for mvp2), so
+the dictionary build precomputes the answer for each of them:
+
+    {
+      "top_n": null,              # per-prefix cap used for the build (null = all)
+      "prefixes": {prefix: [[char, code], ...]},   # freq descending
+      "stats": {"prefixes", "entries", "max_entries"}
+    }
+
+Each list holds the (char, code) pairs of every code strictly longer than
+the prefix, ranked by freq_map score (ties keep code order). Rare chars stay
+in the tail so user-history boosts still see them; pass top_n to trade that
+for a smaller file.
+
+Usage:
+    python completion_index.py mvp2-predictive/data/dayi_db.json
+    python completion_index.py dayi_db.json --top-n 64 --output completion_index.json
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+
+COMPLETION_INDEX_FILENAME = 'completion_index.json'
+
+
+def build_completion_index(
+    dayi_db: Dict[str, List[Dict]],
+    top_n: Optional[int] = None
+) -> Dict:
+    """
+    Collect the ranked completion candidates of every proper code prefix.
+
+    Args:
+        dayi_db: Code → [{'char', 'freq'}, ...] (dayi_db.json format)
+        top_n: Keep at most this many entries per prefix (None = all)
+
+    Returns:
+        {'top_n', 'prefixes', 'stats'} (see module docstring)
+
+    Raises:
+        ValueError: If top_n is not positive
+
+    Example:
+        >>> db = {'a': [{'char': '大', 'freq': 0.5}], 'ab': [{'char': '天', 'freq': 0.1}],
+        ...       'ac': [{'char': '夫', 'freq': 0.2}]}
+        >>> build_completion_index(db)['prefixes']
+        {'a': [['夫', 'ac'], ['天', 'ab']]}
+    """
+    if top_n is not None and top_n <= 0:
+        raise ValueError(f"top_n must be positive, got {top_n}")
+
+    ranked: Dict[str, List] = {}
+    for code in sorted(dayi_db):
+        for candidate in dayi_db[code]:
+            entry = (candidate.get('freq', 0), candidate['char'], code)
+            for i in range(1, len(code)):
+                ranked.setdefault(code[:i], []).append(entry)
+
+    prefixes = {}
+    for prefix in sorted(ranked):
+        entries = ranked[prefix]
+        entries.sort(key=lambda e: e[0], reverse=True)
+        if top_n is not None:
+            entries = entries[:top_n]
+        prefixes[prefix] = [[char, code] for _, char, code in entries]
+
+    sizes = [len(entries) for entries in prefixes.values()]
+    return {
+        'top_n': top_n,
+        'prefixes': prefixes,
+        'stats': {
+            'prefixes': len(prefixes),
+            'entries': sum(sizes),
+            'max_entries': max(sizes, default=0)
+        }
+    }
+
+
+def completion_index_path(dayi_db_path: str) -> str:
+    """Default index location: completion_index.json beside the dictionary."""
+    return os.path.join(os.path.dirname(dayi_db_path), COMPLETION_INDEX_FILENAME)
+
+
+def write_completion_index(index: Dict, output_path: str) -> None:
+    """Write the index as compact JSON (it is fetched by the web app)."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_completion_index(file_path: str) -> Dict:
+    """Load an index written by write_completion_index()."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the code completion index (prefix → ranked candidates) for a dayi_db.json'
+    )
+    parser.add_argument('dayi_db', help='dayi_db.json (code → candidates)')
+    parser.add_argument('--top-n', type=int, help='Keep at most N candidates per prefix (default: all)')
+    parser.add_argument('--output', help=f'Index path (default: {COMPLETION_INDEX_FILENAME} beside dayi_db)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dayi_db):
+        print(f"Error: File not found: {args.dayi_db}", file=sys.stderr)
+        sys.exit(1)
+
+    with open(args.dayi_db, 'r', encoding='utf-8') as f:
+        dayi_db = json.load(f)
+
+    try:
+        index = build_completion_index(dayi_db, top_n=args.top_n)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    output_path = args.output or completion_index_path(args.dayi_db)
+    write_completion_index(index, output_path)
+
+    stats = index['stats']
+    print(f"[Completion] {stats['prefixes']:,} prefixes, {stats['entries']:,} entries "
+          f"(max {stats['max_entries']} per prefix)")
+    print(f"[Completion] Written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
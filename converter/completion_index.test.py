@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Code Completion Index - Test Suite
+
+Categories:
+  1. Index Construction
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+from completion_index import (
+    build_completion_index,
+    completion_index_path,
+    write_completion_index,
+    load_completion_index
+)
+
+
+TEST_DAYI_DB = {
+    'd': [{'char': '日', 'freq': 0.3}],
+    'dj': [{'char': '明', 'freq': 0.18}],
+    'djv': [{'char': '盟', 'freq': 0.005}],
+    'dk': [{'char': '昌', 'freq': 0.01}, {'char': '晶', 'freq': 0.0}],
+    'e': [{'char': '天', 'freq': 0.2}],
+}
+
+
+# ============================================================================
+# Category 1: Index Construction
+# ============================================================================
+
+class TestIndexConstruction(unittest.TestCase):
+    """Test per-prefix ranking, capping, and round trips."""
+
+    def test_ranks_extensions_by_freq(self):
+        """Test only strictly longer codes are listed, highest freq first."""
+        index = build_completion_index(TEST_DAYI_DB)
+        self.assertEqual(index['prefixes'], {
+            'd': [['明', 'dj'], ['昌', 'dk'], ['盟', 'djv'], ['晶', 'dk']],
+            'dj': [['盟', 'djv']],
+        })
+        self.assertEqual(index['stats'], {'prefixes': 2, 'entries': 5, 'max_entries': 4})
+
+    def test_matches_prefix_scan(self):
+        """Test every prefix holds exactly what a full dictionary scan finds."""
+        index = build_completion_index(TEST_DAYI_DB)
+        for prefix, entries in index['prefixes'].items():
+            scanned = sorted(
+                [c['char'], code]
+                for code, candidates in TEST_DAYI_DB.items()
+                if len(code) > len(prefix) and code.startswith(prefix)
+                for c in candidates
+            )
+            self.assertEqual(sorted(entries), scanned)
+
+    def test_top_n_cap(self):
+        """Test top_n keeps the highest ranked entries and rejects non-positive caps."""
+        index = build_completion_index(TEST_DAYI_DB, top_n=2)
+        self.assertEqual(index['prefixes']['d'], [['明', 'dj'], ['昌', 'dk']])
+        self.assertEqual(index['top_n'], 2)
+
+        with self.assertRaises(ValueError):
+            build_completion_index(TEST_DAYI_DB, top_n=0)
+
+    def test_round_trip(self):
+        """Test the index is written beside the dictionary and loads back."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = completion_index_path(os.path.join(tmp_dir, 'dayi_db.json'))
+            self.assertEqual(os.path.dirname(path), tmp_dir)
+
+            index = build_completion_index(TEST_DAYI_DB)
+            write_completion_index(index, path)
+            self.assertEqual(load_completion_index(path), index)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestIndexConstruction))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
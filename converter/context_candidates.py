@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Context-Conditioned Candidate Tables
+
+dayi_db.json orders each code's candidates by static unigram frequency
+only. After a given previous character the bigram model often prefers a
+different candidate (e.g. after 台 the code for 北/不 should offer 北 first),
+and the runtime engines would otherwise have to re-score with bigram
+context on every keystroke.
+
+This offline stage precomputes that re-ranking for the (previous char,
+code) pairs where it matters:
+
+    {
+      "min_count": 10,
+      "table": {prev_char: {code: [char, ...]}},   # bigram-ranked head
+      "stats": {"pairs", "prev_chars", "pairs_considered"}
+    }
+
+Each list holds the candidates observed after prev_char, by bigram count
+descending (ties keep the static order). Candidates not listed follow in
+their static order. Pairs are only stored when this changes the static
+order, so a missing entry means "use dayi_db.json as is".
+
+Usage:
+    python context_candidates.py mvp2-predictive/data/dayi_db.json \\
+        --ngram mvp2-predictive/data/ngram_pruned.json
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from model_manifest import read_model_section
+
+
+CONTEXT_TABLE_FILENAME = 'context_candidates.json'
+
+# Minimum bigram count (prev char + top candidate) for a pair to be stored
+DEFAULT_MIN_COUNT = 10
+
+
+def load_bigram_scores(ngram_path: str) -> Dict[str, int]:
+    """
+    Bigram counts of an N-gram model, streamed without loading the model.
+
+    Models that only store `bigrams` probabilities are rejected: every
+    probability is at most 1, so min_count would silently drop every pair.
+
+    Raises:
+        FileNotFoundError: If the model does not exist
+        ValueError: If the model has no `bigram_counts`
+    """
+    try:
+        return read_model_section(ngram_path, 'bigram_counts')
+    except ValueError:
+        raise ValueError(f"No bigram_counts in {ngram_path} "
+                         f"(probability-only models cannot be thresholded by min_count)")
+
+
+def build_context_table(
+    dayi_db: Dict[str, List[Dict]],
+    bigram_scores: Dict[str, float],
+    min_count: float = DEFAULT_MIN_COUNT,
+    max_pairs: Optional[int] = None
+) -> Dict:
+    """
+    Re-rank ambiguous codes' candidates for each frequent previous char.
+
+    Args:
+        dayi_db: Code → [{'char', 'freq'}, ...] (dayi_db.json format)
+        bigram_scores: Bigram string → count
+        min_count: Skip pairs whose best observed bigram scores below this
+        max_pairs: Keep only the N pairs with the highest best-bigram score
+
+    Returns:
+        {'min_count', 'table', 'stats'} (see module docstring)
+
+    Example:
+        >>> db = {'b': [{'char': '不', 'freq': 0.01}, {'char': '北', 'freq': 0.002}]}
+        >>> build_context_table(db, {'台北': 50, '台不': 3})['table']
+        {'台': {'b': ['北', '不']}}
+    """
+    # char → ambiguous codes it appears under
+    char_codes: Dict[str, List[str]] = {}
+    static_orders: Dict[str, List[str]] = {}
+    for code, candidates in dayi_db.items():
+        order = list(dict.fromkeys(candidate['char'] for candidate in candidates))
+        if len(order) < 2:
+            continue
+        static_orders[code] = order
+        for char in order:
+            char_codes.setdefault(char, []).append(code)
+
+    successors: Dict[str, Dict[str, float]] = {}
+    for bigram, score in bigram_scores.items():
+        if len(bigram) == 2 and bigram[1] in char_codes:
+            successors.setdefault(bigram[0], {})[bigram[1]] = score
+
+    pairs = []  # (best score, prev, code, head)
+    considered = 0
+    for prev, nexts in successors.items():
+        codes = {code for char in nexts for code in char_codes[char]}
+        for code in codes:
+            considered += 1
+            static = static_orders[code]
+            head = sorted((char for char in static if char in nexts),
+                          key=lambda char: nexts[char], reverse=True)
+            best = nexts[head[0]]
+            if best < min_count:
+                continue
+            if head == static[:len(head)]:
+                continue  # Same order as dayi_db.json
+            pairs.append((best, prev, code, head))
+
+    pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+    if max_pairs is not None:
+        pairs = pairs[:max_pairs]
+
+    table: Dict[str, Dict[str, List[str]]] = {}
+    for _, prev, code, head in sorted(pairs, key=lambda p: (p[1], p[2])):
+        table.setdefault(prev, {})[code] = head
+
+    return {
+        'min_count': min_count,
+        'table': table,
+        'stats': {
+            'pairs': len(pairs),
+            'prev_chars': len(table),
+            'pairs_considered': considered
+        }
+    }
+
+
+def context_order(
+    context_table: Dict,
+    dayi_db: Dict[str, List[Dict]],
+    prev_char: Optional[str],
+    code: str
+) -> List[str]:
+    """
+    Candidate chars for code after prev_char: O(1) table lookup, falling
+    back to the static dayi_db.json order.
+
+    Example:
+        >>> db = {'b': [{'char': '不'}, {'char': '北'}, {'char': '八'}]}
+        >>> table = {'table': {'台': {'b': ['北']}}}
+        >>> context_order(table, db, '台', 'b'), context_order(table, db, None, 'b')
+        (['北', '不', '八'], ['不', '北', '八'])
+    """
+    static = list(dict.fromkeys(candidate['char'] for candidate in dayi_db.get(code, [])))
+    head = context_table['table'].get(prev_char, {}).get(code) if prev_char else None
+    if not head:
+        return static
+    return head + [char for char in static if char not in head]
+
+
+def context_table_path(dayi_db_path: str) -> str:
+    """Default table location: context_candidates.json beside the dictionary."""
+    return os.path.join(os.path.dirname(dayi_db_path), CONTEXT_TABLE_FILENAME)
+
+
+def write_context_table(context_table: Dict, output_path: str) -> None:
+    """Write the table as compact JSON (it is fetched by the web app)."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(context_table, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_context_table(file_path: str) -> Dict:
+    """Load a table written by write_context_table()."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precompute bigram-conditioned candidate orders for a dayi_db.json'
+    )
+    parser.add_argument('dayi_db', help='dayi_db.json (code → candidates)')
+    parser.add_argument('--ngram', required=True, help='N-gram model with bigram_counts')
+    parser.add_argument('--min-count', type=float, default=DEFAULT_MIN_COUNT,
+                        help=f'Minimum best bigram count per pair (default: {DEFAULT_MIN_COUNT})')
+    parser.add_argument('--max-pairs', type=int, help='Keep at most N pairs (default: all)')
+    parser.add_argument('--output', help=f'Table path (default: {CONTEXT_TABLE_FILENAME} beside dayi_db)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dayi_db):
+        print(f"Error: File not found: {args.dayi_db}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        bigram_scores = load_bigram_scores(args.ngram)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with open(args.dayi_db, 'r', encoding='utf-8') as f:
+        dayi_db = json.load(f)
+
+    context_table = build_context_table(dayi_db, bigram_scores,
+                                        min_count=args.min_count, max_pairs=args.max_pairs)
+    output_path = args.output or context_table_path(args.dayi_db)
+    write_context_table(context_table, output_path)
+
+    stats = context_table['stats']
+    print(f"[Context] {stats['pairs']:,} re-ranked pairs for {stats['prev_chars']:,} previous chars "
+          f"({stats['pairs_considered']:,} considered)")
+    print(f"[Context] Written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
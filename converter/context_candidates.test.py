@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Context-Conditioned Candidate Tables - Test Suite
+
+Categories:
+  1. Table Construction
+  2. Lookup & Fallback
+
+Design Document: docs/design/DESIGN-v2.md
+"""
+
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from context_candidates import (
+    build_context_table,
+    context_order,
+    context_table_path,
+    load_bigram_scores,
+    write_context_table,
+    load_context_table
+)
+
+
+TEST_DAYI_DB = {
+    'b': [{'char': '不', 'freq': 0.01}, {'char': '北', 'freq': 0.002}, {'char': '八', 'freq': 0.001}],
+    'ev': [{'char': '天', 'freq': 0.005}],
+    'o': [{'char': '以', 'freq': 0.004}, {'char': '乙', 'freq': 0.0001}],
+}
+
+TEST_BIGRAMS = {
+    '台北': 50,   # re-ranks 'b' after 台
+    '台八': 20,
+    '大不': 40,   # same order as static → not stored
+    '明天': 90,   # unambiguous code → not stored
+    '所乙': 3,    # below min_count
+}
+
+
+# ============================================================================
+# Category 1: Table Construction
+# ============================================================================
+
+class TestTableConstruction(unittest.TestCase):
+    """Test which pairs are stored and how they are ranked."""
+
+    def test_only_reordered_pairs(self):
+        """Test ambiguous codes whose bigram order differs from static order are kept."""
+        result = build_context_table(TEST_DAYI_DB, TEST_BIGRAMS, min_count=10)
+        self.assertEqual(result['table'], {'台': {'b': ['北', '八']}})
+        self.assertEqual(result['stats']['pairs'], 1)
+        self.assertEqual(result['stats']['pairs_considered'], 3)
+
+    def test_min_count_and_max_pairs(self):
+        """Test min_count admits rare pairs and max_pairs keeps the strongest."""
+        result = build_context_table(TEST_DAYI_DB, TEST_BIGRAMS, min_count=1)
+        self.assertEqual(result['table']['所'], {'o': ['乙']})
+
+        capped = build_context_table(TEST_DAYI_DB, TEST_BIGRAMS, min_count=1, max_pairs=1)
+        self.assertEqual(capped['table'], {'台': {'b': ['北', '八']}})
+
+
+# ============================================================================
+# Category 2: Lookup & Fallback
+# ============================================================================
+
+class TestLookupAndFallback(unittest.TestCase):
+    """Test O(1) lookups, static fallback and file round trips."""
+
+    def test_context_order(self):
+        """Test listed chars lead, the rest keep static order, misses fall back."""
+        table = build_context_table(TEST_DAYI_DB, TEST_BIGRAMS)
+        self.assertEqual(context_order(table, TEST_DAYI_DB, '台', 'b'), ['北', '八', '不'])
+        self.assertEqual(context_order(table, TEST_DAYI_DB, '大', 'b'), ['不', '北', '八'])
+        self.assertEqual(context_order(table, TEST_DAYI_DB, None, 'o'), ['以', '乙'])
+        self.assertEqual(context_order(table, TEST_DAYI_DB, '台', 'zz'), [])
+
+    def test_round_trip_from_model(self):
+        """Test bigrams stream from a model file and the table round-trips."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            model = os.path.join(tmp_dir, 'ngram.json')
+            with open(model, 'w', encoding='utf-8') as f:
+                json.dump({'bigram_counts': TEST_BIGRAMS, 'bigrams': {'台北': 0.9}}, f, ensure_ascii=False)
+            self.assertEqual(load_bigram_scores(model), TEST_BIGRAMS)
+
+            table = build_context_table(TEST_DAYI_DB, load_bigram_scores(model))
+            path = context_table_path(os.path.join(tmp_dir, 'dayi_db.json'))
+            write_context_table(table, path)
+            self.assertEqual(load_context_table(path), table)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_probability_only_model_rejected(self):
+        """Test models without bigram_counts raise ValueError instead of an empty table."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            model = os.path.join(tmp_dir, 'ngram.json')
+            with open(model, 'w', encoding='utf-8') as f:
+                json.dump({'unigrams': {'北': 1.0}, 'bigrams': {'台北': 0.9}}, f, ensure_ascii=False)
+            with self.assertRaises(ValueError):
+                load_bigram_scores(model)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestTableConstruction))
+    suite.addTests(loader.loadTestsFromTestCase(TestLookupAndFallback))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming Near-Duplicate Line Removal (PTT-Corpus)
+
+PTT dumps quote and repost the same paragraphs many times. Counting every
+copy inflates those bigrams and wastes processing time, so this module
+filters cleaned lines before they reach the N-gram counter.
+
+Two stages, both bounded in memory:
+- Exact: 64-bit BLAKE2 hash of the cleaned line (FIFO store of recent hashes)
+- Near: MinHash over character shingles + LSH banding, with the candidate
+  verified against its stored signature (FIFO store of recent signatures)
+
+Each remembered line costs about 150 bytes in the exact store and, with the
+default num_perm=64 and bands=8, about 900 bytes in the signature store
+(a 256-byte array plus eight band-index entries). The default capacities
+(1,000,000 hashes, 100,000 signatures) therefore use roughly 250 MB at most.
+
+The MinHash signature is a one-permutation hash: each shingle is hashed
+once and num_perm bins keep the smallest hash that falls into them; empty
+bins borrow from a non-empty bin on a fixed random probe sequence
+("optimal densification", Shrivastava 2017). That is one multiply per
+shingle instead of num_perm modular permutations, with the same Jaccard
+estimation error.
+
+All hashing is deterministic (no reliance on Python's randomized str hash),
+so the same corpus always yields the same counts.
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import hashlib
+import random
+import zlib
+from array import array
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+_MASK64 = (1 << 64) - 1
+_MASK32 = (1 << 32) - 1
+
+
+class LineDeduplicator:
+    """
+    Streaming exact + near-duplicate detector for cleaned corpus lines.
+
+    Lines shorter than min_chars are never treated as duplicates: short
+    replies (好啊, 哈哈哈) repeat because people really type them that often,
+    and that frequency is what the N-gram model should learn.
+
+    Example:
+        >>> dedup = LineDeduplicator()
+        >>> dedup.is_duplicate('今天天氣很好我們一起去公園散步吧大家覺得呢')
+        False
+        >>> dedup.is_duplicate('今天天氣很好我們一起去公園散步吧大家覺得呢')
+        True
+        >>> dedup.stats['exact_lines']
+        1
+    """
+
+    def __init__(
+        self,
+        min_chars: int = 20,
+        num_perm: int = 64,
+        bands: int = 8,
+        shingle_size: int = 3,
+        similarity_threshold: float = 0.8,
+        max_exact_hashes: int = 1000000,
+        max_signatures: int = 100000,
+        seed: int = 42
+    ):
+        """
+        Args:
+            min_chars: Shortest cleaned line considered for deduplication
+            num_perm: MinHash signature length (bins)
+            bands: LSH bands (num_perm must be divisible by bands)
+            shingle_size: Characters per shingle
+            similarity_threshold: Minimum estimated Jaccard similarity for a
+                near-duplicate
+            max_exact_hashes: Exact-hash store capacity (oldest evicted first;
+                about 150 bytes per hash)
+            max_signatures: Signature store capacity (oldest evicted first;
+                about 900 bytes per signature at the default num_perm)
+            seed: Seed for the shingle hash and the densification probes
+
+        Raises:
+            ValueError: If num_perm is not divisible by bands, or a store
+                capacity is not positive
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        if max_exact_hashes < 1 or max_signatures < 1:
+            raise ValueError("max_exact_hashes and max_signatures must be positive")
+
+        self.min_chars = min_chars
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.similarity_threshold = similarity_threshold
+        self.max_exact_hashes = max_exact_hashes
+        self.max_signatures = max_signatures
+
+        rng = random.Random(seed)
+        # Shingle hash (a*x + b) mod 2^64, a odd; each bin's probe order
+        self._mix = (rng.getrandbits(64) | 1, rng.getrandbits(64))
+        self._probes = [rng.sample(range(num_perm), num_perm) for _ in range(num_perm)]
+
+        self._exact_hashes = set()
+        self._exact_order = deque()          # same hashes, oldest first
+        self._signatures = []                # ring: signature id % max_signatures -> compact signature
+        self._band_index = {}                # band key -> signature id
+        self._next_id = 0
+
+        self.stats = {
+            'lines_seen': 0,
+            'exact_lines': 0,
+            'near_lines': 0,
+            'chars_skipped': 0
+        }
+
+    # ------------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------------
+
+    def is_duplicate(self, cleaned: str) -> bool:
+        """
+        Check a cleaned line and remember it if it is new.
+
+        Args:
+            cleaned: Line already passed through the corpus cleaner
+
+        Returns:
+            True if the line (or a near copy) was seen before and should be skipped
+        """
+        self.stats['lines_seen'] += 1
+
+        if len(cleaned) < self.min_chars:
+            return False
+
+        # Stage 1: exact duplicate
+        digest = hashlib.blake2b(cleaned.encode('utf-8'), digest_size=8).digest()
+        if digest in self._exact_hashes:
+            self._skip('exact_lines', cleaned)
+            return True
+
+        self._exact_hashes.add(digest)
+        self._exact_order.append(digest)
+        if len(self._exact_order) > self.max_exact_hashes:
+            self._exact_hashes.discard(self._exact_order.popleft())
+
+        # Stage 2: near duplicate (MinHash + LSH)
+        signature = self._compact(self.minhash(cleaned))
+        band_keys = self._band_keys(signature)
+
+        for key in band_keys:
+            candidate_id = self._band_index.get(key)
+            if candidate_id is None:
+                continue
+
+            candidate_signature = self._signatures[candidate_id % self.max_signatures]
+            if self.estimate_similarity(signature, candidate_signature) >= self.similarity_threshold:
+                self._skip('near_lines', cleaned)
+                return True
+
+        self._remember_signature(signature, band_keys)
+        return False
+
+    def minhash(self, text: str) -> Tuple[int, ...]:
+        """
+        Compute the one-permutation MinHash signature of a line's character shingles.
+
+        Args:
+            text: Cleaned line
+
+        Returns:
+            Tuple of num_perm bin minimums (64-bit shingle hashes)
+        """
+        k = self.shingle_size
+        num_bins = self.num_perm
+        a, b = self._mix
+        shingles = {
+            zlib.crc32(text[i:i + k].encode('utf-8'))
+            for i in range(max(1, len(text) - k + 1))
+        }
+
+        # The high bits pick the bin, so a hash only ever lands in one bin
+        bins = [None] * num_bins
+        for h in shingles:
+            x = (a * h + b) & _MASK64
+            j = ((x >> 32) * num_bins) >> 32
+            current = bins[j]
+            if current is None or x < current:
+                bins[j] = x
+
+        if None in bins:
+            # Every probe sequence covers all bins, and at least one is filled
+            bins = [
+                x if x is not None else next(bins[p] for p in self._probes[j] if bins[p] is not None)
+                for j, x in enumerate(bins)
+            ]
+
+        return tuple(bins)
+
+    @staticmethod
+    def estimate_similarity(sig1: Tuple[int, ...], sig2: Tuple[int, ...]) -> float:
+        """Estimate Jaccard similarity as the fraction of matching MinHash slots."""
+        matches = sum(1 for x, y in zip(sig1, sig2) if x == y)
+        return matches / len(sig1)
+
+    def report(self) -> List[str]:
+        """
+        Human-readable summary lines of what was skipped.
+
+        Returns:
+            List of report lines (without prefix)
+        """
+        seen = self.stats['lines_seen']
+        skipped = self.stats['exact_lines'] + self.stats['near_lines']
+        percent = (skipped / seen * 100) if seen > 0 else 0
+
+        return [
+            f"Lines checked: {seen:,}",
+            f"Skipped {skipped:,} duplicate lines ({percent:.1f}%): "
+            f"{self.stats['exact_lines']:,} exact, {self.stats['near_lines']:,} near",
+            f"Skipped chars: {self.stats['chars_skipped']:,}"
+        ]
+
+    # ------------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------------
+
+    def _skip(self, kind: str, cleaned: str) -> None:
+        """Record a skipped line in the statistics."""
+        self.stats[kind] += 1
+        self.stats['chars_skipped'] += len(cleaned)
+
+    @staticmethod
+    def _compact(signature: Tuple[int, ...]) -> array:
+        """
+        Signature as 32-bit slots for storage.
+
+        Keeping the low 32 bits loses nothing: a*h + b mod 2^32 (a odd) is
+        a bijection on the 32-bit shingle hashes, so two slots are equal
+        exactly when their 64-bit values are.
+        """
+        return array('I', [x & _MASK32 for x in signature])
+
+    def _band_keys(self, signature: array) -> List[int]:
+        """Split a compact signature into LSH band keys (one int per band)."""
+        r = self.rows
+        return [
+            hash((band, *signature[band * r:(band + 1) * r]))
+            for band in range(self.bands)
+        ]
+
+    def _remember_signature(self, signature: array, band_keys: List[int]) -> None:
+        """Store a signature, evicting the oldest one when the store is full."""
+        signature_id = self._next_id
+        self._next_id += 1
+        slot = signature_id % self.max_signatures
+
+        if slot < len(self._signatures):
+            # Store is full: the slot holds the oldest signature
+            old_id = signature_id - self.max_signatures
+            for key in self._band_keys(self._signatures[slot]):
+                if self._band_index.get(key) == old_id:
+                    del self._band_index[key]
+            self._signatures[slot] = signature
+        else:
+            self._signatures.append(signature)
+
+        for key in band_keys:
+            self._band_index[key] = signature_id
+
+
+def print_dedup_report(dedup: LineDeduplicator, prefix: str = '[Dedup]') -> None:
+    """Print the deduplication summary with a log prefix."""
+    for line in dedup.report():
+        print(f"{prefix} {line}")
+
+
+def dedup_metadata(dedup: LineDeduplicator) -> Dict:
+    """Deduplication settings and statistics for model metadata."""
+    return {
+        'min_chars': dedup.min_chars,
+        'num_perm': dedup.num_perm,
+        'bands': dedup.bands,
+        'similarity_threshold': dedup.similarity_threshold,
+        **dedup.stats
+    }
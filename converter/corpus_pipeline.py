@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pipelined Corpus Processing (PTT-Corpus)
+
+process_corpus() reads, cleans and counts in one loop, so disk waits and
+regex work never overlap. This module splits the work into three stages
+connected by bounded queues:
+
+    reader ──raw_q──▶ cleaners (N) ──clean_q──▶ counter
+
+- reader:   large buffered block reads, split into line batches
+- cleaners: clean_ptt_text() over whole batches, in worker processes
+            (use_processes=True) or threads
+- counter:  count_cleaned_line() into the shared count dicts
+
+Bounded queues give backpressure: a fast reader blocks instead of filling
+memory. Each stage records busy / starved / blocked time, so the summary
+shows which stage is the bottleneck.
+
+Batches carry a sequence number and the counter counts them in input
+order, holding any that finish early until the batches before them
+arrive. The count dicts are therefore identical to process_corpus()'s,
+including key order, which top-K pruning falls back on for count ties.
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from process_raw_text import clean_ptt_text, count_cleaned_line, split_raw_line
+
+
+DEFAULT_BLOCK_BYTES = 4 * 1024 * 1024
+DEFAULT_BATCH_LINES = 2000
+DEFAULT_QUEUE_SIZE = 8
+
+# Queue end marker (one per consumer)
+_DONE = None
+
+
+def _clean_batch(raw_lines: List[bytes]) -> List[str]:
+    """Clean a batch of raw lines (runs in a worker process or thread)."""
+    return [clean_ptt_text(line) for raw_line in raw_lines for line in split_raw_line(raw_line)]
+
+
+def _new_stage_stats(name: str) -> Dict:
+    """Fresh statistics for one pipeline stage."""
+    return {
+        'stage': name,
+        'batches': 0,
+        'lines': 0,
+        'busy_s': 0.0,      # doing its own work
+        'starved_s': 0.0,   # waiting for input
+        'blocked_s': 0.0    # waiting for space in the output queue
+    }
+
+
+def _timed_put(q: queue.Queue, item, stats: Dict) -> None:
+    """Put into a bounded queue, charging the wait to the stage's blocked time."""
+    start = time.perf_counter()
+    q.put(item)
+    stats['blocked_s'] += time.perf_counter() - start
+
+
+def _timed_get(q: queue.Queue, stats: Dict):
+    """Get from a queue, charging the wait to the stage's starved time."""
+    start = time.perf_counter()
+    item = q.get()
+    stats['starved_s'] += time.perf_counter() - start
+    return item
+
+
+def _reader_stage(
+    corpus_file_path: str,
+    raw_q: queue.Queue,
+    num_cleaners: int,
+    block_bytes: int,
+    batch_lines: int,
+    stats: Dict,
+    errors: List[BaseException]
+) -> None:
+    """Read the corpus in large blocks and emit (sequence number, raw lines) batches."""
+    try:
+        with open(corpus_file_path, 'rb') as f:
+            remainder = b''
+            batch = []
+
+            while True:
+                start = time.perf_counter()
+                block = f.read(block_bytes)
+
+                if not block:
+                    if remainder:
+                        batch.append(remainder)
+                    stats['busy_s'] += time.perf_counter() - start
+                    break
+
+                lines = (remainder + block).split(b'\n')
+                remainder = lines.pop()
+                batch.extend(lines)
+                stats['busy_s'] += time.perf_counter() - start
+
+                while len(batch) >= batch_lines:
+                    out, batch = batch[:batch_lines], batch[batch_lines:]
+                    _timed_put(raw_q, (stats['batches'], out), stats)
+                    stats['batches'] += 1
+                    stats['lines'] += len(out)
+
+            if batch:
+                _timed_put(raw_q, (stats['batches'], batch), stats)
+                stats['batches'] += 1
+                stats['lines'] += len(batch)
+
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        for _ in range(num_cleaners):
+            raw_q.put(_DONE)
+
+
+def _cleaner_stage(
+    raw_q: queue.Queue,
+    clean_q: queue.Queue,
+    executor,
+    stats: Dict,
+    errors: List[BaseException]
+) -> None:
+    """Clean raw line batches (in the process pool if one is given), keeping their sequence numbers."""
+    try:
+        while True:
+            item = _timed_get(raw_q, stats)
+            if item is _DONE:
+                break
+            seq, batch = item
+
+            start = time.perf_counter()
+            if executor is not None:
+                cleaned = executor.submit(_clean_batch, batch).result()
+            else:
+                cleaned = _clean_batch(batch)
+            stats['busy_s'] += time.perf_counter() - start
+            stats['batches'] += 1
+            stats['lines'] += len(batch)
+
+            _timed_put(clean_q, (seq, cleaned), stats)
+
+    except BaseException as e:
+        errors.append(e)
+        # Keep draining so the reader never blocks forever on a full queue
+        while raw_q.get() is not _DONE:
+            pass
+    finally:
+        clean_q.put(_DONE)
+
+
+def process_corpus_pipelined(
+    corpus_file_path: str,
+    workers: Optional[int] = None,
+    use_processes: bool = True,
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+    batch_lines: int = DEFAULT_BATCH_LINES,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    verbose: bool = False
+) -> Tuple[Dict[str, int], Dict[str, int], Dict]:
+    """
+    Process a raw text corpus with overlapped read / clean / count stages.
+
+    Produces the same count dicts as process_corpus() (same counts, same
+    key order), plus per-stage throughput statistics.
+
+    Args:
+        corpus_file_path: Path to raw text file (one post/message per line)
+        workers: Number of cleaner workers (default: CPU count - 1, at least 1)
+        use_processes: Clean in worker processes (True) or threads (False)
+        block_bytes: Reader block size in bytes (default: 4 MB)
+        batch_lines: Lines per batch passed between stages (default: 2,000)
+        queue_size: Capacity of each inter-stage queue, in batches (default: 8)
+        verbose: Print the stage summary
+
+    Returns:
+        Tuple of (unigram_counts, bigram_counts, pipeline_stats)
+        - pipeline_stats: {'elapsed_s', 'line_count', 'total_chars',
+          'empty_lines', 'stages': [reader, cleaners, counter], 'bottleneck'}
+
+    Raises:
+        FileNotFoundError: If corpus file doesn't exist
+
+    Example:
+        >>> uni, bi, stats = process_corpus_pipelined('ptt_corpus.txt', workers=4, verbose=True)
+        [Pipeline] Processing ptt_corpus.txt (4 cleaner processes)...
+        [Pipeline] reader   ...
+        [Pipeline] Bottleneck: cleaners
+        >>> stats['bottleneck']
+        'cleaners'
+    """
+    if not os.path.exists(corpus_file_path):
+        raise FileNotFoundError(f"Corpus file not found: {corpus_file_path}")
+
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+
+    if verbose:
+        kind = 'processes' if use_processes else 'threads'
+        print(f"[Pipeline] Processing {corpus_file_path} ({workers} cleaner {kind})...")
+
+    raw_q = queue.Queue(maxsize=queue_size)
+    clean_q = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    reader_stats = _new_stage_stats('reader')
+    cleaner_stats = [_new_stage_stats('cleaner') for _ in range(workers)]
+    counter_stats = _new_stage_stats('counter')
+
+    unigram_counts = defaultdict(int)
+    bigram_counts = defaultdict(int)
+    totals = {'line_count': 0, 'total_chars': 0, 'empty_lines': 0}
+
+    executor = ProcessPoolExecutor(max_workers=workers) if use_processes else None
+    started = time.perf_counter()
+
+    try:
+        threads = [threading.Thread(
+            target=_reader_stage,
+            args=(corpus_file_path, raw_q, workers, block_bytes, batch_lines,
+                  reader_stats, errors),
+            daemon=True
+        )]
+        threads += [
+            threading.Thread(
+                target=_cleaner_stage,
+                args=(raw_q, clean_q, executor, stats, errors),
+                daemon=True
+            )
+            for stats in cleaner_stats
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Counter stage runs in the calling thread, in input order: batches
+        # that arrive early wait in `waiting` until their predecessors are in
+        finished_cleaners = 0
+        next_seq = 0
+        waiting = {}
+        while finished_cleaners < workers:
+            item = _timed_get(clean_q, counter_stats)
+            if item is _DONE:
+                finished_cleaners += 1
+                continue
+
+            seq, cleaned_batch = item
+            waiting[seq] = cleaned_batch
+            while next_seq in waiting:
+                cleaned_batch = waiting.pop(next_seq)
+                next_seq += 1
+
+                start = time.perf_counter()
+                for cleaned in cleaned_batch:
+                    totals['line_count'] += 1
+                    if len(cleaned) < 2:
+                        totals['empty_lines'] += 1
+                        continue
+                    totals['total_chars'] += count_cleaned_line(cleaned, unigram_counts, bigram_counts)
+                counter_stats['busy_s'] += time.perf_counter() - start
+                counter_stats['batches'] += 1
+                counter_stats['lines'] += len(cleaned_batch)
+
+        for thread in threads:
+            thread.join()
+
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - started
+    stages = [reader_stats, _combine_cleaner_stats(cleaner_stats), counter_stats]
+
+    for stage in stages:
+        _finish_stage_stats(stage, elapsed)
+
+    pipeline_stats = {
+        'elapsed_s': elapsed,
+        **totals,
+        'stages': stages,
+        'bottleneck': max(stages, key=lambda s: s['utilization'])['stage']
+    }
+
+    if verbose:
+        print_pipeline_stats(pipeline_stats)
+
+    return dict(unigram_counts), dict(bigram_counts), pipeline_stats
+
+
+def _combine_cleaner_stats(cleaner_stats: List[Dict]) -> Dict:
+    """Sum per-worker cleaner stats into one stage, averaging times per worker."""
+    workers = len(cleaner_stats)
+    combined = _new_stage_stats('cleaners')
+    combined['workers'] = workers
+
+    for stats in cleaner_stats:
+        combined['batches'] += stats['batches']
+        combined['lines'] += stats['lines']
+        for key in ('busy_s', 'starved_s', 'blocked_s'):
+            combined[key] += stats[key] / workers
+
+    return combined
+
+
+def _finish_stage_stats(stage: Dict, elapsed: float) -> None:
+    """Add utilization (busy fraction of wall time) and lines/second."""
+    stage['utilization'] = stage['busy_s'] / elapsed if elapsed > 0 else 0.0
+    stage['lines_per_s'] = stage['lines'] / stage['busy_s'] if stage['busy_s'] > 0 else 0.0
+
+
+def print_pipeline_stats(pipeline_stats: Dict) -> None:
+    """Print per-stage throughput and the bottleneck stage."""
+    print(f"[Pipeline] Complete in {pipeline_stats['elapsed_s']:.2f}s")
+    print(f"[Pipeline] Total lines: {pipeline_stats['line_count']:,}")
+    print(f"[Pipeline] Empty lines (after cleaning): {pipeline_stats['empty_lines']:,}")
+    print(f"[Pipeline] Total chars: {pipeline_stats['total_chars']:,}")
+    print(f"[Pipeline] {'Stage':<10} {'Busy':>8} {'Starved':>9} {'Blocked':>9} "
+          f"{'Util':>6} {'Lines/s (busy)':>16}")
+
+    for stage in pipeline_stats['stages']:
+        print(f"[Pipeline] {stage['stage']:<10} {stage['busy_s']:>7.2f}s "
+              f"{stage['starved_s']:>8.2f}s {stage['blocked_s']:>8.2f}s "
+              f"{stage['utilization']:>6.0%} {stage['lines_per_s']:>16,.0f}")
+
+    print(f"[Pipeline] Bottleneck: {pipeline_stats['bottleneck']}")
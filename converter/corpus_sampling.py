@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Corpus Sampling Strategies (PTT-Corpus)
+
+Pluggable line samplers for quick quality estimates on GB-scale corpora.
+Every sampler reads a corpus opened in binary mode and yields raw lines
+(bytes, newline included), so the same cleaning/counting loop in
+process_raw_text.py serves full passes and samples alike.
+
+Strategies:
+- head:      first N lines (fast, but biased toward the start of the file)
+- stride:    every k-th line (full read, no cleaning cost for skipped lines)
+- seek:      random byte-offset seeks, reading a small block at each
+             (touches only ~rate of the file, so runs in seconds)
+- reservoir: uniform random N lines (Algorithm R, full read)
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import math
+import os
+import random
+from typing import BinaryIO, Iterator, Optional
+
+
+SAMPLING_STRATEGIES = ['head', 'stride', 'seek', 'reservoir']
+
+# Bytes read at each random seek position
+DEFAULT_SEEK_BLOCK_BYTES = 64 * 1024
+
+# Bytes read from the start of the file to estimate the average line length
+_LINE_ESTIMATE_BYTES = 1024 * 1024
+
+
+class HeadSampler:
+    """First max_lines lines of the corpus."""
+
+    def __init__(self, max_lines: int):
+        self.max_lines = max_lines
+
+    def describe(self) -> str:
+        return f"head (first {self.max_lines:,} lines)"
+
+    def iter_lines(self, f: BinaryIO) -> Iterator[bytes]:
+        for line_count, raw_line in enumerate(f):
+            if line_count >= self.max_lines:
+                break
+            yield raw_line
+
+
+class StrideSampler:
+    """Every step-th line, starting at line `start`."""
+
+    def __init__(self, step: int, start: int = 0):
+        if step < 1:
+            raise ValueError(f"Stride step must be >= 1, got {step}")
+        self.step = step
+        self.start = start % step
+
+    def describe(self) -> str:
+        return f"stride (every {self.step:,}th line)"
+
+    def iter_lines(self, f: BinaryIO) -> Iterator[bytes]:
+        for line_number, raw_line in enumerate(f):
+            if line_number % self.step == self.start:
+                yield raw_line
+
+
+class RandomSeekSampler:
+    """
+    Lines from random byte offsets.
+
+    Picks sorted random offsets covering about `rate` of the file in blocks
+    of block_bytes. At each offset the partial line is discarded and whole
+    lines are read until the block is used up. Only the sampled blocks are
+    read from disk.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        seed: int = 0,
+        block_bytes: int = DEFAULT_SEEK_BLOCK_BYTES
+    ):
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+        self.rate = rate
+        self.seed = seed
+        self.block_bytes = block_bytes
+
+    def describe(self) -> str:
+        return f"seek ({self.rate:.2%} of bytes, {self.block_bytes:,}-byte blocks, seed={self.seed})"
+
+    def iter_lines(self, f: BinaryIO) -> Iterator[bytes]:
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if file_size == 0:
+            return
+
+        num_blocks = max(1, math.ceil(file_size * self.rate / self.block_bytes))
+        rng = random.Random(self.seed)
+        offsets = sorted(rng.randrange(file_size) for _ in range(num_blocks))
+
+        position = 0
+        for offset in offsets:
+            # Blocks that overlap the previous one just continue from it
+            if offset > position:
+                f.seek(offset - 1)
+                # Offset inside a line: drop its tail so every sample is a whole line
+                f.readline()
+                position = f.tell()
+
+            block_end = position + self.block_bytes
+            while position < block_end:
+                raw_line = f.readline()
+                if not raw_line:
+                    return
+                position += len(raw_line)
+                yield raw_line
+
+
+class ReservoirSampler:
+    """Uniform random sample of `size` lines (Algorithm R), in file order."""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.seed = seed
+
+    def describe(self) -> str:
+        return f"reservoir ({self.size:,} lines, seed={self.seed})"
+
+    def iter_lines(self, f: BinaryIO) -> Iterator[bytes]:
+        rng = random.Random(self.seed)
+        reservoir = []  # (line_number, raw_line)
+
+        for line_number, raw_line in enumerate(f):
+            if line_number < self.size:
+                reservoir.append((line_number, raw_line))
+            else:
+                j = rng.randint(0, line_number)
+                if j < self.size:
+                    reservoir[j] = (line_number, raw_line)
+
+        reservoir.sort()
+        for _, raw_line in reservoir:
+            yield raw_line
+
+
+def estimate_line_count(corpus_file_path: str) -> int:
+    """
+    Estimate a corpus's line count from its size and the first 1 MB.
+
+    Args:
+        corpus_file_path: Path to corpus file
+
+    Returns:
+        Estimated number of lines (at least 1)
+    """
+    file_size = os.path.getsize(corpus_file_path)
+
+    with open(corpus_file_path, 'rb') as f:
+        head = f.read(_LINE_ESTIMATE_BYTES)
+
+    if not head:
+        return 1
+
+    lines_in_head = max(1, head.count(b'\n'))
+    return max(1, round(file_size * lines_in_head / len(head)))
+
+
+def make_sampler(
+    strategy: str,
+    corpus_file_path: str,
+    rate: Optional[float] = None,
+    lines: Optional[int] = None,
+    seed: int = 0
+):
+    """
+    Build a sampler from CLI-style options.
+
+    Line-count strategies (head, reservoir) accept a rate and convert it with
+    estimate_line_count(); rate strategies (stride, seek) accept a line count
+    the same way.
+
+    Args:
+        strategy: One of SAMPLING_STRATEGIES
+        corpus_file_path: Corpus to be sampled (used for estimates)
+        rate: Fraction of the corpus to sample (e.g. 0.01)
+        lines: Number of lines to sample
+        seed: Random seed (seek, reservoir)
+
+    Returns:
+        Sampler object with iter_lines(f) and describe()
+
+    Raises:
+        ValueError: If the strategy is unknown, neither rate nor lines is
+            given, rate is not in (0, 1] or lines is below 1
+
+    Example:
+        >>> sampler = make_sampler('seek', 'ptt_corpus.txt', rate=0.01)
+        >>> sampler.describe()
+        'seek (1.00% of bytes, 65,536-byte blocks, seed=0)'
+    """
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy '{strategy}', "
+                         f"expected one of {SAMPLING_STRATEGIES}")
+
+    if rate is None and lines is None:
+        raise ValueError("Sampling requires a rate or a line count")
+    if rate is not None and not 0 < rate <= 1:
+        raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+    if lines is not None and lines < 1:
+        raise ValueError(f"Sample line count must be >= 1, got {lines}")
+
+    if strategy in ('head', 'reservoir'):
+        if lines is None:
+            lines = max(1, round(estimate_line_count(corpus_file_path) * rate))
+        if strategy == 'head':
+            return HeadSampler(lines)
+        return ReservoirSampler(lines, seed=seed)
+
+    if rate is None:
+        rate = min(1.0, lines / estimate_line_count(corpus_file_path))
+
+    if strategy == 'stride':
+        return StrideSampler(max(1, round(1 / rate)))
+    return RandomSeekSampler(rate, seed=seed)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Line-Aligned Corpus Shards
+
+Splits large text files into byte ranges that worker processes can read
+independently. Shard boundaries need not fall on newlines: every line
+belongs to the shard in which it starts, so consecutive shards together
+yield each line exactly once.
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import math
+import os
+from typing import Iterator, List, Tuple
+
+
+# Target shard size; small files still get at least one shard each
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+
+
+def plan_shards(file_paths: List[str], shard_bytes: int = DEFAULT_SHARD_BYTES) -> List[Tuple[str, int, int]]:
+    """
+    Split text files into byte ranges of about shard_bytes.
+
+    Boundaries need not fall on newlines: a line belongs to the shard in
+    which it starts (see iter_shard_lines).
+
+    Args:
+        file_paths: Text files to split
+        shard_bytes: Target shard size
+
+    Returns:
+        List of (file_path, start_offset, end_offset)
+    """
+    shards = []
+    for path in file_paths:
+        size = os.path.getsize(path)
+        num_shards = max(1, math.ceil(size / shard_bytes))
+        step = math.ceil(size / num_shards) if size else 0
+        for i in range(num_shards):
+            shards.append((path, min(i * step, size), min((i + 1) * step, size)))
+    return shards
+
+
+def iter_shard_lines(path: str, start: int, end: int) -> Iterator[bytes]:
+    """
+    Yield the raw lines (bytes) that start inside [start, end).
+
+    Example:
+        Consecutive shards of the same file together yield every line once.
+    """
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Drop the line in progress at `start`; the previous shard owns it
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+
+        while position < end:
+            raw_line = f.readline()
+            if not raw_line:
+                break
+            position += len(raw_line)
+            yield raw_line
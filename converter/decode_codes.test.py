@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk Code → Text Decoder - Test Suite
+
+Categories:
+  1. Stream Decoding
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from decode_codes import decode_stream
+from viterbi_decoder import ViterbiDecoder
+
+
+TEST_DAYI_DB = {
+    '4jp': [{'char': '易', 'freq': 80}, {'char': '義', 'freq': 70}],
+    'ad': [{'char': '在', 'freq': 90}, {'char': '灰', 'freq': 45}],
+    'v': [{'char': '大', 'freq': 100}, {'char': '夫', 'freq': 60}],
+    'a': [{'char': '大', 'freq': 100}, {'char': '人', 'freq': 80}],
+}
+
+TEST_NGRAM_DB = {
+    'unigrams': {
+        '易': 0.01, '義': 0.008, '在': 0.015, '灰': 0.002,
+        '大': 0.02, '夫': 0.005, '人': 0.012
+    },
+    'bigrams': {
+        '易在': 0.5, '易灰': 0.1, '義在': 0.4, '義灰': 0.05,
+        '在大': 0.6, '在夫': 0.2, '灰大': 0.3, '灰夫': 0.1, '大人': 0.7
+    }
+}
+
+
+def write_json(path: str, data) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+# ============================================================================
+# Category 1: Stream Decoding
+# ============================================================================
+
+class TestStreamDecoding(unittest.TestCase):
+    """Test ordered bulk decoding of code lines."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dayi_db = os.path.join(self.tmp_dir, 'dayi_db.json')
+        self.model = os.path.join(self.tmp_dir, 'ngram.json')
+        write_json(self.dayi_db, TEST_DAYI_DB)
+        write_json(self.model, TEST_NGRAM_DB)
+
+        decoder = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB)
+        sequences = [['4jp', 'ad', 'v'], ['v', 'a'], ['ad'], ['4jp', 'ad'], ['a', 'v', 'a']]
+        self.lines = [' '.join(codes) for codes in sequences] * 7
+        self.expected = [decoder.decode(line.split())['sentence'] for line in self.lines]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def decode(self, lines, **kwargs):
+        output = io.StringIO()
+        stats = decode_stream(lines, output, self.dayi_db, self.model, **kwargs)
+        return output.getvalue().split('\n')[:-1], stats
+
+    def test_single_process(self):
+        """Test each line decodes like ViterbiDecoder.decode()."""
+        decoded, stats = self.decode(self.lines, chunk_lines=4)
+        self.assertEqual(decoded, self.expected)
+        self.assertEqual(stats['sentences'], len(self.lines))
+        self.assertEqual(stats['failed'], 0)
+
+    def test_workers_keep_input_order(self):
+        """Test output order matches input order across worker processes."""
+        decoded, stats = self.decode(self.lines, workers=2, chunk_lines=3)
+        self.assertEqual(decoded, self.expected)
+        self.assertEqual(stats['lines'], len(self.lines))
+
+    def test_workers_load_each_model(self):
+        """Test a later run with another model does not reuse the shared decoder."""
+        other_db = {
+            'unigrams': dict(TEST_NGRAM_DB['unigrams'], 義=0.05, 灰=0.05, 夫=0.05, 人=0.001),
+            'bigrams': {'義灰': 0.9, '灰夫': 0.9}
+        }
+        other_model = os.path.join(self.tmp_dir, 'other.json')
+        write_json(other_model, other_db)
+        decoder = ViterbiDecoder(TEST_DAYI_DB, other_db)
+        expected = [decoder.decode(line.split())['sentence'] for line in self.lines]
+        self.assertNotEqual(expected, self.expected)
+
+        self.decode(self.lines, workers=2)
+        for workers in (2, 1):
+            output = io.StringIO()
+            decode_stream(self.lines, output, self.dayi_db, other_model, workers=workers)
+            self.assertEqual(output.getvalue().split('\n')[:-1], expected)
+
+    def test_prefix_cache(self):
+        """Test repeated prefixes hit the cache without changing output."""
+        cached, stats = self.decode(self.lines)
+        uncached, no_cache_stats = self.decode(self.lines, cache_bytes=0)
+        self.assertEqual(cached, uncached)
+        self.assertGreater(stats['cache_hits'], 0)
+        self.assertEqual(no_cache_stats['cache_hits'], 0)
+
+    def test_blank_and_failed_lines(self):
+        """Test blank and undecodable lines keep their place as empty lines."""
+        decoded, stats = self.decode(['4jp ad\n', '\n', 'zzz v\n', 'v a\n'])
+        self.assertEqual(decoded, [self.expected[3], '', '', self.expected[1]])
+        self.assertEqual(stats['sentences'], 3)
+        self.assertEqual(stats['failed'], 1)
+
+    def test_missing_model(self):
+        """Test a missing model file is reported."""
+        with self.assertRaises(FileNotFoundError):
+            decode_stream([], io.StringIO(), self.dayi_db, os.path.join(self.tmp_dir, 'nope.json'))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestStreamDecoding))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local Decoding / Prediction Service
+
+Integration tests and tools call the engine thousands of times a minute;
+starting a script per call (and reloading the dictionary and N-gram model)
+costs far more than the decode itself. This service loads the models once
+and answers JSON requests over stdin/stdout (one JSON object per line) or
+a localhost HTTP socket.
+
+Requests:
+    {"id": 1, "op": "decode", "codes": ["4jp", "ad", "v"]}
+    {"id": 2, "op": "decode", "codes": ["4jp", "ad"], "beam": 16, "k": 3}
+    {"id": 3, "op": "predict", "char": "我", "n": 10}
+    {"id": 4, "op": "stats"}
+
+Responses carry the request id and either "result" or "error":
+    {"id": 1, "ok": true, "result": {"sentence": "易在大", "score": -7.3}}
+
+Decode and predict requests are queued and micro-batched: whatever has
+arrived while the workers were busy (up to max_batch, waiting at most
+batch_window_ms for more) goes to one worker process in a single round
+trip. Each worker keeps its own ViterbiDecoder and SuccessorIndex resident.
+"stats" reports request / batch counts and latency percentiles.
+
+Usage:
+    python decode_service.py --dayi-db mvp1/dayi_db.json --model mvp1/ngram_pruned.json
+    python decode_service.py --dayi-db mvp1/dayi_db.json --model mvp1/ngram_pruned.json \\
+        --http 8765 --workers 2
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, TextIO
+
+from ngram_index import SuccessorIndex
+from viterbi_decoder import ViterbiDecoder, load_dayi_db
+
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_BATCH_WINDOW_MS = 2.0
+DEFAULT_PREDICT_N = 10
+LATENCY_WINDOW = 10000
+
+
+# ============================================================================
+# Request handling (runs in worker processes)
+# ============================================================================
+
+class Engine:
+    """Resident models for one process: decoder plus successor index."""
+
+    def __init__(self, dayi_db: Dict, ngram_db: Dict, smoothing: Optional[str] = None):
+        """
+        Args:
+            dayi_db: Code → candidates (dayi_db.json format)
+            ngram_db: N-gram database dictionary
+            smoothing: 'probability' or 'laplace' (default: by model contents)
+        """
+        self.decoder = ViterbiDecoder(dayi_db, ngram_db, smoothing=smoothing)
+        self.index = SuccessorIndex.from_model(ngram_db)
+
+    @classmethod
+    def from_files(cls, dayi_db_path: str, model_path: str,
+                   smoothing: Optional[str] = None) -> 'Engine':
+        """Load the dictionary and model from JSON files."""
+        with open(model_path, 'r', encoding='utf-8') as f:
+            ngram_db = json.load(f)
+        return cls(load_dayi_db(dayi_db_path), ngram_db, smoothing=smoothing)
+
+
+def handle_request(engine: Engine, request: Dict) -> Dict:
+    """
+    Answer one decode / predict request.
+
+    Args:
+        engine: Resident models
+        request: Parsed request object
+
+    Returns:
+        Response object: {'id', 'ok': True, 'result'} or {'id', 'ok': False, 'error'}
+    """
+    response = {'id': request.get('id')}
+    op = request.get('op')
+
+    try:
+        if op == 'decode':
+            codes = request.get('codes')
+            if not isinstance(codes, list):
+                raise ValueError("decode requires a 'codes' list")
+            if request.get('beam'):
+                hypotheses = engine.decoder.decode_beam(
+                    codes, beam_width=int(request['beam']), k=int(request.get('k', 1))
+                )
+                result = {'results': [{'sentence': h['sentence'], 'score': h['score']}
+                                      for h in hypotheses]}
+            else:
+                decoded = engine.decoder.decode(codes)
+                result = {'sentence': decoded['sentence'], 'score': decoded['score']}
+        elif op == 'predict':
+            char = request.get('char')
+            if not isinstance(char, str) or len(char) != 1:
+                raise ValueError("predict requires a single 'char'")
+            n = int(request.get('n', DEFAULT_PREDICT_N))
+            result = {'candidates': [{'char': c, 'score': s} for c, s in engine.index.top(char, n)]}
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+    except (ValueError, TypeError) as e:
+        response['ok'] = False
+        response['error'] = str(e)
+        return response
+
+    response['ok'] = True
+    response['result'] = result
+    return response
+
+
+_worker_engine = None  # Engine, loaded once per process
+
+
+def _init_worker(dayi_db_path: str, model_path: str, smoothing: Optional[str]) -> None:
+    """Process-pool initializer: load the models once per worker."""
+    global _worker_engine
+    _worker_engine = Engine.from_files(dayi_db_path, model_path, smoothing)
+
+
+def _handle_batch(requests: List[Dict]) -> List[Dict]:
+    """Answer a micro-batch of requests in one worker round trip."""
+    return [handle_request(_worker_engine, request) for request in requests]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+class LatencyStats:
+    """Request latencies over a sliding window, with percentiles."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self) -> Dict:
+        """
+        Returns:
+            {'count', 'window', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms'}
+            (percentiles are None before the first request)
+        """
+        ordered = sorted(self.samples)
+        summary = {'count': self.count, 'window': len(ordered)}
+        for name, fraction in (('p50_ms', 0.50), ('p90_ms', 0.90), ('p99_ms', 0.99)):
+            summary[name] = (ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+                             if ordered else None)
+        summary['max_ms'] = ordered[-1] * 1000 if ordered else None
+        return summary
+
+
+class DecodeService:
+    """
+    Micro-batching front end over a pool of resident-model workers.
+
+    Example:
+        >>> async def main():
+        ...     async with DecodeService('dayi_db.json', 'ngram_pruned.json') as service:
+        ...         return await service.submit({'op': 'decode', 'codes': ['4jp', 'ad']})
+        >>> asyncio.run(main())['result']['sentence']
+        '易在'
+    """
+
+    def __init__(
+        self,
+        dayi_db_path: str,
+        model_path: str,
+        workers: int = 1,
+        smoothing: Optional[str] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS
+    ):
+        """
+        Args:
+            dayi_db_path: dayi_db.json (code → candidates)
+            model_path: N-gram model JSON
+            workers: Worker processes (one batch in flight per worker)
+            smoothing: 'probability' or 'laplace' (default: by model contents)
+            max_batch: Most requests sent to a worker at once
+            batch_window_ms: Longest wait for more requests once one is queued
+
+        Raises:
+            FileNotFoundError: If the dictionary or model does not exist
+        """
+        for path in (dayi_db_path, model_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+
+        self.dayi_db_path = dayi_db_path
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.smoothing = smoothing
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+
+        self.latency = LatencyStats()
+        self.batches = 0
+        self.batched_requests = 0
+        self._executor = None
+        self._queue = None
+        self._slots = None
+        self._batcher_task = None
+        self._in_flight = set()
+
+    async def start(self) -> None:
+        """Start the worker pool (models load in each worker) and the batcher."""
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.dayi_db_path, self.model_path, self.smoothing)
+        )
+        # Load the models now rather than on the first request
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _handle_batch, [])
+            for _ in range(self.workers)
+        ))
+
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher_task = asyncio.create_task(self._batcher())
+
+    async def close(self) -> None:
+        """Finish queued work and stop the workers."""
+        await self._queue.join()
+        self._batcher_task.cancel()
+        try:
+            await self._batcher_task
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown()
+
+    async def __aenter__(self) -> 'DecodeService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def submit(self, request: Dict) -> Dict:
+        """
+        Answer one request (decode / predict are batched, stats is local).
+
+        Returns:
+            Response object (see handle_request)
+        """
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': 'Request must be a JSON object'}
+        if request.get('op') == 'stats':
+            return {'id': request.get('id'), 'ok': True, 'result': self.stats()}
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        response = await future
+        self.latency.record(time.perf_counter() - started)
+        return response
+
+    def stats(self) -> Dict:
+        """Request, batch and latency counters."""
+        return {
+            'workers': self.workers,
+            'requests': self.batched_requests,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0,
+            'latency': self.latency.percentiles()
+        }
+
+    async def _batcher(self) -> None:
+        """Collect queued requests into batches and hand them to free workers."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.batched_requests += len(batch)
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(self, batch: List) -> None:
+        """Run one batch on a worker and resolve its requests' futures."""
+        loop = asyncio.get_running_loop()
+        requests = [request for request, _ in batch]
+        try:
+            responses = await loop.run_in_executor(self._executor, _handle_batch, requests)
+        except Exception as e:  # worker crashed or pool shut down
+            responses = [{'id': r.get('id'), 'ok': False, 'error': f"Worker failed: {e}"}
+                         for r in requests]
+        finally:
+            self._slots.release()
+
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+            self._queue.task_done()
+
+
+# ============================================================================
+# Transports
+# ============================================================================
+
+def _parse_request(text: str) -> Dict:
+    """Parse one JSON request; malformed input becomes a request that fails."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        return {'op': None, 'parse_error': str(e)}
+
+
+async def _respond(service: DecodeService, request: Dict) -> Dict:
+    if isinstance(request, dict) and 'parse_error' in request:
+        return {'id': None, 'ok': False, 'error': f"Invalid JSON: {request['parse_error']}"}
+    return await service.submit(request)
+
+
+async def serve_stdio(service: DecodeService, stdin: TextIO = None, stdout: TextIO = None) -> None:
+    """
+    Serve JSON-lines requests until stdin closes.
+
+    Requests are answered concurrently, so responses may come back out of
+    order; clients match them by "id".
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def answer(request: Dict) -> None:
+        response = await _respond(service, request)
+        stdout.write(json.dumps(response, ensure_ascii=False) + '\n')
+        stdout.flush()
+
+    while True:
+        line = await loop.run_in_executor(None, stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(answer(_parse_request(line)))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+
+async def serve_http(service: DecodeService, host: str = '127.0.0.1', port: int = 8765) -> None:
+    """
+    Serve requests over HTTP/1.1 on a local socket until cancelled.
+
+    POST / with a JSON request body returns the JSON response;
+    GET /stats returns the stats result.
+    """
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = (request_line.decode('latin-1').split() + ['', ''])[:2]
+
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+
+                if method == 'GET' and path == '/stats':
+                    status, response = '200 OK', await service.submit({'op': 'stats'})
+                elif method == 'POST':
+                    status = '200 OK'
+                    response = await _respond(service, _parse_request(body.decode('utf-8')))
+                else:
+                    status, response = '404 Not Found', {'id': None, 'ok': False,
+                                                           'error': f"No route: {method} {path}"}
+
+                payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode('latin-1') + payload
+                )
+                await writer.drain()
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Long-lived decode / predict service with resident models',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    echo '{"id": 1, "op": "decode", "codes": ["4jp", "ad"]}' | \\
+        python decode_service.py --dayi-db dayi_db.json --model ngram_pruned.json
+    python decode_service.py --dayi-db dayi_db.json --model ngram_pruned.json --http 8765
+    curl -s localhost:8765/stats
+        """
+    )
+
+    parser.add_argument('--dayi-db', required=True, help='dayi_db.json (code → candidates)')
+    parser.add_argument('--model', required=True, help='N-gram model JSON')
+    parser.add_argument('--http', type=int, metavar='PORT',
+                        help='Serve HTTP on 127.0.0.1:PORT instead of stdin/stdout')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes (default: 1)')
+    parser.add_argument('--smoothing', choices=['probability', 'laplace'], default=None,
+                        help='Scoring (default: probability if the model has it, else laplace)')
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help=f'Most requests per worker round trip (default: {DEFAULT_MAX_BATCH})')
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help=f'Wait for more requests per batch (default: {DEFAULT_BATCH_WINDOW_MS})')
+
+    args = parser.parse_args()
+
+    try:
+        service = DecodeService(
+            args.dayi_db,
+            args.model,
+            workers=args.workers,
+            smoothing=args.smoothing,
+            max_batch=args.max_batch,
+            batch_window_ms=args.batch_window_ms
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    async def run() -> None:
+        async with service:
+            if args.http:
+                print(f"[Service] Listening on http://127.0.0.1:{args.http}", file=sys.stderr)
+                await serve_http(service, port=args.http)
+            else:
+                await serve_stdio(service)
+        print(f"[Service] {json.dumps(service.stats()['latency'])}", file=sys.stderr)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
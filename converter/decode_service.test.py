@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local Decoding / Prediction Service - Test Suite
+
+Categories:
+  1. Request Handling
+  2. Batching Service
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import unittest
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+from decode_service import (
+    Engine,
+    handle_request,
+    LatencyStats,
+    DecodeService,
+    serve_stdio
+)
+from viterbi_decoder import ViterbiDecoder
+
+
+TEST_DAYI_DB = {
+    '4jp': [{'char': '易', 'freq': 80}, {'char': '義', 'freq': 70}],
+    'ad': [{'char': '在', 'freq': 90}, {'char': '灰', 'freq': 45}],
+    'v': [{'char': '大', 'freq': 100}, {'char': '夫', 'freq': 60}],
+    'a': [{'char': '大', 'freq': 100}, {'char': '人', 'freq': 80}],
+}
+
+TEST_NGRAM_DB = {
+    'unigrams': {
+        '易': 0.01, '義': 0.008, '在': 0.015, '灰': 0.002,
+        '大': 0.02, '夫': 0.005, '人': 0.012
+    },
+    'bigrams': {
+        '易在': 0.5, '易灰': 0.1, '義在': 0.4, '義灰': 0.05,
+        '在大': 0.6, '在夫': 0.2, '灰大': 0.3, '灰夫': 0.1, '大人': 0.7
+    }
+}
+
+
+def write_json(path: str, data) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+# ============================================================================
+# Category 1: Request Handling
+# ============================================================================
+
+class TestRequestHandling(unittest.TestCase):
+    """Test per-request answers against the resident models."""
+
+    def setUp(self):
+        self.engine = Engine(TEST_DAYI_DB, TEST_NGRAM_DB)
+
+    def test_decode(self):
+        """Test decode matches ViterbiDecoder and keeps the request id."""
+        response = handle_request(self.engine, {'id': 7, 'op': 'decode', 'codes': ['4jp', 'ad', 'v']})
+        expected = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).decode(['4jp', 'ad', 'v'])
+        self.assertEqual(response['id'], 7)
+        self.assertTrue(response['ok'])
+        self.assertEqual(response['result']['sentence'], expected['sentence'])
+
+    def test_decode_beam(self):
+        """Test beam decode returns k results."""
+        response = handle_request(self.engine, {'op': 'decode', 'codes': ['4jp', 'ad'], 'beam': 4, 'k': 2})
+        self.assertEqual(len(response['result']['results']), 2)
+        self.assertEqual(response['result']['results'][0]['sentence'], '易在')
+
+    def test_predict(self):
+        """Test predict returns successors by score."""
+        response = handle_request(self.engine, {'op': 'predict', 'char': '在', 'n': 1})
+        self.assertEqual(response['result']['candidates'], [{'char': '大', 'score': 0.6}])
+
+    def test_errors(self):
+        """Test bad requests come back as errors, not exceptions."""
+        for request in ({'op': 'decode', 'codes': ['zzz']},
+                        {'op': 'decode'},
+                        {'op': 'predict', 'char': '在在'},
+                        {'op': 'nope'}):
+            response = handle_request(self.engine, request)
+            self.assertFalse(response['ok'])
+            self.assertIn('error', response)
+
+    def test_latency_percentiles(self):
+        """Test percentiles over recorded latencies."""
+        stats = LatencyStats()
+        self.assertIsNone(stats.percentiles()['p50_ms'])
+        for ms in range(1, 101):
+            stats.record(ms / 1000)
+        summary = stats.percentiles()
+        self.assertAlmostEqual(summary['p50_ms'], 51)
+        self.assertAlmostEqual(summary['p99_ms'], 100)
+        self.assertEqual(summary['count'], 100)
+
+
+# ============================================================================
+# Category 2: Batching Service
+# ============================================================================
+
+class TestBatchingService(unittest.TestCase):
+    """Test the asyncio front end and worker pool."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dayi_db = os.path.join(self.tmp_dir, 'dayi_db.json')
+        self.model = os.path.join(self.tmp_dir, 'ngram.json')
+        write_json(self.dayi_db, TEST_DAYI_DB)
+        write_json(self.model, TEST_NGRAM_DB)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_concurrent_requests_are_batched(self):
+        """Test concurrent requests share worker round trips."""
+        sequences = [['4jp', 'ad', 'v'], ['v', 'a'], ['ad'], ['4jp', 'ad']] * 25
+        decoder = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB)
+
+        async def run():
+            async with DecodeService(self.dayi_db, self.model, batch_window_ms=20) as service:
+                responses = await asyncio.gather(*(
+                    service.submit({'id': i, 'op': 'decode', 'codes': codes})
+                    for i, codes in enumerate(sequences)
+                ))
+                return responses, service.stats()
+
+        responses, stats = asyncio.run(run())
+        for i, (codes, response) in enumerate(zip(sequences, responses)):
+            self.assertEqual(response['id'], i)
+            self.assertEqual(response['result']['sentence'], decoder.decode(codes)['sentence'])
+
+        self.assertEqual(stats['requests'], len(sequences))
+        self.assertLess(stats['batches'], len(sequences))
+        self.assertEqual(stats['latency']['count'], len(sequences))
+
+    def test_stdio(self):
+        """Test JSON-lines serving, including malformed lines."""
+        stdin = io.StringIO(
+            '{"id": 1, "op": "decode", "codes": ["4jp", "ad"]}\n'
+            'not json\n'
+            '{"id": 2, "op": "predict", "char": "大"}\n'
+        )
+        stdout = io.StringIO()
+
+        async def run():
+            async with DecodeService(self.dayi_db, self.model) as service:
+                await serve_stdio(service, stdin, stdout)
+
+        asyncio.run(run())
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        by_id = {r['id']: r for r in responses}
+
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(by_id[1]['result']['sentence'], '易在')
+        self.assertEqual(by_id[2]['result']['candidates'][0]['char'], '人')
+        self.assertFalse(by_id[None]['ok'])
+
+    def test_missing_model(self):
+        """Test a missing model file is reported at construction."""
+        with self.assertRaises(FileNotFoundError):
+            DecodeService(self.dayi_db, os.path.join(self.tmp_dir, 'nope.json'))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestRequestHandling))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchingService))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
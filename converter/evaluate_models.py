@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline N-gram Evaluation Harness
+
+The compare_* scripts score a few dozen hardcoded phrases and print tables
+for humans. This harness streams held-out text files instead and scores one
+or more models side by side on every character transition:
+
+- Perplexity of the Laplace-smoothed bigram model (same formula as
+  viterbi_module.js: (count(c1,c2) + α) / (count(c1) + α·V))
+- Top-1 / top-5 / top-10 next-char accuracy (rank of the actual next char
+  among the model's successors of the previous char, by bigram count)
+- Per-category breakdowns, where the category comes from a
+  "category<TAB>text" line prefix or, failing that, the file name
+
+Files are split into line-aligned byte ranges and scored in worker
+processes; each worker loads the models once. Results are plain JSON.
+
+Usage:
+    python evaluate_models.py --models mvp1/ngram_db.json mvp1/ngram_blended.json \\
+        --heldout heldout_chat.txt heldout_news.txt --workers 4 --output eval.json
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from corpus_shards import DEFAULT_SHARD_BYTES, iter_shard_lines, plan_shards
+from laplace_scoring import LaplaceScorer
+from ngram_index import SuccessorIndex
+from process_raw_text import clean_ptt_text
+
+
+TOP_K = (1, 5, 10)
+
+
+class ModelScorer:
+    """
+    Scores character transitions against one loaded N-gram model.
+
+    Example:
+        >>> scorer = ModelScorer({'unigram_counts': {'我': 3, '的': 2},
+        ...                       'bigram_counts': {'我的': 2},
+        ...                       'smoothing_alpha': 0.1, 'vocab_size': 2})
+        >>> totals = new_totals()
+        >>> scorer.score_text('我的', totals)
+        >>> totals['transitions'], totals['top1']
+        (1, 1)
+    """
+
+    def __init__(self, ngram_db: Dict):
+        """
+        Args:
+            ngram_db: N-gram database with unigram_counts / bigram_counts
+        """
+        self.laplace = LaplaceScorer(ngram_db)
+        self.index = SuccessorIndex.from_model(ngram_db)
+
+    def log_prob(self, char1: str, char2: str) -> float:
+        """Laplace-smoothed log P(char2 | char1)."""
+        return self.laplace.log_prob(char1, char2)
+
+    def score_text(self, text: str, totals: Dict) -> None:
+        """
+        Add every transition of a text to running totals.
+
+        Transitions involving whitespace are skipped (the models never
+        count bigrams across whitespace).
+
+        Args:
+            text: Held-out text (already cleaned if cleaning is on)
+            totals: Running totals from new_totals(), updated in place
+        """
+        for segment in text.split():
+            if len(segment) < 2:
+                continue
+
+            ids = self.laplace.encode(segment)
+            totals['transitions'] += len(ids) - 1
+            totals['log_prob_sum'] += sum(self.laplace.log_probs(ids[:-1], ids[1:]))
+
+            for char1, char2 in zip(segment, segment[1:]):
+                rank = self.index.rank(char1, char2)
+                if rank is None:
+                    totals['unseen_bigrams'] += 1
+                    continue
+
+                for k in TOP_K:
+                    if rank < k:
+                        totals[f'top{k}'] += 1
+
+
+def new_totals() -> Dict:
+    """Fresh running totals for one (model, category) cell."""
+    totals = {'transitions': 0, 'log_prob_sum': 0.0, 'unseen_bigrams': 0}
+    for k in TOP_K:
+        totals[f'top{k}'] = 0
+    return totals
+
+
+def summarize_totals(totals: Dict) -> Dict:
+    """
+    Turn running totals into report metrics.
+
+    Returns:
+        Dict with transitions, perplexity, top1/top5/top10 accuracy,
+        unseen_bigram_rate (rates are fractions, None without transitions)
+    """
+    n = totals['transitions']
+    summary = {'transitions': n}
+
+    if n == 0:
+        summary['perplexity'] = None
+        summary['unseen_bigram_rate'] = None
+        for k in TOP_K:
+            summary[f'top{k}_accuracy'] = None
+        return summary
+
+    summary['perplexity'] = math.exp(-totals['log_prob_sum'] / n)
+    for k in TOP_K:
+        summary[f'top{k}_accuracy'] = totals[f'top{k}'] / n
+    summary['unseen_bigram_rate'] = totals['unseen_bigrams'] / n
+    return summary
+
+
+# ============================================================================
+# Scoring (runs in worker processes)
+# ============================================================================
+
+_worker_scorers = None  # [(name, ModelScorer)], loaded once per process
+
+
+def _init_worker(model_paths: List[Tuple[str, str]]) -> None:
+    """Process-pool initializer: load every model once per worker."""
+    global _worker_scorers
+    _worker_scorers = [(name, ModelScorer(load_model(path))) for name, path in model_paths]
+
+
+def _score_shard(shard: Tuple[str, int, int], clean: bool) -> Dict:
+    """
+    Score one shard with every model.
+
+    Returns:
+        {category: {'lines', 'chars', 'models': {name: totals}}}
+    """
+    path, start, end = shard
+    default_category = os.path.splitext(os.path.basename(path))[0]
+    results = {}
+
+    for raw_line in iter_shard_lines(path, start, end):
+        line = raw_line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+        category = default_category
+        if '\t' in line:
+            category, line = line.split('\t', 1)
+
+        text = clean_ptt_text(line) if clean else line.strip()
+        if len(text) < 2:
+            continue
+
+        cell = results.get(category)
+        if cell is None:
+            cell = {'lines': 0, 'chars': 0,
+                    'models': {name: new_totals() for name, _ in _worker_scorers}}
+            results[category] = cell
+
+        cell['lines'] += 1
+        cell['chars'] += len(text)
+        for name, scorer in _worker_scorers:
+            scorer.score_text(text, cell['models'][name])
+
+    return results
+
+
+def _merge_results(merged: Dict, partial: Dict) -> None:
+    """Add one shard's results into the merged results."""
+    for category, cell in partial.items():
+        target = merged.get(category)
+        if target is None:
+            merged[category] = cell
+            continue
+
+        target['lines'] += cell['lines']
+        target['chars'] += cell['chars']
+        for name, totals in cell['models'].items():
+            for key, value in totals.items():
+                target['models'][name][key] += value
+
+
+# ============================================================================
+# Public API
+# ============================================================================
+
+def load_model(file_path: str) -> Dict:
+    """Load an N-gram model from JSON."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def model_name_from_path(file_path: str) -> str:
+    """Short model name for reports (file name without extension)."""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def evaluate_models(
+    model_paths: List[str],
+    heldout_paths: List[str],
+    workers: int = 1,
+    clean: bool = True,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    verbose: bool = False
+) -> Dict:
+    """
+    Score models on held-out text.
+
+    Args:
+        model_paths: N-gram model JSON files (names are their file stems)
+        heldout_paths: Held-out text files, one sentence/post per line;
+            "category<TAB>text" lines override the file-name category
+        workers: Worker processes (1 = score in this process)
+        clean: Pass held-out text through clean_ptt_text() first, matching
+            how the training corpora were cleaned
+        shard_bytes: Target shard size for splitting work
+        verbose: Print progress
+
+    Returns:
+        JSON-serializable report:
+        {'models': [...], 'heldout': [...], 'elapsed_s',
+         'overall': {model: metrics},
+         'categories': {category: {'lines', 'chars', 'models': {model: metrics}}}}
+
+    Example:
+        >>> report = evaluate_models(['ngram_db.json'], ['heldout.txt'])
+        >>> report['overall']['ngram_db']['top1_accuracy']
+        0.31...
+    """
+    for path in list(model_paths) + list(heldout_paths):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+    named_models = [(model_name_from_path(path), path) for path in model_paths]
+    names = [name for name, _ in named_models]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Model file names must be unique, got {names}")
+
+    shards = plan_shards(heldout_paths, shard_bytes)
+    started = time.perf_counter()
+
+    if verbose:
+        print(f"[Eval] Scoring {len(names)} model(s) on {len(shards)} shard(s) "
+              f"with {workers} worker(s)...")
+
+    merged = {}
+    if workers <= 1:
+        _init_worker(named_models)
+        for shard in shards:
+            _merge_results(merged, _score_shard(shard, clean))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(named_models,)
+        ) as executor:
+            futures = [executor.submit(_score_shard, shard, clean) for shard in shards]
+            # Merge in submission order so the report is deterministic
+            for future in futures:
+                _merge_results(merged, future.result())
+
+    overall = {name: new_totals() for name in names}
+    categories = {}
+    for category in sorted(merged):
+        cell = merged[category]
+        for name in names:
+            for key, value in cell['models'][name].items():
+                overall[name][key] += value
+        categories[category] = {
+            'lines': cell['lines'],
+            'chars': cell['chars'],
+            'models': {name: summarize_totals(cell['models'][name]) for name in names}
+        }
+
+    return {
+        'models': [{'name': name, 'path': path} for name, path in named_models],
+        'heldout': list(heldout_paths),
+        'cleaned': clean,
+        'elapsed_s': time.perf_counter() - started,
+        'overall': {name: summarize_totals(overall[name]) for name in names},
+        'categories': categories
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print a side-by-side summary of an evaluation report."""
+    def row(label: str, metrics: Dict) -> str:
+        if metrics['transitions'] == 0:
+            return f"  {label:<28} {'-':>10}"
+        return (f"  {label:<28} {metrics['transitions']:>10,} {metrics['perplexity']:>10.1f} "
+                f"{metrics['top1_accuracy']:>7.1%} {metrics['top5_accuracy']:>7.1%} "
+                f"{metrics['top10_accuracy']:>7.1%} {metrics['unseen_bigram_rate']:>7.1%}")
+
+    header = (f"  {'Model':<28} {'Trans.':>10} {'PPL':>10} "
+              f"{'Top-1':>7} {'Top-5':>7} {'Top-10':>7} {'Unseen':>7}")
+
+    print("=" * 80)
+    print("HELD-OUT EVALUATION")
+    print("=" * 80)
+
+    print("\nOverall:")
+    print(header)
+    for name, metrics in report['overall'].items():
+        print(row(name, metrics))
+
+    for category, cell in report['categories'].items():
+        print(f"\n[{category}] {cell['lines']:,} lines, {cell['chars']:,} chars")
+        print(header)
+        for name, metrics in cell['models'].items():
+            print(row(name, metrics))
+
+    print(f"\nElapsed: {report['elapsed_s']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Score N-gram models on held-out text (perplexity, top-k accuracy)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python evaluate_models.py --models mvp1/ngram_db.json mvp1/ngram_blended.json \\
+        --heldout heldout.txt
+    python evaluate_models.py --models mvp1/ngram_blended.json \\
+        --heldout chat.txt news.txt --workers 4 --output eval.json
+    python evaluate_models.py --models a.json b.json --heldout tagged.tsv --output -
+        """
+    )
+
+    parser.add_argument('--models', nargs='+', required=True,
+                        help='N-gram model JSON files to compare')
+    parser.add_argument('--heldout', nargs='+', required=True,
+                        help='Held-out text files (one line per sentence; '
+                             'optional "category<TAB>text" lines)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes (default: 1)')
+    parser.add_argument('--no-clean', action='store_true',
+                        help='Score held-out text as-is instead of cleaning it like the corpus')
+    parser.add_argument('--output',
+                        help='Write the JSON report to this file ("-" for stdout)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print progress')
+
+    args = parser.parse_args()
+
+    try:
+        report = evaluate_models(
+            args.models,
+            args.heldout,
+            workers=args.workers,
+            clean=not args.no_clean,
+            verbose=args.verbose
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline Evaluation Harness - Test Suite
+
+Categories:
+  1. Transition Scoring
+  2. Sharding & Reports
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import unittest
+import json
+import math
+import os
+import shutil
+import tempfile
+from evaluate_models import (
+    ModelScorer,
+    new_totals,
+    summarize_totals,
+    plan_shards,
+    iter_shard_lines,
+    evaluate_models
+)
+
+
+TINY_MODEL = {
+    'unigram_counts': {'我': 10, '的': 6, '是': 4, '你': 2},
+    'bigram_counts': {'我的': 6, '我是': 3, '你是': 2},
+    'smoothing_alpha': 0.1,
+    'vocab_size': 4
+}
+
+
+def write_json(path: str, data) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+# ============================================================================
+# Category 1: Transition Scoring
+# ============================================================================
+
+class TestTransitionScoring(unittest.TestCase):
+    """Test per-transition scoring against one model."""
+
+    def test_laplace_log_prob(self):
+        """Test smoothed log-probability matches the viterbi_module.js formula."""
+        scorer = ModelScorer(TINY_MODEL)
+        expected = math.log((6 + 0.1) / (10 + 0.1 * 4))
+        self.assertAlmostEqual(scorer.log_prob('我', '的'), expected)
+
+        # Unseen bigram and unseen first char stay finite
+        self.assertAlmostEqual(scorer.log_prob('的', '我'), math.log(0.1 / (6 + 0.4)))
+        self.assertAlmostEqual(scorer.log_prob('他', '我'), math.log(0.1 / 0.4))
+
+    def test_topk_counts(self):
+        """Test top-k hits follow successor rank by bigram count."""
+        scorer = ModelScorer(TINY_MODEL)
+        totals = new_totals()
+        scorer.score_text('我的', totals)   # rank 0
+        scorer.score_text('我是', totals)   # rank 1
+        scorer.score_text('的我', totals)   # unseen
+
+        self.assertEqual(totals['transitions'], 3)
+        self.assertEqual(totals['top1'], 1)
+        self.assertEqual(totals['top5'], 2)
+        self.assertEqual(totals['unseen_bigrams'], 1)
+
+    def test_whitespace_not_scored(self):
+        """Test transitions across whitespace are skipped."""
+        scorer = ModelScorer(TINY_MODEL)
+        totals = new_totals()
+        scorer.score_text('我 的', totals)
+        self.assertEqual(totals['transitions'], 0)
+
+    def test_summarize(self):
+        """Test perplexity is exp of mean negative log-probability."""
+        totals = new_totals()
+        totals.update({'transitions': 2, 'log_prob_sum': 2 * math.log(0.25), 'top1': 1})
+        summary = summarize_totals(totals)
+        self.assertAlmostEqual(summary['perplexity'], 4.0)
+        self.assertEqual(summary['top1_accuracy'], 0.5)
+
+        self.assertIsNone(summarize_totals(new_totals())['perplexity'])
+
+
+# ============================================================================
+# Category 2: Sharding & Reports
+# ============================================================================
+
+class TestShardingAndReports(unittest.TestCase):
+    """Test shard planning and end-to-end reports."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.model = os.path.join(self.tmp_dir, 'tiny.json')
+        self.heldout = os.path.join(self.tmp_dir, 'news.txt')
+        write_json(self.model, TINY_MODEL)
+
+        lines = []
+        for i in range(300):
+            lines.append('chat\t你是我的' if i % 3 == 0 else '我的是你的我是')
+        with open(self.heldout, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shards_cover_every_line_once(self):
+        """Test consecutive shards yield each line exactly once."""
+        with open(self.heldout, 'rb') as f:
+            expected = f.readlines()
+
+        for shard_bytes in (7, 64, 1000, 10 ** 6):
+            lines = []
+            for shard in plan_shards([self.heldout], shard_bytes):
+                lines.extend(iter_shard_lines(*shard))
+            self.assertEqual(lines, expected, f"shard_bytes={shard_bytes}")
+
+    def test_categories(self):
+        """Test tab-prefixed categories and file-name fallback."""
+        report = evaluate_models([self.model], [self.heldout])
+
+        self.assertEqual(sorted(report['categories']), ['chat', 'news'])
+        self.assertEqual(report['categories']['chat']['lines'], 100)
+        self.assertEqual(report['categories']['news']['lines'], 200)
+        self.assertEqual(
+            report['overall']['tiny']['transitions'],
+            sum(c['models']['tiny']['transitions'] for c in report['categories'].values())
+        )
+
+    def test_sharded_matches_unsharded(self):
+        """Test sharding across processes does not change the report."""
+        single = evaluate_models([self.model], [self.heldout])
+        sharded = evaluate_models([self.model], [self.heldout], workers=2, shard_bytes=500)
+
+        self.assertEqual(sorted(single['categories']), sorted(sharded['categories']))
+        for category, cell in single['categories'].items():
+            expected = dict(cell['models']['tiny'])
+            actual = dict(sharded['categories'][category]['models']['tiny'])
+
+            # Float sums differ in the last bits with a different shard order
+            self.assertAlmostEqual(expected.pop('perplexity'), actual.pop('perplexity'))
+            self.assertEqual(expected, actual)
+
+    def test_duplicate_model_names(self):
+        """Test models with the same file name are rejected."""
+        other_dir = os.path.join(self.tmp_dir, 'other')
+        os.makedirs(other_dir)
+        other = os.path.join(other_dir, 'tiny.json')
+        write_json(other, TINY_MODEL)
+
+        with self.assertRaises(ValueError):
+            evaluate_models([self.model, other], [self.heldout])
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestTransitionScoring))
+    suite.addTests(loader.loadTestsFromTestCase(TestShardingAndReports))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
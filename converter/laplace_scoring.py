@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch Laplace-Smoothed Bigram Scoring
+
+Shared scoring core for evaluation, pruning analysis and decoding. Uses the
+same smoothing as viterbi_module.js:
+
+    P(c2|c1) = (count(c1,c2) + α) / (count(c1) + α·V)
+    P(c)     = (count(c) + α) / (total_chars + α·V)
+
+Instead of several string-keyed dict lookups per pair, characters are mapped
+to integer IDs once, the per-character denominators log(count(c1) + α·V) are
+precomputed into a flat array, and seen bigrams' log(count + α) live in a
+TransitionStore (dense block for the most frequent characters, sparse map
+for the rest). Scoring a batch of (c1, c2) ID pairs is then one list
+comprehension of one store read and one array read per pair, returning an
+array('d') of log-probabilities.
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, List, Sequence
+
+from transition_store import DEFAULT_DENSE_CHARS, TransitionStore, rank_chars
+
+
+DEFAULT_SMOOTHING_ALPHA = 0.1
+
+
+class LaplaceScorer:
+    """
+    Laplace-smoothed bigram log-probabilities over integer character IDs.
+
+    Known characters get IDs 0..n-1 by unigram count (most frequent first,
+    ties by character, so IDs are stable for a given model); every unknown
+    character maps to unknown_id == n, which behaves like a character with
+    count 0.
+
+    Example:
+        >>> scorer = LaplaceScorer({'unigram_counts': {'我': 10, '的': 6},
+        ...                         'bigram_counts': {'我的': 6},
+        ...                         'smoothing_alpha': 0.1, 'vocab_size': 2})
+        >>> ids = scorer.encode('我的')
+        >>> list(scorer.log_probs(ids[:-1], ids[1:]))   # log(6.1 / 10.2)
+        [-0.514...]
+        >>> scorer.log_prob('我', '的') == scorer.log_probs(ids[:-1], ids[1:])[0]
+        True
+    """
+
+    def __init__(self, ngram_db: Dict, dense_chars: int = DEFAULT_DENSE_CHARS):
+        """
+        Args:
+            ngram_db: N-gram database with unigram_counts, bigram_counts and
+                (optionally) smoothing_alpha / vocab_size
+            dense_chars: Most frequent characters whose bigrams are stored densely
+        """
+        unigram_counts = ngram_db.get('unigram_counts', {})
+        bigram_counts = ngram_db.get('bigram_counts', {})
+
+        self.alpha = ngram_db.get('smoothing_alpha', DEFAULT_SMOOTHING_ALPHA)
+        self.vocab_size = ngram_db.get('vocab_size') or len(unigram_counts)
+
+        bigram_chars = set()
+        for bigram in bigram_counts:
+            if len(bigram) == 2:
+                bigram_chars.update(bigram)
+
+        self.chars: List[str] = rank_chars(unigram_counts, bigram_chars)
+        self.char_ids: Dict[str, int] = {c: i for i, c in enumerate(self.chars)}
+        self.unknown_id = len(self.chars)
+
+        smoothed_vocab = self.alpha * self.vocab_size
+        self.log_denominators = array('d', (
+            math.log(unigram_counts.get(c, 0) + smoothed_vocab) for c in self.chars
+        ))
+        self.log_denominators.append(math.log(smoothed_vocab))  # unknown_id
+
+        self.unseen_log_numerator = math.log(self.alpha)
+
+        total_chars = ngram_db.get('total_chars') or sum(unigram_counts.values())
+        log_total = math.log(total_chars + smoothed_vocab)
+        self.unigram_log_probs_by_id = array('d', (
+            math.log(unigram_counts.get(c, 0) + self.alpha) - log_total for c in self.chars
+        ))
+        self.unigram_log_probs_by_id.append(math.log(self.alpha) - log_total)  # unknown_id
+
+        alpha = self.alpha
+        self.transitions = TransitionStore.from_bigrams(
+            bigram_counts, self.char_ids, self.unseen_log_numerator,
+            dense_chars=dense_chars, transform=lambda count: math.log(count + alpha)
+        )
+
+    def encode(self, text: str) -> List[int]:
+        """Map each character of a text to its ID (unknown_id if not in the model)."""
+        get = self.char_ids.get
+        unknown = self.unknown_id
+        return [get(c, unknown) for c in text]
+
+    def char_id(self, char: str) -> int:
+        """ID of one character (unknown_id if not in the model)."""
+        return self.char_ids.get(char, self.unknown_id)
+
+    def log_probs(self, ids1: Sequence[int], ids2: Sequence[int]) -> array:
+        """
+        Smoothed log P(c2 | c1) for aligned batches of ID pairs.
+
+        Args:
+            ids1: Previous-character IDs
+            ids2: Next-character IDs (same length as ids1)
+
+        Returns:
+            array('d') of log-probabilities, one per pair
+        """
+        store = self.transitions
+        size = store.dense_size
+        values = store.values
+        dense = store.dense
+        get = store.sparse.get
+        stride = store.stride
+        unseen = self.unseen_log_numerator
+        denominators = self.log_denominators
+        return array('d', [
+            (values[dense[a * size + b]] if a < size and b < size else get(a * stride + b, unseen))
+            - denominators[a]
+            for a, b in zip(ids1, ids2)
+        ])
+
+    def log_prob_matrix(self, prev_ids: Sequence[int], next_ids: Sequence[int]) -> array:
+        """
+        Row-major (len(prev) × len(next)) matrix of smoothed log P(next | prev).
+
+        Returns:
+            array('d') where entry i * len(next_ids) + j scores (prev_ids[i], next_ids[j])
+        """
+        store = self.transitions
+        size = store.dense_size
+        values = store.values
+        dense = store.dense
+        get = store.sparse.get
+        stride = store.stride
+        unseen = self.unseen_log_numerator
+        denominators = self.log_denominators
+        return array('d', [
+            (values[dense[a * size + b]] if a < size and b < size else get(a * stride + b, unseen))
+            - denominators[a]
+            for a in prev_ids for b in next_ids
+        ])
+
+    def unigram_log_probs(self, ids: Sequence[int]) -> array:
+        """Smoothed unigram log P(c) for a batch of IDs."""
+        table = self.unigram_log_probs_by_id
+        return array('d', [table[i] for i in ids])
+
+    def log_prob_ids(self, id1: int, id2: int) -> float:
+        """Smoothed log P(c2 | c1) for a single ID pair."""
+        return self.transitions.get(id1, id2) - self.log_denominators[id1]
+
+    def log_prob(self, char1: str, char2: str) -> float:
+        """Smoothed log P(char2 | char1) for a single character pair."""
+        return self.log_prob_ids(self.char_id(char1), self.char_id(char2))
+
+    def sequence_log_prob(self, text: str) -> float:
+        """Sum of smoothed bigram log-probabilities over a text's transitions."""
+        ids = self.encode(text)
+        return math.fsum(self.log_probs(ids[:-1], ids[1:]))
+
+    def is_seen(self, id1: int, id2: int) -> bool:
+        """Whether the bigram has a corpus count (i.e. is not smoothed-only)."""
+        return self.transitions.contains(id1, id2)
+
+
+def transition_log_probs(scorer: LaplaceScorer, texts: Iterable[str]) -> array:
+    """
+    Log-probabilities of every within-text transition of many texts.
+
+    Args:
+        scorer: LaplaceScorer for the model
+        texts: Texts (no transitions are taken across text boundaries)
+
+    Returns:
+        array('d') with one entry per transition, in text order
+    """
+    ids1, ids2 = [], []
+    for text in texts:
+        ids = scorer.encode(text)
+        ids1.extend(ids[:-1])
+        ids2.extend(ids[1:])
+    return scorer.log_probs(ids1, ids2)
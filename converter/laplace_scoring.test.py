@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch Laplace Scoring - Test Suite
+
+Categories:
+  1. Smoothed Log-Probabilities
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+import unittest
+import math
+from laplace_scoring import LaplaceScorer, transition_log_probs
+
+
+MODEL = {
+    'unigram_counts': {'台': 8, '灣': 5, '中': 4, '華': 2},
+    'bigram_counts': {'台灣': 5, '中華': 2, '華民': 1},
+    'smoothing_alpha': 0.1,
+    'vocab_size': 4
+}
+
+
+def reference_prob(char1: str, char2: str, ngram_db: dict) -> float:
+    """Per-pair formula from viterbi_module.js."""
+    bigram_count = ngram_db['bigram_counts'].get(char1 + char2, 0)
+    unigram_count = ngram_db['unigram_counts'].get(char1, 0)
+    alpha = ngram_db['smoothing_alpha']
+    return (bigram_count + alpha) / (unigram_count + alpha * ngram_db['vocab_size'])
+
+
+# ============================================================================
+# Category 1: Smoothed Log-Probabilities
+# ============================================================================
+
+class TestLaplaceScorer(unittest.TestCase):
+    """Test batch scoring against the per-pair reference formula."""
+
+    def setUp(self):
+        self.scorer = LaplaceScorer(MODEL)
+
+    def test_batch_matches_reference(self):
+        """Test every pair (seen, unseen, unknown chars) matches the formula."""
+        chars = ['台', '灣', '中', '華', '民', '薔']
+        pairs = [(a, b) for a in chars for b in chars]
+        ids1 = [self.scorer.char_id(a) for a, _ in pairs]
+        ids2 = [self.scorer.char_id(b) for _, b in pairs]
+
+        log_probs = self.scorer.log_probs(ids1, ids2)
+
+        self.assertEqual(len(log_probs), len(pairs))
+        for (a, b), log_prob in zip(pairs, log_probs):
+            self.assertAlmostEqual(log_prob, math.log(reference_prob(a, b, MODEL)), msg=a + b)
+            self.assertAlmostEqual(self.scorer.log_prob(a, b), log_prob)
+
+    def test_unknown_chars_share_id(self):
+        """Test characters outside the model map to unknown_id."""
+        self.assertEqual(self.scorer.encode('薔薇'), [self.scorer.unknown_id] * 2)
+        # '民' only appears inside a bigram but still gets a real ID
+        self.assertNotEqual(self.scorer.char_id('民'), self.scorer.unknown_id)
+
+    def test_is_seen(self):
+        """Test seen/unseen bigram lookup by ID."""
+        ids = self.scorer.encode('台灣中')
+        self.assertTrue(self.scorer.is_seen(ids[0], ids[1]))
+        self.assertFalse(self.scorer.is_seen(ids[1], ids[2]))
+
+    def test_sequence_and_multi_text(self):
+        """Test sequence sums and that transitions never span texts."""
+        expected = math.log(reference_prob('中', '華', MODEL)) + math.log(reference_prob('華', '民', MODEL))
+        self.assertAlmostEqual(self.scorer.sequence_log_prob('中華民'), expected)
+
+        log_probs = transition_log_probs(self.scorer, ['中華民', '台灣', '台'])
+        self.assertEqual(len(log_probs), 3)
+        self.assertAlmostEqual(log_probs[2], math.log(reference_prob('台', '灣', MODEL)))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestLaplaceScorer))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
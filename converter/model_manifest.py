@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+N-gram Model Manifests (metadata-only inspection)
+
+Comparing model versions only needs each model's metadata and the sizes of
+its count tables, but a full json.load of a multi-MB model takes most of a
+second. Builders therefore write a small manifest next to every model:
+
+    ngram_blended.json  →  ngram_blended.manifest.json
+
+read_model_header() returns the manifest when it still matches the model
+file (same size and mtime). Models without a fresh manifest fall back to
+scanning the end of the file, where both model formats keep their scalar
+parameters and `metadata`; table sizes then come from metadata statistics
+when available.
+
+read_model_section() streams one top-level table (e.g. `unigrams` for
+freq_map.json) out of a model in fixed-size chunks: other sections are
+skipped by a byte scanner and never parsed, and reading stops as soon as
+the requested section closes. read_model_members() does the same for a set
+of keys, e.g. the table's characters in the flat freq_map.json.
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import json
+import os
+import re
+from typing import Any, Container, Dict, Iterator, Optional, Tuple
+
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Bytes read from the end of a model when scanning for its metadata
+SCAN_TAIL_BYTES = 256 * 1024
+
+# Read size for read_model_section()
+SECTION_CHUNK_BYTES = 64 * 1024
+
+_SCALAR_KEYS = ('smoothing_alpha', 'total_chars', 'vocab_size')
+_SCALAR_PATTERN = re.compile(rb'"(smoothing_alpha|total_chars|vocab_size)"\s*:\s*(-?[0-9.eE+-]+)')
+_METADATA_PATTERN = re.compile(rb'"metadata"\s*:\s*')
+_STRUCTURE_PATTERN = re.compile(rb'["{}\[\]:,]')
+_STRING_END_PATTERN = re.compile(rb'["\\]')
+
+
+def manifest_path(model_path: str) -> str:
+    """Manifest file path for a model (model.json → model.manifest.json)."""
+    base, _ = os.path.splitext(model_path)
+    return base + MANIFEST_SUFFIX
+
+
+def model_header(ngram_db: Dict) -> Dict:
+    """
+    Metadata-only view of a loaded model.
+
+    Args:
+        ngram_db: Loaded N-gram database
+
+    Returns:
+        {'unigrams', 'bigrams', 'smoothing_alpha', 'total_chars',
+         'vocab_size', 'metadata'} (table sizes are entry counts)
+    """
+    return {
+        'unigrams': len(ngram_db.get('unigram_counts', {})),
+        'bigrams': len(ngram_db.get('bigram_counts', {})),
+        **{key: ngram_db.get(key) for key in _SCALAR_KEYS},
+        'metadata': ngram_db.get('metadata', {})
+    }
+
+
+def write_manifest(ngram_db: Dict, model_path: str) -> str:
+    """
+    Write the manifest for a model that has just been written to disk.
+
+    Args:
+        ngram_db: The model that was written
+        model_path: Path of the written model file
+
+    Returns:
+        Path of the manifest file
+    """
+    stat = os.stat(model_path)
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'model_file': os.path.basename(model_path),
+        'model_bytes': stat.st_size,
+        'model_mtime_ns': stat.st_mtime_ns,
+        **model_header(ngram_db)
+    }
+
+    path = manifest_path(model_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_manifest(model_path: str) -> Optional[Dict]:
+    """
+    Load a model's manifest if it exists and still describes the model file.
+
+    Returns:
+        Manifest dict, or None if missing, unreadable or stale
+    """
+    path = manifest_path(model_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(model_path)
+    if (manifest.get('manifest_version') != MANIFEST_VERSION
+            or manifest.get('model_bytes') != stat.st_size
+            or manifest.get('model_mtime_ns') != stat.st_mtime_ns):
+        return None
+
+    return manifest
+
+
+def scan_model_header(model_path: str, tail_bytes: int = SCAN_TAIL_BYTES) -> Optional[Dict]:
+    """
+    Read a model's header from the end of its file without parsing the tables.
+
+    Both builders write the count tables first and the scalar parameters and
+    `metadata` last, so the tail of the file holds everything except the
+    table sizes. Those are taken from metadata statistics when present
+    (None otherwise).
+
+    Args:
+        model_path: Model JSON file
+        tail_bytes: How many bytes to read from the end
+
+    Returns:
+        Header dict like model_header(), or None if the tail has no metadata
+    """
+    with open(model_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - tail_bytes))
+        tail = f.read()
+
+    matches = list(_METADATA_PATTERN.finditer(tail))
+    if not matches:
+        return None
+
+    try:
+        metadata, _ = json.JSONDecoder().raw_decode(tail[matches[-1].end():].decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(metadata, dict):
+        return None
+
+    header = {key: None for key in _SCALAR_KEYS}
+    for match in _SCALAR_PATTERN.finditer(tail[:matches[-1].start()]):
+        header[match.group(1).decode('ascii')] = json.loads(match.group(2))
+
+    statistics = metadata.get('statistics', {})
+    header['unigrams'] = statistics.get('unique_unigrams', header['vocab_size'])
+    header['bigrams'] = statistics.get('unique_bigrams')
+    header['metadata'] = metadata
+    return header
+
+
+def _iter_model_members(model_path: str, keys: Optional[Container[str]],
+                        chunk_bytes: int) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (key, raw JSON value bytes) for top-level members of a model file.
+
+    The file is scanned in chunks (UTF-8 continuation bytes never collide
+    with JSON structural characters, so bytes are scanned directly). Only
+    members whose key is in keys (all if None) are captured; the caller
+    decodes them and may stop early.
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model not found: {model_path}")
+
+    depth = 0
+    in_string = False
+    skip_escaped = False
+    expect_key = False
+    key_parts = None        # bytes of the top-level key being read
+    last_key = None
+    value_parts = None      # bytes of the member value being captured
+
+    with open(model_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+
+            i = 1 if skip_escaped else 0
+            skip_escaped = False
+            key_start = 0 if key_parts is not None else None
+            value_start = 0 if value_parts is not None else None
+
+            while i < len(chunk):
+                if in_string:
+                    match = _STRING_END_PATTERN.search(chunk, i)
+                    if match is None:
+                        break
+                    if match.group() == b'\\':
+                        i = match.end() + 1
+                        skip_escaped = i > len(chunk)
+                        continue
+                    in_string = False
+                    i = match.end()
+                    if key_start is not None:
+                        key_parts.append(chunk[key_start:i - 1])
+                        raw_key = b''.join(key_parts)
+                        # Keys written with ensure_ascii=True hold \u escapes
+                        last_key = (json.loads(b'"' + raw_key + b'"') if b'\\' in raw_key
+                                    else raw_key.decode('utf-8'))
+                        key_parts = key_start = None
+                    continue
+
+                match = _STRUCTURE_PATTERN.search(chunk, i)
+                if match is None:
+                    break
+                token = match.group()
+                i = match.end()
+
+                if token == b'"':
+                    in_string = True
+                    if depth == 1 and expect_key:
+                        key_parts, key_start = [], i
+                elif token in (b'{', b'['):
+                    depth += 1
+                    if depth == 1:
+                        if token != b'{':
+                            raise ValueError(f"Not a JSON object: {model_path}")
+                        expect_key = True
+                elif depth == 1 and token in (b',', b'}'):
+                    if value_parts is not None:
+                        value_parts.append(chunk[value_start:i - 1])
+                        yield last_key, b''.join(value_parts)
+                        value_parts = value_start = None
+                    if token == b',':
+                        expect_key = True
+                    else:
+                        depth = 0
+                elif token in (b'}', b']'):
+                    depth -= 1
+                elif depth == 1 and token == b':':
+                    expect_key = False
+                    if keys is None or last_key in keys:
+                        value_parts, value_start = [], i
+
+            if key_start is not None:
+                key_parts.append(chunk[key_start:])
+            if value_start is not None:
+                value_parts.append(chunk[value_start:])
+
+
+def read_model_section(model_path: str, key: str,
+                       chunk_bytes: int = SECTION_CHUNK_BYTES) -> Any:
+    """
+    Parse one top-level member of a model JSON file without loading the rest.
+
+    Only the requested value is decoded; scanning stops when it ends.
+
+    Args:
+        model_path: Model JSON file (a top-level object)
+        key: Top-level key to extract, e.g. 'unigrams'
+        chunk_bytes: Read size
+
+    Returns:
+        The decoded value
+
+    Raises:
+        FileNotFoundError: If the model does not exist
+        ValueError: If the key is missing or the file is not a JSON object
+
+    Example:
+        >>> unigrams = read_model_section('mvp2-predictive/data/ngram_pruned.json', 'unigrams')
+        >>> round(unigrams['的'], 4)
+        0.0397
+    """
+    for _, raw_value in _iter_model_members(model_path, (key,), chunk_bytes):
+        return json.loads(raw_value.decode('utf-8'))
+
+    raise ValueError(f"Key '{key}' not found in {model_path}")
+
+
+def read_model_members(model_path: str, keys: Container[str],
+                       chunk_bytes: int = SECTION_CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Parse the listed top-level members of a JSON object file, skipping the rest.
+
+    For flat tables such as freq_map.json (char → score), where a caller
+    only needs the entries of its own characters: the file is streamed and
+    only those members are decoded and kept.
+
+    Args:
+        model_path: JSON file (a top-level object)
+        keys: Top-level keys to extract (a set, for fast membership tests)
+        chunk_bytes: Read size
+
+    Returns:
+        Key → decoded value, for the keys present in the file
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not a JSON object
+
+    Example:
+        >>> scores = read_model_members('mvp2-predictive/data/freq_map.json', {'的', '𠀀'})
+        >>> list(scores)
+        ['的']
+    """
+    found = []
+    raw_values = []
+    for key, raw_value in _iter_model_members(model_path, keys, chunk_bytes):
+        found.append(key)
+        raw_values.append(raw_value)
+
+    # One decode for all values instead of one json.loads() per member
+    values = json.loads(b'[' + b','.join(raw_values) + b']')
+    return dict(zip(found, values))
+
+
+def read_model_header(model_path: str, allow_full_load: bool = False) -> Optional[Dict]:
+    """
+    Model header via the fastest available route.
+
+    Order: fresh manifest → tail scan → (optionally) full JSON load.
+
+    Args:
+        model_path: Model JSON file
+        allow_full_load: Fall back to json.load when the scan finds nothing
+
+    Returns:
+        Header dict with a 'source' key ('manifest', 'scan' or 'load'),
+        or None if the model is missing or unreadable without a full load
+
+    Example:
+        >>> header = read_model_header('mvp1/ngram_blended.json')
+        >>> header['source'], header['metadata']['version']
+        ('manifest', '1.1-blended')
+    """
+    if not os.path.exists(model_path):
+        return None
+
+    header = load_manifest(model_path)
+    if header is not None:
+        header['source'] = 'manifest'
+        return header
+
+    header = scan_model_header(model_path)
+    if header is not None:
+        header['source'] = 'scan'
+        return header
+
+    if not allow_full_load:
+        return None
+
+    with open(model_path, 'r', encoding='utf-8') as f:
+        header = model_header(json.load(f))
+    header['source'] = 'load'
+    return header
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+N-gram Successor Index
+
+Next-character lookups ("which characters most often follow 我?") used to
+scan the whole bigram dict for every query: O(bigrams) per character, so
+evaluating a phrase list cost O(phrases × bigrams).
+
+SuccessorIndex groups the bigram table by first character once per loaded
+model and keeps each successor list pre-sorted by score, so a top-N query
+is a dict lookup plus a slice, and rank queries are a dict lookup.
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+class SuccessorIndex:
+    """
+    Per-character successor lists, sorted by score descending.
+
+    Ties keep the bigram table's order (stable sort), so results match the
+    previous full-scan implementation exactly.
+
+    Example:
+        >>> index = SuccessorIndex({'我的': 100, '我是': 80, '你好': 5})
+        >>> index.top('我', 1)
+        [('的', 100)]
+        >>> index.rank('我', '是')
+        1
+        >>> index.rank('我', '們') is None
+        True
+    """
+
+    def __init__(self, bigram_scores: Dict[str, float]):
+        """
+        Args:
+            bigram_scores: Bigram string → score (probability or count)
+        """
+        successors = {}
+        for bigram, score in bigram_scores.items():
+            if len(bigram) != 2:
+                continue
+            successors.setdefault(bigram[0], []).append((bigram[1], score))
+
+        for nexts in successors.values():
+            nexts.sort(key=lambda x: x[1], reverse=True)
+
+        self._successors = successors
+        self._ranks = {}  # char → {next_char: rank}, built on first rank() query
+
+    @classmethod
+    def from_model(cls, ngram_db: Dict, key: Optional[str] = None) -> 'SuccessorIndex':
+        """
+        Build the index from a loaded N-gram database.
+
+        Args:
+            ngram_db: N-gram database dictionary
+            key: Bigram table to index ('bigram_counts' or 'bigrams'; default:
+                bigram_counts if the model has them, else bigrams)
+
+        Returns:
+            SuccessorIndex over ngram_db[key] (empty if the key is missing)
+        """
+        if key is None:
+            key = 'bigram_counts' if 'bigram_counts' in ngram_db else 'bigrams'
+        return cls(ngram_db.get(key, {}))
+
+    def top(self, char: str, n: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top N successors of a character.
+
+        Args:
+            char: Current character
+            n: Number of successors to return
+
+        Returns:
+            List of (next_char, score) tuples sorted by score descending
+        """
+        return self._successors.get(char, [])[:n]
+
+    def rank(self, char: str, next_char: str) -> Optional[int]:
+        """
+        0-based rank of next_char among char's successors.
+
+        Args:
+            char: Current character
+            next_char: Candidate next character
+
+        Returns:
+            Rank (0 = most likely), or None if the bigram is not in the table
+        """
+        ranks = self._ranks.get(char)
+        if ranks is None:
+            ranks = {c: i for i, (c, _) in enumerate(self._successors.get(char, []))}
+            self._ranks[char] = ranks
+        return ranks.get(next_char)
+
+    def __contains__(self, char: str) -> bool:
+        return char in self._successors
+
+    def __len__(self) -> int:
+        return len(self._successors)
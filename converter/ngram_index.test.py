@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+N-gram Successor Index - Test Suite
+
+Categories:
+  1. Top-N Successors
+  2. Successor Ranks
+  3. Model Loading
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+import unittest
+import random
+from ngram_index import SuccessorIndex
+
+
+TEST_BIGRAM_COUNTS = {
+    '我們': 5, '我的': 9, '我是': 5, '我要': 2,
+    '你好': 7, '你們': 7,
+    '的人': 3,
+    '我': 50, '我的人': 1  # not bigrams, ignored
+}
+
+
+def scan_top(bigram_scores, char, n):
+    """Full-table scan the index replaced (reference implementation)."""
+    candidates = [(bigram[1], score) for bigram, score in bigram_scores.items()
+                  if len(bigram) == 2 and bigram[0] == char]
+    candidates.sort(key=lambda x: x[1], reverse=True)
+    return candidates[:n]
+
+
+# ============================================================================
+# Category 1: Top-N Successors
+# ============================================================================
+
+class TestTopSuccessors(unittest.TestCase):
+    """Test top-N successor queries."""
+
+    def setUp(self):
+        self.index = SuccessorIndex(TEST_BIGRAM_COUNTS)
+
+    def test_sorted_by_score(self):
+        """Test successors come back by score descending, limited to n."""
+        self.assertEqual(self.index.top('我', 2), [('的', 9), ('們', 5)])
+        self.assertEqual(self.index.top('的'), [('人', 3)])
+
+    def test_ties_keep_table_order(self):
+        """Test equal scores keep the bigram table's order."""
+        self.assertEqual(self.index.top('我'), [('的', 9), ('們', 5), ('是', 5), ('要', 2)])
+        self.assertEqual(self.index.top('你'), [('好', 7), ('們', 7)])
+
+        reordered = SuccessorIndex({'你們': 7, '你好': 7})
+        self.assertEqual(reordered.top('你'), [('們', 7), ('好', 7)])
+
+    def test_unknown_char_and_non_bigrams(self):
+        """Test unknown characters have no successors and other keys are skipped."""
+        self.assertEqual(self.index.top('他'), [])
+        self.assertEqual(self.index.top('人'), [])
+        self.assertNotIn('人', self.index)
+        self.assertEqual(len(self.index), 3)
+
+    def test_result_is_a_copy(self):
+        """Test changing a result list leaves the index untouched."""
+        self.index.top('我').clear()
+        self.assertEqual(len(self.index.top('我')), 4)
+
+    def test_matches_full_scan(self):
+        """Test top() equals the full-table scan on a random table."""
+        rng = random.Random(7)
+        chars = [chr(0x4e00 + i) for i in range(30)]
+        scores = {a + b: rng.randint(1, 5) for a in chars for b in chars if rng.random() < 0.4}
+        index = SuccessorIndex(scores)
+
+        for char in chars:
+            for n in (1, 5, 40):
+                self.assertEqual(index.top(char, n), scan_top(scores, char, n))
+
+
+# ============================================================================
+# Category 2: Successor Ranks
+# ============================================================================
+
+class TestSuccessorRanks(unittest.TestCase):
+    """Test 0-based rank queries."""
+
+    def setUp(self):
+        self.index = SuccessorIndex(TEST_BIGRAM_COUNTS)
+
+    def test_rank_follows_top_order(self):
+        """Test rank() is the position in top(), ties included."""
+        for char in ('我', '你', '的'):
+            for i, (next_char, _) in enumerate(self.index.top(char, 100)):
+                self.assertEqual(self.index.rank(char, next_char), i)
+        self.assertEqual(self.index.rank('我', '是'), 2)
+
+    def test_missing_bigram(self):
+        """Test bigrams outside the table have no rank."""
+        self.assertIsNone(self.index.rank('我', '好'))
+        self.assertIsNone(self.index.rank('他', '們'))
+        self.assertEqual(self.index.rank('我', '的'), 0)
+
+
+# ============================================================================
+# Category 3: Model Loading
+# ============================================================================
+
+class TestModelLoading(unittest.TestCase):
+    """Test building the index from a loaded N-gram database."""
+
+    def test_prefers_bigram_counts(self):
+        """Test bigram_counts are indexed when the model has them."""
+        ngram_db = {'bigram_counts': {'我的': 9, '我是': 5}, 'bigrams': {'我是': 0.7, '我的': 0.3}}
+        self.assertEqual(SuccessorIndex.from_model(ngram_db).top('我'), [('的', 9), ('是', 5)])
+
+    def test_falls_back_to_bigrams(self):
+        """Test probability-only models index their bigrams."""
+        ngram_db = {'unigrams': {'我': 0.1}, 'bigrams': {'我是': 0.7, '我的': 0.3}}
+        self.assertEqual(SuccessorIndex.from_model(ngram_db).top('我'), [('是', 0.7), ('的', 0.3)])
+
+    def test_explicit_key(self):
+        """Test an explicit key picks that table, and a missing one gives an empty index."""
+        ngram_db = {'bigram_counts': {'我的': 9, '我是': 5}, 'bigrams': {'我是': 0.7, '我的': 0.3}}
+        index = SuccessorIndex.from_model(ngram_db, key='bigrams')
+        self.assertEqual(index.rank('我', '是'), 0)
+
+        empty = SuccessorIndex.from_model({'unigram_counts': {'我': 1}})
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.top('我'), [])
+        self.assertIsNone(empty.rank('我', '的'))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestTopSuccessors))
+    suite.addTests(loader.loadTestsFromTestCase(TestSuccessorRanks))
+    suite.addTests(loader.loadTestsFromTestCase(TestModelLoading))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -11,13 +11,35 @@ Key Features:
 - Streaming processing (memory-efficient for GB-scale files)
 - Aggressive noise removal (URLs, metadata, English, special chars)
 - Colloquial pattern preservation (好ㄉ, ㄎㄎ, internet slang)
+- Incremental counting of append-only corpora (byte-offset checkpoints)
+- Resumable long-running jobs (periodic atomic snapshots)
+- Optional exact/near-duplicate line removal before counting
+- Pluggable sampling (head, stride, random seek, reservoir)
+- Staged reader/cleaner/counter pipeline (see corpus_pipeline.py)
 
 Design Document: docs/design/DESIGN-ngram-blended.md
 """
 
+import argparse
+import hashlib
+import json
+import os
 import re
 from collections import defaultdict
-from typing import Dict, Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from corpus_dedup import LineDeduplicator, print_dedup_report
+from corpus_sampling import SAMPLING_STRATEGIES, HeadSampler, make_sampler
+
+
+# Checkpoint file format version (bump on incompatible changes)
+CHECKPOINT_VERSION = 1
+
+# Bytes hashed at each end of the counted region to detect rotation/truncation
+FINGERPRINT_BYTES = 64 * 1024
+
+# Lines between periodic snapshots of partial counts
+DEFAULT_SNAPSHOT_INTERVAL = 500000
 
 
 def clean_ptt_text(text: str) -> str:
@@ -98,10 +120,162 @@ def clean_ptt_text(text: str) -> str:
     return text
 
 
+def split_raw_line(raw_line: bytes) -> List[str]:
+    """
+    Decode one raw corpus line (bytes up to and including b'\\n') into text lines.
+
+    Binary reads only split on b'\\n'. A bare '\\r' (classic Mac line
+    endings) also ends a line, and '\\r\\n' is one line break, as when the
+    corpus is read in text mode with universal newlines.
+
+    Example:
+        >>> split_raw_line('我知道\\r你好\\r\\n'.encode('utf-8'))
+        ['我知道\\n', '你好\\n']
+    """
+    text = raw_line.decode('utf-8')
+    if '\r' not in text:
+        return [text]
+
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    last = lines.pop()
+    return [line + '\n' for line in lines] + ([last] if last else [])
+
+
+def count_cleaned_line(
+    cleaned: str,
+    unigram_counts: Dict[str, int],
+    bigram_counts: Dict[str, int]
+) -> int:
+    """
+    Add the unigrams and bigrams of one cleaned line to the running counts.
+
+    Whitespace is never counted, and bigrams never span whitespace.
+
+    Args:
+        cleaned: Line already passed through clean_ptt_text()
+        unigram_counts: Running unigram counts (defaultdict(int), updated in place)
+        bigram_counts: Running bigram counts (defaultdict(int), updated in place)
+
+    Returns:
+        Number of characters counted as unigrams
+
+    Example:
+        >>> uni, bi = defaultdict(int), defaultdict(int)
+        >>> count_cleaned_line('我知道', uni, bi)
+        3
+        >>> dict(bi)
+        {'我知': 1, '知道': 1}
+    """
+    chars_counted = 0
+
+    for i in range(len(cleaned)):
+        char_A = cleaned[i]
+
+        # Skip whitespace in N-gram counting
+        if char_A.isspace():
+            continue
+
+        # Count unigram
+        unigram_counts[char_A] += 1
+        chars_counted += 1
+
+        # Count bigram (if next char exists and not whitespace)
+        if i < len(cleaned) - 1:
+            char_B = cleaned[i + 1]
+
+            # Skip bigrams with whitespace
+            if not char_B.isspace():
+                bigram = char_A + char_B
+                bigram_counts[bigram] += 1
+
+    return chars_counted
+
+
+def _count_corpus_range(
+    f: BinaryIO,
+    start_offset: int,
+    unigram_counts: Dict[str, int],
+    bigram_counts: Dict[str, int],
+    stats: Dict[str, int],
+    verbose: bool = False,
+    progress_interval: int = 10000,
+    complete_lines_only: bool = False,
+    snapshot_interval: int = 0,
+    on_snapshot: Optional[Callable[[int], None]] = None,
+    dedup: Optional[LineDeduplicator] = None,
+    sampler=None
+) -> int:
+    """
+    Clean and count every line of an open binary corpus file from start_offset.
+
+    Lines are read as bytes so the byte offset after each line is known
+    exactly; that offset is what checkpoints store. Bare '\\r' line endings
+    still end a line (see split_raw_line()).
+
+    Args:
+        f: Corpus file opened in binary mode
+        start_offset: Byte offset to start reading from (must be a line start)
+        unigram_counts: Running unigram counts (updated in place)
+        bigram_counts: Running bigram counts (updated in place)
+        stats: Running 'line_count' / 'total_chars' / 'empty_lines' (updated in place)
+        verbose: Print progress messages
+        progress_interval: Report progress every N lines
+        complete_lines_only: Stop before a trailing line without '\\n'
+            (it may still be being appended to)
+        snapshot_interval: Call on_snapshot every N lines (0 = never)
+        on_snapshot: Callback receiving the byte offset after the current line
+        dedup: Skip cleaned lines this deduplicator has already seen
+        sampler: Only count the lines this sampler yields (see
+            corpus_sampling.py); the returned offset is then meaningless
+
+    Returns:
+        Byte offset just after the last line that was counted
+    """
+    f.seek(start_offset)
+    offset = start_offset
+    raw_lines = f if sampler is None else sampler.iter_lines(f)
+
+    for raw_line in raw_lines:
+        if complete_lines_only and not raw_line.endswith(b'\n'):
+            break
+
+        offset += len(raw_line)
+        lines_before = stats['line_count']
+
+        for line in split_raw_line(raw_line):
+            stats['line_count'] += 1
+
+            # Progress reporting
+            if verbose and stats['line_count'] % progress_interval == 0:
+                print(f"[PTT] Processed {stats['line_count']:,} lines "
+                      f"({stats['total_chars']:,} chars)...")
+
+            # Clean noise from line
+            cleaned = clean_ptt_text(line)
+
+            # Skip empty and duplicate lines (after cleaning), count N-grams otherwise
+            if len(cleaned) < 2:
+                stats['empty_lines'] += 1
+            elif dedup is None or not dedup.is_duplicate(cleaned):
+                stats['total_chars'] += count_cleaned_line(cleaned, unigram_counts, bigram_counts)
+
+        # Snapshots only at raw line ends, where the byte offset is exact
+        if (on_snapshot and snapshot_interval > 0
+                and stats['line_count'] // snapshot_interval > lines_before // snapshot_interval):
+            on_snapshot(offset)
+
+    return offset
+
+
 def process_corpus(
     corpus_file_path: str,
     verbose: bool = False,
-    progress_interval: int = 10000
+    progress_interval: int = 10000,
+    snapshot_path: Optional[str] = None,
+    snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+    resume: bool = False,
+    dedup: Optional[LineDeduplicator] = None,
+    sampler=None
 ) -> Tuple[Dict[str, int], Dict[str, int]]:
     """
     Process raw text corpus (PTT, Dcard, chat logs) and extract N-gram counts.
@@ -109,10 +283,23 @@ def process_corpus(
     Memory-efficient streaming processing: reads file line-by-line without
     loading entire file into memory. Suitable for GB-scale corpora.
 
+    With snapshot_path set, partial counts and the input byte offset are
+    written atomically every snapshot_interval lines. If the job dies,
+    rerunning with resume=True continues from the last snapshot and yields
+    the same final counts as an uninterrupted run. The snapshot is deleted
+    once the pass completes.
+
     Args:
         corpus_file_path: Path to raw text file (one post/message per line)
         verbose: Print progress messages
         progress_interval: Report progress every N lines (default: 10,000)
+        snapshot_path: Snapshot JSON path (None = no snapshots)
+        snapshot_interval: Lines between snapshots (default: 500,000)
+        resume: Continue from snapshot_path if it matches the corpus
+        dedup: Optional LineDeduplicator; exact and near-duplicate lines are
+            skipped before counting (see corpus_dedup.py)
+        sampler: Optional sampler from corpus_sampling.py; only the sampled
+            lines are cleaned and counted
 
     Returns:
         Tuple of (unigram_counts, bigram_counts)
@@ -122,6 +309,9 @@ def process_corpus(
     Raises:
         FileNotFoundError: If corpus file doesn't exist
         IOError: If file cannot be read
+        ValueError: If resume is requested without a snapshot_path, or
+            combined with dedup (its state is not part of the snapshot),
+            or if snapshots are combined with a sampler
 
     Example:
         >>> uni, bi = process_corpus('ptt_corpus.txt', verbose=True)
@@ -139,71 +329,311 @@ def process_corpus(
         >>> len(bi)
         123456
     """
+    if resume and not snapshot_path:
+        raise ValueError("resume=True requires a snapshot_path")
+
+    if resume and dedup is not None:
+        raise ValueError("resume=True cannot be combined with dedup")
+
+    if snapshot_path and sampler is not None:
+        raise ValueError("Snapshots cannot be combined with sampling")
+
     if verbose:
         print(f"[PTT] Processing {corpus_file_path}...")
+        if sampler is not None:
+            print(f"[PTT] Sampling: {sampler.describe()}")
 
     unigram_counts = defaultdict(int)
     bigram_counts = defaultdict(int)
+    stats = _new_corpus_stats()
+    start_offset = 0
 
-    line_count = 0
-    total_chars = 0
-    empty_lines = 0
+    if not os.path.exists(corpus_file_path):
+        raise FileNotFoundError(f"Corpus file not found: {corpus_file_path}")
+
+    if resume:
+        snapshot = load_counts_checkpoint(snapshot_path)
+
+        if snapshot is not None and checkpoint_matches_corpus(snapshot, corpus_file_path):
+            unigram_counts.update(snapshot['unigram_counts'])
+            bigram_counts.update(snapshot['bigram_counts'])
+            stats.update(snapshot['stats'])
+            start_offset = snapshot['fingerprint']['offset']
+
+            if verbose:
+                print(f"[PTT] Resuming from snapshot at byte {start_offset:,} "
+                      f"({stats['line_count']:,} lines done)")
+        elif verbose:
+            print(f"[PTT] No matching snapshot at {snapshot_path}, starting from scratch")
+
+    on_snapshot = None
+    if snapshot_path:
+        def on_snapshot(offset: int) -> None:
+            save_counts_checkpoint(
+                snapshot_path, corpus_file_path, offset,
+                unigram_counts, bigram_counts, stats
+            )
+            if verbose:
+                print(f"[PTT] Snapshot saved at byte {offset:,}")
 
     try:
-        with open(corpus_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line_count += 1
+        with open(corpus_file_path, 'rb') as f:
+            _count_corpus_range(
+                f, start_offset, unigram_counts, bigram_counts, stats,
+                verbose=verbose, progress_interval=progress_interval,
+                snapshot_interval=snapshot_interval, on_snapshot=on_snapshot,
+                dedup=dedup, sampler=sampler
+            )
 
-                # Progress reporting
-                if verbose and line_count % progress_interval == 0:
-                    print(f"[PTT] Processed {line_count:,} lines "
-                          f"({total_chars:,} chars)...")
+    except IOError as e:
+        raise IOError(f"Error reading corpus file: {e}")
 
-                # Clean noise from line
-                cleaned = clean_ptt_text(line)
+    # The pass is complete; a leftover snapshot would only go stale
+    if snapshot_path and os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
 
-                # Skip empty lines (after cleaning)
-                if len(cleaned) < 2:
-                    empty_lines += 1
-                    continue
+    # Convert defaultdict to dict for JSON serialization
+    unigram_dict = dict(unigram_counts)
+    bigram_dict = dict(bigram_counts)
+
+    if verbose:
+        _print_corpus_summary(stats, unigram_dict, bigram_dict)
+        if dedup is not None:
+            print_dedup_report(dedup, prefix='[PTT]')
+
+    return unigram_dict, bigram_dict
+
+
+def _new_corpus_stats() -> Dict[str, int]:
+    """Fresh running statistics for a corpus pass."""
+    return {'line_count': 0, 'total_chars': 0, 'empty_lines': 0}
 
-                # Count N-grams
-                for i in range(len(cleaned)):
-                    char_A = cleaned[i]
 
-                    # Skip whitespace in N-gram counting
-                    if char_A.isspace():
-                        continue
+def _print_corpus_summary(
+    stats: Dict[str, int],
+    unigram_dict: Dict[str, int],
+    bigram_dict: Dict[str, int]
+) -> None:
+    """Print the end-of-pass summary shared by all corpus processing modes."""
+    print(f"[PTT] Complete!")
+    print(f"[PTT] Total lines: {stats['line_count']:,}")
+    print(f"[PTT] Empty lines (after cleaning): {stats['empty_lines']:,}")
+    print(f"[PTT] Total chars: {stats['total_chars']:,}")
+    print(f"[PTT] Unique unigrams: {len(unigram_dict):,}")
+    print(f"[PTT] Unique bigrams: {len(bigram_dict):,}")
 
-                    # Count unigram
-                    unigram_counts[char_A] += 1
-                    total_chars += 1
 
-                    # Count bigram (if next char exists and not whitespace)
-                    if i < len(cleaned) - 1:
-                        char_B = cleaned[i + 1]
+# ============================================================================
+# Checkpoints (incremental counting of append-only corpora)
+# ============================================================================
+
+def file_fingerprint(corpus_file_path: str, offset: int) -> Dict:
+    """
+    Fingerprint the first `offset` bytes of a corpus file.
 
-                        # Skip bigrams with whitespace
-                        if not char_B.isspace():
-                            bigram = char_A + char_B
-                            bigram_counts[bigram] += 1
+    Hashes the first and last FINGERPRINT_BYTES of the already-processed
+    region. An append-only file keeps the same fingerprint at an old offset;
+    a truncated, rewritten or rotated file does not.
 
-    except FileNotFoundError:
+    Args:
+        corpus_file_path: Path to corpus file
+        offset: End of the region to fingerprint (bytes)
+
+    Returns:
+        Dictionary with 'offset', 'head_sha1' and 'tail_sha1'
+    """
+    with open(corpus_file_path, 'rb') as f:
+        head = f.read(min(FINGERPRINT_BYTES, offset))
+
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(tail_start)
+        tail = f.read(offset - tail_start)
+
+    return {
+        'offset': offset,
+        'head_sha1': hashlib.sha1(head).hexdigest(),
+        'tail_sha1': hashlib.sha1(tail).hexdigest()
+    }
+
+
+def save_counts_checkpoint(
+    checkpoint_path: str,
+    corpus_file_path: str,
+    offset: int,
+    unigram_counts: Dict[str, int],
+    bigram_counts: Dict[str, int],
+    stats: Dict[str, int]
+) -> None:
+    """
+    Persist counts together with the corpus byte offset they cover.
+
+    The file is written to a temporary path and renamed over the old
+    checkpoint, so an interrupted write never leaves a corrupt checkpoint.
+
+    Args:
+        checkpoint_path: Output checkpoint JSON path
+        corpus_file_path: Corpus the counts were taken from
+        offset: Byte offset just after the last counted line
+        unigram_counts: Unigram counts covering bytes [0, offset)
+        bigram_counts: Bigram counts covering bytes [0, offset)
+        stats: Running line/char statistics
+    """
+    checkpoint = {
+        'checkpoint_version': CHECKPOINT_VERSION,
+        'corpus': os.path.abspath(corpus_file_path),
+        'fingerprint': file_fingerprint(corpus_file_path, offset),
+        'stats': dict(stats),
+        'unigram_counts': dict(unigram_counts),
+        'bigram_counts': dict(bigram_counts)
+    }
+
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def load_counts_checkpoint(checkpoint_path: str) -> Optional[Dict]:
+    """
+    Load a checkpoint written by save_counts_checkpoint().
+
+    Args:
+        checkpoint_path: Checkpoint JSON path
+
+    Returns:
+        Checkpoint dictionary, or None if missing, unreadable or from
+        an incompatible checkpoint version
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (IOError, ValueError):
+        return None
+
+    if checkpoint.get('checkpoint_version') != CHECKPOINT_VERSION:
+        return None
+
+    return checkpoint
+
+
+def checkpoint_matches_corpus(checkpoint: Dict, corpus_file_path: str) -> bool:
+    """
+    Check whether a checkpoint's counted region is still a prefix of the corpus.
+
+    Returns False if the file shrank below the checkpointed offset
+    (truncation) or if the bytes at the checkpointed region changed
+    (rotation / rewrite). Either case requires a full rebuild.
+
+    Args:
+        checkpoint: Checkpoint dictionary
+        corpus_file_path: Current corpus file
+
+    Returns:
+        True if counting can safely continue from the checkpoint offset
+    """
+    fingerprint = checkpoint.get('fingerprint', {})
+    offset = fingerprint.get('offset')
+
+    if not isinstance(offset, int) or offset < 0:
+        return False
+
+    if os.path.getsize(corpus_file_path) < offset:
+        return False
+
+    return file_fingerprint(corpus_file_path, offset) == fingerprint
+
+
+def process_corpus_incremental(
+    corpus_file_path: str,
+    checkpoint_path: str,
+    verbose: bool = False,
+    progress_interval: int = 10000,
+    snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Process an append-only corpus, counting only the bytes added since the last run.
+
+    The checkpoint stores the counts plus the byte offset and fingerprint of
+    the region they cover. If the checkpoint still matches the corpus, only
+    the appended tail is cleaned and counted and merged into the stored counts;
+    otherwise (no checkpoint, truncation, rotation) the whole file is counted.
+    A trailing line without '\\n' is left for the next run, since the writer
+    may still be appending to it. The checkpoint is also refreshed every
+    snapshot_interval lines, so an interrupted run loses little work.
+
+    Args:
+        corpus_file_path: Path to raw text file (one post/message per line)
+        checkpoint_path: Checkpoint JSON path (created or updated)
+        verbose: Print progress messages
+        progress_interval: Report progress every N lines (default: 10,000)
+        snapshot_interval: Lines between checkpoint refreshes (0 = only at end)
+
+    Returns:
+        Tuple of (unigram_counts, bigram_counts) for the whole corpus
+
+    Raises:
+        FileNotFoundError: If corpus file doesn't exist
+
+    Example:
+        >>> uni, bi = process_corpus_incremental('chat.txt', 'chat.ckpt.json', verbose=True)
+        [PTT] Checkpoint valid, resuming at byte 104,857,600
+        [PTT] Complete!
+        ...
+    """
+    if not os.path.exists(corpus_file_path):
         raise FileNotFoundError(f"Corpus file not found: {corpus_file_path}")
-    except IOError as e:
-        raise IOError(f"Error reading corpus file: {e}")
 
-    # Convert defaultdict to dict for JSON serialization
+    unigram_counts = defaultdict(int)
+    bigram_counts = defaultdict(int)
+    stats = _new_corpus_stats()
+    start_offset = 0
+
+    checkpoint = load_counts_checkpoint(checkpoint_path)
+
+    if checkpoint is not None and checkpoint_matches_corpus(checkpoint, corpus_file_path):
+        unigram_counts.update(checkpoint['unigram_counts'])
+        bigram_counts.update(checkpoint['bigram_counts'])
+        stats.update(checkpoint['stats'])
+        start_offset = checkpoint['fingerprint']['offset']
+
+        if verbose:
+            print(f"[PTT] Checkpoint valid, resuming at byte {start_offset:,}")
+    elif verbose:
+        if checkpoint is None:
+            print(f"[PTT] No usable checkpoint, processing {corpus_file_path} from start...")
+        else:
+            print(f"[PTT] Corpus truncated or rotated, full rebuild of {corpus_file_path}...")
+
+    def on_snapshot(offset: int) -> None:
+        save_counts_checkpoint(
+            checkpoint_path, corpus_file_path, offset,
+            unigram_counts, bigram_counts, stats
+        )
+
+    with open(corpus_file_path, 'rb') as f:
+        end_offset = _count_corpus_range(
+            f, start_offset, unigram_counts, bigram_counts, stats,
+            verbose=verbose, progress_interval=progress_interval,
+            complete_lines_only=True,
+            snapshot_interval=snapshot_interval, on_snapshot=on_snapshot
+        )
+
+    save_counts_checkpoint(
+        checkpoint_path, corpus_file_path, end_offset,
+        unigram_counts, bigram_counts, stats
+    )
+
     unigram_dict = dict(unigram_counts)
     bigram_dict = dict(bigram_counts)
 
     if verbose:
-        print(f"[PTT] Complete!")
-        print(f"[PTT] Total lines: {line_count:,}")
-        print(f"[PTT] Empty lines (after cleaning): {empty_lines:,}")
-        print(f"[PTT] Total chars: {total_chars:,}")
-        print(f"[PTT] Unique unigrams: {len(unigram_dict):,}")
-        print(f"[PTT] Unique bigrams: {len(bigram_dict):,}")
+        print(f"[PTT] Counted {end_offset - start_offset:,} new bytes")
+        _print_corpus_summary(stats, unigram_dict, bigram_dict)
 
     return unigram_dict, bigram_dict
 
@@ -216,6 +646,10 @@ def process_corpus_sample(
     """
     Process only the first N lines of a corpus (for testing/sampling).
 
+    Shorthand for process_corpus(..., sampler=HeadSampler(max_lines)). For a
+    representative sample use process_corpus() with one of the other
+    strategies in corpus_sampling.py (stride, seek, reservoir).
+
     Useful for:
     - Testing pipeline with small data
     - Quick quality checks before full processing
@@ -234,67 +668,187 @@ def process_corpus_sample(
         >>> len(uni)  # Much smaller than full corpus
         1234
     """
-    if verbose:
-        print(f"[PTT Sample] Processing first {max_lines:,} lines of {corpus_file_path}...")
-
-    unigram_counts = defaultdict(int)
-    bigram_counts = defaultdict(int)
-
-    line_count = 0
-    total_chars = 0
-
-    with open(corpus_file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line_count >= max_lines:
-                break
-
-            line_count += 1
-
-            # Clean and count (same logic as full processing)
-            cleaned = clean_ptt_text(line)
-
-            if len(cleaned) < 2:
-                continue
-
-            for i in range(len(cleaned)):
-                char_A = cleaned[i]
-
-                if char_A.isspace():
-                    continue
-
-                unigram_counts[char_A] += 1
-                total_chars += 1
-
-                if i < len(cleaned) - 1:
-                    char_B = cleaned[i + 1]
-                    if not char_B.isspace():
-                        bigram = char_A + char_B
-                        bigram_counts[bigram] += 1
-
-    unigram_dict = dict(unigram_counts)
-    bigram_dict = dict(bigram_counts)
-
-    if verbose:
-        print(f"[PTT Sample] Processed {line_count:,} lines ({total_chars:,} chars)")
-        print(f"[PTT Sample] Unique unigrams: {len(unigram_dict):,}")
-        print(f"[PTT Sample] Unique bigrams: {len(bigram_dict):,}")
-
-    return unigram_dict, bigram_dict
+    return process_corpus(
+        corpus_file_path,
+        verbose=verbose,
+        sampler=HeadSampler(max_lines)
+    )
+
+
+def write_counts(
+    output_path: str,
+    unigram_counts: Dict[str, int],
+    bigram_counts: Dict[str, int]
+) -> None:
+    """Write raw N-gram counts to a compact JSON file."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(
+            {'unigram_counts': unigram_counts, 'bigram_counts': bigram_counts},
+            f, ensure_ascii=False, separators=(',', ':')
+        )
+
+
+def _sample_rate(value: str) -> float:
+    """argparse type for --sample-rate: a fraction in (0, 1]."""
+    rate = float(value)
+    if not 0 < rate <= 1:
+        raise argparse.ArgumentTypeError(f"must be in (0, 1], got {value}")
+    return rate
+
+
+def add_sampling_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the shared --sample/--sample-rate/--sample-lines/--sample-seed options."""
+    parser.add_argument(
+        '--sample',
+        choices=SAMPLING_STRATEGIES,
+        help='Only count a sample of the corpus using this strategy'
+    )
+    parser.add_argument(
+        '--sample-rate',
+        type=_sample_rate,
+        help='Fraction of the corpus to sample (e.g. 0.01)'
+    )
+    parser.add_argument(
+        '--sample-lines',
+        type=int,
+        help='Number of lines to sample'
+    )
+    parser.add_argument(
+        '--sample-seed',
+        type=int,
+        default=0,
+        help='Random seed for seek/reservoir sampling (default: 0)'
+    )
+
+
+def sampler_from_args(args: argparse.Namespace, corpus_file_path: str):
+    """Build the sampler requested by add_sampling_arguments() options (or None)."""
+    if not args.sample:
+        return None
+
+    return make_sampler(
+        args.sample,
+        corpus_file_path,
+        rate=args.sample_rate,
+        lines=args.sample_lines,
+        seed=args.sample_seed
+    )
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='Count N-grams in a raw text corpus (PTT, Dcard, chat logs)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Full pass, snapshotting every 500K lines
+  python3 process_raw_text.py converter/raw_data/ptt_corpus.txt \\
+    --output ptt_counts.json --snapshot ptt.snapshot.json --verbose
+
+  # Continue after the job above was killed
+  python3 process_raw_text.py converter/raw_data/ptt_corpus.txt \\
+    --output ptt_counts.json --snapshot ptt.snapshot.json --resume --verbose
+
+  # Quick estimate from a random 1% of the corpus
+  python3 process_raw_text.py converter/raw_data/ptt_corpus.txt \\
+    --output ptt_sample.json --sample seek --sample-rate 0.01
+
+  # Daily append-only corpus: only count what was appended since last run
+  python3 process_raw_text.py chat.txt \\
+    --output chat_counts.json --incremental chat.ckpt.json
+        '''
+    )
+
+    parser.add_argument('corpus', help='Path to raw text corpus file')
+    parser.add_argument(
+        '--output',
+        required=True,
+        help='Output counts JSON file path'
+    )
+    parser.add_argument(
+        '--incremental',
+        metavar='CHECKPOINT',
+        help='Checkpoint file for incremental counting of an append-only corpus'
+    )
+    parser.add_argument(
+        '--snapshot',
+        metavar='PATH',
+        help='Write periodic snapshots of partial counts to PATH'
+    )
+    parser.add_argument(
+        '--snapshot-interval',
+        type=int,
+        default=DEFAULT_SNAPSHOT_INTERVAL,
+        help=f'Lines between snapshots (default: {DEFAULT_SNAPSHOT_INTERVAL:,})'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the --snapshot file left by an interrupted run'
+    )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Skip exact and near-duplicate lines (quotes, reposts) before counting'
+    )
+    add_sampling_arguments(parser)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Clean in N worker processes with the staged pipeline (default: 0 = single loop)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print detailed progress messages'
+    )
+
+    args = parser.parse_args()
+
+    if args.resume and not args.snapshot:
+        parser.error('--resume requires --snapshot')
+
+    if args.dedup and (args.resume or args.incremental):
+        parser.error('--dedup cannot be combined with --resume or --incremental')
+
+    if args.sample and (args.snapshot or args.incremental):
+        parser.error('--sample cannot be combined with --snapshot or --incremental')
+
+    if args.incremental and (args.snapshot or args.resume):
+        parser.error('--incremental already checkpoints; do not combine with --snapshot/--resume')
+
+    if args.workers > 0 and (args.snapshot or args.incremental or args.dedup or args.sample):
+        parser.error('--workers cannot be combined with --snapshot, --incremental, --dedup or --sample')
+
+    if args.workers > 0:
+        # Imported here: corpus_pipeline itself imports this module
+        from corpus_pipeline import process_corpus_pipelined
+        uni, bi, _ = process_corpus_pipelined(
+            args.corpus, workers=args.workers, verbose=args.verbose
+        )
+    elif args.incremental:
+        uni, bi = process_corpus_incremental(
+            args.corpus, args.incremental,
+            verbose=args.verbose, snapshot_interval=args.snapshot_interval
+        )
+    else:
+        uni, bi = process_corpus(
+            args.corpus,
+            verbose=args.verbose,
+            snapshot_path=args.snapshot,
+            snapshot_interval=args.snapshot_interval,
+            resume=args.resume,
+            dedup=LineDeduplicator() if args.dedup else None,
+            sampler=sampler_from_args(args, args.corpus)
+        )
+
+    write_counts(args.output, uni, bi)
+
+    if args.verbose:
+        print(f"[PTT] Counts written to {args.output}")
 
 
-# Main entry point for testing
 if __name__ == "__main__":
-    print("PTT-Corpus Raw Text Processor (Session 9)")
-    print("=" * 60)
-    print()
-    print("This module provides functions for processing raw text corpora:")
-    print("  - clean_ptt_text(text): Remove noise, keep Chinese + colloquialisms")
-    print("  - process_corpus(file): Full corpus processing (streaming)")
-    print("  - process_corpus_sample(file, N): Process first N lines (testing)")
-    print()
-    print("Usage:")
-    print("  from process_raw_text import process_corpus")
-    print("  uni, bi = process_corpus('ptt_corpus.txt', verbose=True)")
-    print()
-    print("Design: docs/design/DESIGN-ngram-blended.md")
-    print("=" * 60)
+    main()
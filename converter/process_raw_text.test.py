@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Raw Text Corpus Processor - Test Suite
+
+Categories:
+  1. Cleaning & Counting
+  2. Incremental Checkpoints
+  3. Resumable Snapshots
+  4. Duplicate Line Removal
+  5. Sampling Strategies
+  6. Pipelined Processing
+
+Design Document: docs/design/DESIGN-ngram-blended.md
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+import corpus_pipeline
+import process_raw_text
+from corpus_dedup import LineDeduplicator
+from corpus_pipeline import process_corpus_pipelined
+from corpus_sampling import (
+    HeadSampler,
+    StrideSampler,
+    RandomSeekSampler,
+    ReservoirSampler,
+    SAMPLING_STRATEGIES,
+    make_sampler
+)
+from process_raw_text import (
+    clean_ptt_text,
+    process_corpus,
+    process_corpus_sample,
+    process_corpus_incremental,
+    load_counts_checkpoint
+)
+
+
+def write_corpus(path: str, content: str, mode: str = 'w') -> None:
+    """Write (or append) UTF-8 corpus text."""
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(content)
+
+
+# ============================================================================
+# Category 1: Cleaning & Counting
+# ============================================================================
+
+class TestCleaningAndCounting(unittest.TestCase):
+    """Test cleaning and full-corpus counting."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'ptt.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_clean_removes_noise(self):
+        """Test URLs, metadata and Latin text are removed."""
+        self.assertEqual(clean_ptt_text("這真的太神啦 https://example.com 推推推"),
+                         '這真的太神啦推推推')
+        self.assertEqual(clean_ptt_text("※ 發信站: 批踢踢實業坊(ptt.cc)"), '')
+        self.assertEqual(clean_ptt_text("XDDD 超派的啦 lol"), '超派的啦')
+
+    def test_process_corpus_counts(self):
+        """Test unigram and bigram counts of a small corpus."""
+        write_corpus(self.corpus, "我知道\n好ㄉ 我知道了\nhttps://x.y\n")
+
+        uni, bi = process_corpus(self.corpus)
+
+        self.assertEqual(uni['我'], 2)
+        self.assertEqual(uni['了'], 1)
+        self.assertEqual(bi['知道'], 2)
+        self.assertEqual(bi['好我'], 1)
+
+    def test_bare_carriage_returns_end_lines(self):
+        """Test '\\r' and '\\r\\n' line endings count like '\\n' (universal newlines)."""
+        text = "我知道\n※ 發信站\n好ㄉ 我知道了\n知道\n"
+        write_corpus(self.corpus, text)
+        expected = process_corpus(self.corpus)
+
+        with open(self.corpus, 'wb') as f:
+            f.write("我知道\r※ 發信站\r好ㄉ 我知道了\r\n知道\r".encode('utf-8'))
+        uni, bi = process_corpus(self.corpus)
+
+        self.assertEqual((uni, bi), expected)
+        self.assertEqual(bi['知道'], 3)
+        self.assertNotIn('道好', bi)
+        self.assertEqual(process_corpus_pipelined(self.corpus, use_processes=False)[:2], expected)
+
+    def test_process_corpus_missing_file(self):
+        """Test missing corpus raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            process_corpus(os.path.join(self.tmp_dir, 'missing.txt'))
+
+
+# ============================================================================
+# Category 2: Incremental Checkpoints
+# ============================================================================
+
+class TestIncrementalCheckpoints(unittest.TestCase):
+    """Test append-only incremental counting."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'chat.txt')
+        self.checkpoint = os.path.join(self.tmp_dir, 'chat.ckpt.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_matches_full_rebuild(self):
+        """Test counting appended tail gives the same counts as a full pass."""
+        write_corpus(self.corpus, "今天天氣很好\n我們去吃飯\n")
+        process_corpus_incremental(self.corpus, self.checkpoint)
+
+        write_corpus(self.corpus, "今天很好\n吃飯了嗎\n", mode='a')
+        uni, bi = process_corpus_incremental(self.corpus, self.checkpoint)
+
+        self.assertEqual((uni, bi), process_corpus(self.corpus))
+
+    def test_checkpoint_offset_advances(self):
+        """Test checkpoint stores the offset of the last complete line."""
+        write_corpus(self.corpus, "今天天氣很好\n未完成的行")
+        process_corpus_incremental(self.corpus, self.checkpoint)
+
+        checkpoint = load_counts_checkpoint(self.checkpoint)
+        self.assertEqual(checkpoint['fingerprint']['offset'],
+                         len("今天天氣很好\n".encode('utf-8')))
+
+        # Finishing the partial line counts it exactly once
+        write_corpus(self.corpus, "喔\n", mode='a')
+        uni, bi = process_corpus_incremental(self.corpus, self.checkpoint)
+        self.assertEqual((uni, bi), process_corpus(self.corpus))
+
+    def test_truncation_triggers_full_rebuild(self):
+        """Test a truncated corpus is recounted from scratch."""
+        write_corpus(self.corpus, "今天天氣很好\n我們去吃飯\n")
+        process_corpus_incremental(self.corpus, self.checkpoint)
+
+        write_corpus(self.corpus, "你好\n")
+        uni, bi = process_corpus_incremental(self.corpus, self.checkpoint)
+
+        self.assertEqual(uni, {'你': 1, '好': 1})
+        self.assertEqual(bi, {'你好': 1})
+
+    def test_rotation_triggers_full_rebuild(self):
+        """Test a rewritten corpus of larger size is recounted from scratch."""
+        write_corpus(self.corpus, "今天天氣很好\n")
+        process_corpus_incremental(self.corpus, self.checkpoint)
+
+        write_corpus(self.corpus, "完全不同的內容\n而且比較長一點\n")
+        uni, bi = process_corpus_incremental(self.corpus, self.checkpoint)
+
+        self.assertEqual((uni, bi), process_corpus(self.corpus))
+        self.assertNotIn('今', uni)
+
+
+# ============================================================================
+# Category 3: Resumable Snapshots
+# ============================================================================
+
+class SimulatedCrash(Exception):
+    """Raised to interrupt a corpus pass after a snapshot."""
+
+
+class TestResumableSnapshots(unittest.TestCase):
+    """Test periodic snapshots and resume after interruption."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'ptt.txt')
+        self.snapshot = os.path.join(self.tmp_dir, 'ptt.snapshot.json')
+        write_corpus(self.corpus, "".join(
+            f"第{chr(0x4e00 + i)}篇文章很好看\n" for i in range(50)
+        ))
+        self.original_save = process_raw_text.save_counts_checkpoint
+
+    def tearDown(self):
+        process_raw_text.save_counts_checkpoint = self.original_save
+        shutil.rmtree(self.tmp_dir)
+
+    def crash_after_snapshots(self, n: int) -> None:
+        """Make the next pass die right after its n-th snapshot."""
+        saved = []
+
+        def save_then_crash(*args, **kwargs):
+            self.original_save(*args, **kwargs)
+            saved.append(1)
+            if len(saved) >= n:
+                raise SimulatedCrash()
+
+        process_raw_text.save_counts_checkpoint = save_then_crash
+
+    def test_resume_gives_identical_counts(self):
+        """Test an interrupted then resumed pass equals an uninterrupted pass."""
+        expected = process_corpus(self.corpus)
+
+        self.crash_after_snapshots(3)
+        with self.assertRaises(SimulatedCrash):
+            process_corpus(self.corpus, snapshot_path=self.snapshot, snapshot_interval=7)
+        process_raw_text.save_counts_checkpoint = self.original_save
+
+        snapshot = load_counts_checkpoint(self.snapshot)
+        self.assertEqual(snapshot['stats']['line_count'], 21)
+
+        result = process_corpus(self.corpus, snapshot_path=self.snapshot,
+                                snapshot_interval=7, resume=True)
+
+        self.assertEqual(result, expected)
+        self.assertFalse(os.path.exists(self.snapshot))
+
+    def test_resume_without_snapshot_starts_fresh(self):
+        """Test resume with no snapshot file processes the whole corpus."""
+        result = process_corpus(self.corpus, snapshot_path=self.snapshot, resume=True)
+        self.assertEqual(result, process_corpus(self.corpus))
+
+    def test_resume_requires_snapshot_path(self):
+        """Test resume without a snapshot path is rejected."""
+        with self.assertRaises(ValueError):
+            process_corpus(self.corpus, resume=True)
+
+
+# ============================================================================
+# Category 4: Duplicate Line Removal
+# ============================================================================
+
+PARAGRAPH = "我覺得這個問題其實沒有那麼簡單大家應該多想一想再回答"
+
+
+class TestDuplicateRemoval(unittest.TestCase):
+    """Test exact and near-duplicate line removal."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'ptt.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_exact_duplicate_skipped(self):
+        """Test a reposted paragraph is counted once."""
+        dedup = LineDeduplicator()
+        self.assertFalse(dedup.is_duplicate(PARAGRAPH))
+        self.assertTrue(dedup.is_duplicate(PARAGRAPH))
+        self.assertEqual(dedup.stats['exact_lines'], 1)
+        self.assertEqual(dedup.stats['chars_skipped'], len(PARAGRAPH))
+
+    def test_near_duplicate_skipped(self):
+        """Test a quote with a one-character edit is detected."""
+        dedup = LineDeduplicator()
+        dedup.is_duplicate(PARAGRAPH)
+        self.assertTrue(dedup.is_duplicate(PARAGRAPH + "吧"))
+        self.assertEqual(dedup.stats['near_lines'], 1)
+
+    def test_distinct_and_short_lines_kept(self):
+        """Test unrelated lines and short replies are never skipped."""
+        dedup = LineDeduplicator()
+        dedup.is_duplicate(PARAGRAPH)
+        self.assertFalse(dedup.is_duplicate("今天天氣很好我們一起去公園散步順便吃個午餐"))
+        self.assertFalse(dedup.is_duplicate("哈哈哈"))
+        self.assertFalse(dedup.is_duplicate("哈哈哈"))
+
+    def test_signature_store_is_bounded(self):
+        """Test both stores never exceed their capacity and keep the newest lines."""
+        dedup = LineDeduplicator(max_signatures=5, max_exact_hashes=5)
+        lines = ["".join(chr(0x4e00 + 30 * i + j) for j in range(30)) for i in range(20)]
+        for line in lines:
+            self.assertFalse(dedup.is_duplicate(line))
+        self.assertLessEqual(len(dedup._signatures), 5)
+        self.assertLessEqual(len(dedup._exact_hashes), 5)
+        self.assertLessEqual(len(dedup._band_index), 5 * dedup.bands)
+
+        self.assertTrue(dedup.is_duplicate(lines[-1]))
+        self.assertTrue(dedup.is_duplicate(lines[-1] + "吧"))
+
+        with self.assertRaises(ValueError):
+            LineDeduplicator(max_signatures=0)
+
+    def test_similarity_estimate_tracks_jaccard(self):
+        """Test the one-permutation signature estimates shingle Jaccard similarity."""
+        dedup = LineDeduplicator()
+
+        def shingles(text):
+            return {text[i:i + 3] for i in range(len(text) - 2)}
+
+        text = "".join(chr(0x4e00 + (i * 37) % 2000) for i in range(400))
+        errors = []
+        for start in range(0, 300, 10):
+            line1 = text[start:start + 60]
+            line2 = text[start + 15:start + 80]
+            jaccard = (len(shingles(line1) & shingles(line2))
+                       / len(shingles(line1) | shingles(line2)))
+            sig1, sig2 = dedup.minhash(line1), dedup.minhash(line2)
+            self.assertEqual(len(sig1), dedup.num_perm)
+            errors.append(dedup.estimate_similarity(sig1, sig2) - jaccard)
+
+        self.assertLess(abs(sum(errors) / len(errors)), 0.03)
+        self.assertLess(max(abs(e) for e in errors), 0.2)
+        self.assertEqual(dedup.estimate_similarity(dedup.minhash(PARAGRAPH),
+                                                   dedup.minhash(PARAGRAPH)), 1.0)
+
+    def test_process_corpus_with_dedup(self):
+        """Test process_corpus counts reposted lines once."""
+        write_corpus(self.corpus, f"{PARAGRAPH}\n{PARAGRAPH}\n好啊\n好啊\n")
+
+        uni, bi = process_corpus(self.corpus, dedup=LineDeduplicator())
+
+        self.assertEqual(bi['問題'], 1)
+        self.assertEqual(bi['好啊'], 2)
+
+
+# ============================================================================
+# Category 5: Sampling Strategies
+# ============================================================================
+
+class TestSamplingStrategies(unittest.TestCase):
+    """Test pluggable corpus samplers."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'ptt.txt')
+        self.lines = [f"第{i:05d}行{chr(0x4e00 + i)}文字\n" for i in range(1000)]
+        write_corpus(self.corpus, "".join(self.lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def sample(self, sampler):
+        with open(self.corpus, 'rb') as f:
+            return [line.decode('utf-8') for line in sampler.iter_lines(f)]
+
+    def test_head(self):
+        """Test head sampler yields the first N lines."""
+        self.assertEqual(self.sample(HeadSampler(3)), self.lines[:3])
+
+    def test_stride(self):
+        """Test stride sampler yields every k-th line."""
+        sampled = self.sample(StrideSampler(100))
+        self.assertEqual(sampled, self.lines[::100])
+
+    def test_seek_yields_whole_lines(self):
+        """Test random seeks only yield complete, distinct corpus lines."""
+        sampled = self.sample(RandomSeekSampler(0.1, seed=1, block_bytes=256))
+        self.assertGreater(len(sampled), 0)
+        self.assertTrue(set(sampled) <= set(self.lines))
+        self.assertEqual(len(sampled), len(set(sampled)))
+
+    def test_reservoir_is_uniform_size_and_ordered(self):
+        """Test reservoir sampler yields N lines in file order, deterministically."""
+        sampled = self.sample(ReservoirSampler(50, seed=7))
+        self.assertEqual(len(sampled), 50)
+        self.assertEqual(sampled, sorted(sampled, key=self.lines.index))
+        self.assertEqual(sampled, self.sample(ReservoirSampler(50, seed=7)))
+        self.assertGreater(self.lines.index(sampled[-1]), 500)
+
+    def test_make_sampler_converts_rate(self):
+        """Test rate-to-lines conversion and rejection of bad strategies, rates and counts."""
+        sampler = make_sampler('head', self.corpus, rate=0.01)
+        self.assertEqual(sampler.max_lines, 10)
+        with self.assertRaises(ValueError):
+            make_sampler('bogus', self.corpus, rate=0.01)
+        for strategy in SAMPLING_STRATEGIES:
+            for kwargs in ({'rate': 0}, {'rate': 1.5}, {'lines': 0}):
+                with self.assertRaises(ValueError):
+                    make_sampler(strategy, self.corpus, **kwargs)
+
+    def test_process_corpus_sample_matches_head(self):
+        """Test process_corpus_sample is the head strategy of process_corpus."""
+        expected = process_corpus(self.corpus, sampler=HeadSampler(20))
+        self.assertEqual(process_corpus_sample(self.corpus, max_lines=20), expected)
+        self.assertEqual(expected[0]['行'], 20)
+
+
+# ============================================================================
+# Category 6: Pipelined Processing
+# ============================================================================
+
+class TestPipelinedProcessing(unittest.TestCase):
+    """Test the staged reader/cleaner/counter pipeline."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.tmp_dir, 'ptt.txt')
+        write_corpus(self.corpus, "".join(
+            f"第{chr(0x4e00 + i)}篇 https://x.y 好ㄉ文章\n※ 發信站\n" for i in range(300)
+        ) + "最後一行沒有換行")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_threads_match_process_corpus(self):
+        """Test threaded pipeline counts equal the single-loop counts."""
+        uni, bi, stats = process_corpus_pipelined(
+            self.corpus, workers=3, use_processes=False,
+            block_bytes=256, batch_lines=7, queue_size=2
+        )
+        self.assertEqual((uni, bi), process_corpus(self.corpus))
+        self.assertEqual(stats['line_count'], 601)
+        self.assertEqual(stats['empty_lines'], 300)
+
+    def test_processes_match_process_corpus(self):
+        """Test process-pool pipeline counts equal the single-loop counts."""
+        uni, bi, stats = process_corpus_pipelined(self.corpus, workers=2, batch_lines=50)
+        self.assertEqual((uni, bi), process_corpus(self.corpus))
+        self.assertIn(stats['bottleneck'], ('reader', 'cleaners', 'counter'))
+        self.assertEqual([s['stage'] for s in stats['stages']],
+                         ['reader', 'cleaners', 'counter'])
+
+    def test_count_order_matches_process_corpus(self):
+        """Test batches cleaned out of order are still counted in input order."""
+        clean_batch = corpus_pipeline._clean_batch
+
+        def slow_first_batch(raw_lines):
+            # The batch holding the first line finishes last
+            if raw_lines[0].startswith('第一篇'.encode('utf-8')):
+                time.sleep(0.2)
+            return clean_batch(raw_lines)
+
+        with mock.patch.object(corpus_pipeline, '_clean_batch', slow_first_batch):
+            uni, bi, _ = process_corpus_pipelined(
+                self.corpus, workers=3, use_processes=False, batch_lines=7
+            )
+
+        expected_uni, expected_bi = process_corpus(self.corpus)
+        self.assertEqual(list(uni.items()), list(expected_uni.items()))
+        self.assertEqual(list(bi.items()), list(expected_bi.items()))
+
+    def test_missing_file(self):
+        """Test missing corpus raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            process_corpus_pipelined(os.path.join(self.tmp_dir, 'missing.txt'))
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestCleaningAndCounting))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalCheckpoints))
+    suite.addTests(loader.loadTestsFromTestCase(TestResumableSnapshots))
+    suite.addTests(loader.loadTestsFromTestCase(TestDuplicateRemoval))
+    suite.addTests(loader.loadTestsFromTestCase(TestSamplingStrategies))
+    suite.addTests(loader.loadTestsFromTestCase(TestPipelinedProcessing))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
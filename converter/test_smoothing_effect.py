@@ -9,25 +9,16 @@ the improvement in handling unseen bigrams.
 import json
 import math
 
-def getLaplaceBigram(char1, char2, ngramDb):
-    """
-    Calculate Laplace-smoothed bigram probability (Python port of viterbi_module.js).
-
-    Formula: P(c2|c1) = (count(c1,c2) + alpha) / (count(c1) + alpha * vocab_size)
-    """
-    bigram = char1 + char2
-    bigramCount = ngramDb['bigram_counts'].get(bigram, 0)
-    unigramCount = ngramDb['unigram_counts'].get(char1, 0)
-    alpha = ngramDb['smoothing_alpha']
-    vocabSize = ngramDb['vocab_size']
-
-    return (bigramCount + alpha) / (unigramCount + alpha * vocabSize)
+from laplace_scoring import LaplaceScorer
 
 def main():
     # Load model with smoothing
     with open('mvp1/ngram_blended.json', 'r', encoding='utf-8') as f:
         db_smoothed = json.load(f)
 
+    # Formula: P(c2|c1) = (count(c1,c2) + alpha) / (count(c1) + alpha * vocab_size)
+    scorer = LaplaceScorer(db_smoothed)
+
     print("="*70)
     print("Testing Laplace Smoothing Effect")
     print("="*70)
@@ -53,8 +44,8 @@ def main():
         bigram = char1 + char2
         count = db_smoothed['bigram_counts'].get(bigram, 0)
 
-        prob = getLaplaceBigram(char1, char2, db_smoothed)
-        log_prob = math.log(prob)
+        log_prob = scorer.log_prob(char1, char2)
+        prob = math.exp(log_prob)
 
         status = "✅ Seen" if count > 0 else "⚠️ Unseen (smoothed!)"
 
@@ -92,8 +83,8 @@ def main():
     bigram = test_char1 + test_char2
 
     count = db_smoothed['bigram_counts'].get(bigram, 0)
-    prob = getLaplaceBigram(test_char1, test_char2, db_smoothed)
-    log_prob = math.log(prob)
+    log_prob = scorer.log_prob(test_char1, test_char2)
+    prob = math.exp(log_prob)
 
     print(f"Test bigram: {bigram}")
     print(f"Corpus count: {count}")
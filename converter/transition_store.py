@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hybrid Dense/Sparse Bigram Transition Store
+
+One lookup structure for per-pair bigram values (log-numerators, log-
+probabilities). LaplaceScorer keeps its bigram log-numerators here and
+viterbi_decoder.ProbabilityScorer its bigram log-probabilities, so the
+evaluation harness and both Viterbi scoring modes read the same store.
+Lookups take integer character IDs, so no concatenated bigram string is
+built per probe.
+
+Characters are ranked by frequency and the caller assigns IDs in that
+order, so the hottest characters have the smallest IDs. Pairs where both
+IDs are below dense_size live in a flat row-major block (dense_size²); the
+top 1024 characters carry about 77% of the bigram mass of the blended
+models, 2048 about 93%. Every other pair goes to a sparse map keyed by
+id1 * stride + id2. from_bigrams() halves the block until at least
+MIN_DENSE_FILL of it is used: top-k pruned models keep only ~10 successors
+per character (9,042 of the 1024² pairs of ngram_pruned.json), and an
+empty cell costs memory where a sparse entry would not.
+
+Dense cells hold an index into a table of the distinct stored values
+rather than the value itself: array('H') (2 bytes per cell, 2 MB for
+1024²) while there are fewer than 65,536 distinct values, widened to
+array('i') otherwise. Bigram values are log-transformed integer counts or
+count ratios, so they repeat heavily (about 9,000 distinct values in the
+top 1024² of mvp2-predictive/data/ngram_pruned.json), and unlike a
+float16/float32 block the lookups stay exact.
+
+The sparse fallback is a hash map rather than a sorted array: with
+CPython, a bisect probe measured about 4x slower than a dict probe, and
+Dayi lattices are full of rare characters that miss the dense block.
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+from array import array
+from typing import Callable, Dict, List, Sequence
+
+
+DEFAULT_DENSE_CHARS = 1024
+
+# Smallest used fraction of the dense block: a 2-byte cell against a
+# ~70-byte sparse entry breaks even at about 3%
+MIN_DENSE_FILL = 1 / 32
+
+
+def fit_dense_chars(max_ids: Sequence[int], dense_chars: int, min_fill: float = MIN_DENSE_FILL) -> int:
+    """
+    Largest block size (dense_chars halved until it fits) that is at least
+    min_fill used, or 0.
+
+    Args:
+        max_ids: max(id1, id2) of every stored pair
+        dense_chars: Upper bound for the block size
+        min_fill: Smallest used fraction of the block's cells
+
+    Example:
+        >>> fit_dense_chars([0, 1, 1, 3, 9], dense_chars=8, min_fill=0.25)
+        4
+    """
+    counts = [0] * max(dense_chars, 0)
+    for m in max_ids:
+        if m < dense_chars:
+            counts[m] += 1
+
+    size = dense_chars
+    while size > 0:
+        if sum(counts[:size]) >= min_fill * size * size:
+            return size
+        size //= 2
+    return 0
+
+
+def rank_chars(char_scores: Dict[str, float], extra_chars: Sequence[str] = ()) -> List[str]:
+    """
+    Characters ordered by score descending (ties by character).
+
+    Args:
+        char_scores: Character → frequency score (count or probability)
+        extra_chars: Characters to include even without a score (ranked last)
+
+    Returns:
+        Ordered character list; a character's index is its ID
+    """
+    chars = set(char_scores)
+    chars.update(extra_chars)
+    return sorted(chars, key=lambda c: (-char_scores.get(c, 0), c))
+
+
+class TransitionStore:
+    """
+    Bigram values over integer character IDs.
+
+    IDs run 0..num_chars-1; num_chars itself may be used as an "unknown"
+    ID and always yields missing. Pairs without a stored value yield
+    missing; a stored value equal to missing counts as absent.
+
+    Example:
+        >>> ids = {'我': 0, '的': 1, '是': 2}
+        >>> store = TransitionStore.from_bigrams(
+        ...     {'我的': -0.5, '我是': -1.2}, ids, missing=-20.0, dense_chars=2)
+        >>> store.get(0, 1), store.get(0, 2), store.get(1, 0)
+        (-0.5, -1.2, -20.0)
+        >>> list(store.matrix([0], [1, 2]))
+        [-0.5, -1.2]
+    """
+
+    def __init__(self, num_chars: int, missing: float, dense_chars: int = DEFAULT_DENSE_CHARS):
+        """
+        Args:
+            num_chars: Number of character IDs (IDs are 0..num_chars-1)
+            missing: Value for pairs that are not stored
+            dense_chars: IDs below this get a dense block
+        """
+        self.num_chars = num_chars
+        self.missing = missing
+        self.stride = num_chars + 1  # leaves room for an unknown ID
+        self.dense_size = max(0, min(dense_chars, num_chars))
+        # Dense cells index into values; index 0 is missing
+        self.values = array('d', [missing])
+        self.dense = array('H', bytes(2 * self.dense_size * self.dense_size))
+        self.sparse: Dict[int, float] = {}
+        self._value_index: Dict[float, int] = {missing: 0}
+        self._dense_count = 0
+
+    @classmethod
+    def from_bigrams(
+        cls,
+        bigram_values: Dict[str, float],
+        char_ids: Dict[str, int],
+        missing: float,
+        dense_chars: int = DEFAULT_DENSE_CHARS,
+        transform: Callable[[float], float] = None,
+        min_fill: float = MIN_DENSE_FILL
+    ) -> 'TransitionStore':
+        """
+        Build a store from a string-keyed bigram table.
+
+        Args:
+            bigram_values: Bigram string → value (2-char keys only are used)
+            char_ids: Character → ID (frequency-ranked for a useful dense block)
+            missing: Value for pairs that are not stored
+            dense_chars: Upper bound for the dense block (see fit_dense_chars())
+            transform: Applied to each value before storing (e.g. math.log)
+            min_fill: Smallest used fraction of the dense block (0 = always
+                dense_chars)
+
+        Returns:
+            TransitionStore
+        """
+        pairs = []
+        for bigram, value in bigram_values.items():
+            if len(bigram) != 2:
+                continue
+            id1 = char_ids.get(bigram[0])
+            id2 = char_ids.get(bigram[1])
+            if id1 is None or id2 is None:
+                continue
+            pairs.append((id1, id2, value))
+
+        if min_fill > 0:
+            dense_chars = fit_dense_chars([max(id1, id2) for id1, id2, _ in pairs],
+                                          min(dense_chars, len(char_ids)), min_fill)
+
+        store = cls(len(char_ids), missing, dense_chars)
+        for id1, id2, value in pairs:
+            store.set(id1, id2, transform(value) if transform else value)
+        store._value_index = None  # only needed while building
+        return store
+
+    def set(self, id1: int, id2: int, value: float) -> None:
+        """Store the value for one pair."""
+        size = self.dense_size
+        if id1 < size and id2 < size:
+            if self._value_index is None:
+                self._value_index = {v: i for i, v in reversed(list(enumerate(self.values)))}
+            value_index = self._value_index.get(value)
+            if value_index is None:
+                value_index = self._value_index[value] = len(self.values)
+                self.values.append(value)
+                if value_index == 65536 and self.dense.typecode == 'H':
+                    self.dense = array('i', self.dense)
+            index = id1 * size + id2
+            self._dense_count += (value_index != 0) - (self.dense[index] != 0)
+            self.dense[index] = value_index
+        else:
+            self.sparse[id1 * self.stride + id2] = value
+
+    def get(self, id1: int, id2: int) -> float:
+        """Value for one pair (missing if not stored)."""
+        size = self.dense_size
+        if id1 < size and id2 < size:
+            return self.values[self.dense[id1 * size + id2]]
+        return self.sparse.get(id1 * self.stride + id2, self.missing)
+
+    def contains(self, id1: int, id2: int) -> bool:
+        """Whether the pair has a stored value."""
+        return self.get(id1, id2) != self.missing
+
+    def lookup(self, ids1: Sequence[int], ids2: Sequence[int]) -> array:
+        """
+        Values for aligned batches of ID pairs.
+
+        Returns:
+            array('d'), one value per (ids1[i], ids2[i])
+        """
+        size = self.dense_size
+        values = self.values
+        dense = self.dense
+        get = self.sparse.get
+        stride = self.stride
+        missing = self.missing
+        return array('d', [
+            values[dense[a * size + b]] if a < size and b < size else get(a * stride + b, missing)
+            for a, b in zip(ids1, ids2)
+        ])
+
+    def matrix(self, prev_ids: Sequence[int], next_ids: Sequence[int]) -> array:
+        """
+        Row-major (len(prev) × len(next)) matrix of values.
+
+        Returns:
+            array('d') where entry i * len(next_ids) + j is (prev_ids[i], next_ids[j])
+        """
+        size = self.dense_size
+        values = self.values
+        dense = self.dense
+        get = self.sparse.get
+        stride = self.stride
+        missing = self.missing
+        return array('d', [
+            values[dense[a * size + b]] if a < size and b < size else get(a * stride + b, missing)
+            for a in prev_ids for b in next_ids
+        ])
+
+    def nbytes(self) -> int:
+        """Approximate memory: dense block, value table, sparse entries (~100 bytes each)."""
+        return (len(self.dense) * self.dense.itemsize + len(self.values) * self.values.itemsize
+                + len(self.sparse) * 100)
+
+    def __len__(self) -> int:
+        return self._dense_count + len(self.sparse)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hybrid Dense/Sparse Transition Store - Test Suite
+
+Categories:
+  1. Lookups
+
+Design Document: docs/design/DESIGN-ngram.md
+"""
+
+import unittest
+import random
+from transition_store import TransitionStore, fit_dense_chars, rank_chars
+
+
+# ============================================================================
+# Category 1: Lookups
+# ============================================================================
+
+class TestLookups(unittest.TestCase):
+    """Test the store against a plain dict across the dense/sparse boundary."""
+
+    def setUp(self):
+        rng = random.Random(5)
+        counts = {chr(0x4e00 + i): rng.randint(1, 1000) for i in range(40)}
+        self.chars = rank_chars(counts)
+        self.char_ids = {c: i for i, c in enumerate(self.chars)}
+        self.bigrams = {
+            a + b: rng.random()
+            for a in self.chars for b in self.chars if rng.random() < 0.3
+        }
+        self.store = TransitionStore.from_bigrams(self.bigrams, self.char_ids,
+                                                  missing=-1.0, dense_chars=10, min_fill=0)
+
+    def expected(self, id1, id2):
+        if id1 >= len(self.chars) or id2 >= len(self.chars):
+            return -1.0
+        return self.bigrams.get(self.chars[id1] + self.chars[id2], -1.0)
+
+    def test_rank_chars(self):
+        """Test characters are ordered by score, then character."""
+        self.assertEqual(rank_chars({'b': 2, 'a': 2, 'c': 5}, ['d']), ['c', 'a', 'b', 'd'])
+
+    def test_get_matches_dict(self):
+        """Test single-pair lookups, including the unknown ID."""
+        n = len(self.chars)
+        for id1 in range(n + 1):
+            for id2 in range(n + 1):
+                self.assertEqual(self.store.get(id1, id2), self.expected(id1, id2))
+                self.assertEqual(self.store.contains(id1, id2), self.expected(id1, id2) != -1.0)
+        self.assertEqual(len(self.store), len(self.bigrams))
+
+    def test_value_table(self):
+        """Test dense cells index exact values and widen past 65,536 values."""
+        self.assertEqual(self.store.dense.typecode, 'H')
+        self.assertEqual(self.store.dense_size, 10)
+
+        store = TransitionStore(300, missing=-1.0, dense_chars=300)
+        for i in range(300):
+            for j in range(300):
+                store.set(i, j, i * 300 + j + 0.5)
+        store.set(0, 1, -1.0)  # storing missing removes the pair
+        self.assertEqual(store.dense.typecode, 'i')
+        self.assertEqual(store.get(299, 298), 299 * 300 + 298 + 0.5)
+        self.assertFalse(store.contains(0, 1))
+        self.assertEqual(len(store), 300 * 300 - 1)
+
+    def test_dense_block_fit(self):
+        """Test sparse tables get a smaller (or no) dense block."""
+        self.assertEqual(fit_dense_chars([0, 1, 1, 3, 9], dense_chars=8, min_fill=0.25), 4)
+        self.assertEqual(fit_dense_chars([5, 6], dense_chars=8, min_fill=0.5), 0)
+
+        sparse = {self.chars[i] + self.chars[i + 1]: 1.0 for i in range(len(self.chars) - 1)}
+        store = TransitionStore.from_bigrams(sparse, self.char_ids, missing=-1.0,
+                                             dense_chars=32, min_fill=0.1)
+        self.assertEqual(store.dense_size, 8)
+        self.assertEqual(store.get(5, 6), 1.0)
+        self.assertEqual(store.get(20, 21), 1.0)
+        self.assertEqual(store.get(6, 5), -1.0)
+
+    def test_batch_lookups(self):
+        """Test aligned and matrix lookups agree with single lookups."""
+        ids = list(range(len(self.chars) + 1))
+        ids1 = [i for i in ids for _ in ids]
+        ids2 = ids * len(ids)
+        self.assertEqual(list(self.store.lookup(ids1, ids2)),
+                         [self.expected(a, b) for a, b in zip(ids1, ids2)])
+        self.assertEqual(list(self.store.matrix(ids, ids)),
+                         [self.expected(a, b) for a in ids for b in ids])
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestLookups))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,971 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Viterbi Sentence Decoder (Python port of mvp3-smart-engine/viterbi.js)
+
+Finds the most probable sentence for a sequence of Dayi codes with the same
+N-gram model the browser engine uses, so offline evaluation can decode
+large code sets without a JS runtime.
+
+The four steps mirror viterbi.js (buildLattice, initializeDP, forwardPass,
+backtrack), but each lattice step gathers one (prev × next) transition
+log-prob matrix and runs the DP over whole columns:
+
+    scores[j] = max_i(dp[i] + T[i, j]),  backpointer[j] = argmax_i(...)
+
+With NumPy installed the max/argmax is vectorized; without it the same
+step runs as per-column list operations. Both give identical results,
+including tie-breaking (the first maximum wins, as in viterbi.js).
+
+Codes with a single candidate (code_ambiguity.py index) are anchors: the
+best path must pass through them, so ViterbiDecoder.decode() splits the
+sentence at anchors, runs the DP only over each ambiguous stretch between
+two anchors, and steps across runs of anchors with one transition lookup
+each. Scores are carried across segments, so results are identical to
+one DP over the whole lattice. The index is checked against the
+dictionary per code; a sequence with a code whose count disagrees is
+decoded without anchors.
+
+IncrementalViterbi keeps the DP frontier between keystrokes: extend(code)
+computes only the new column (O(candidates²)) and pop() undoes the last
+one, so per-keystroke cost does not grow with sentence length.
+PrefixDecodeCache applies the same idea across calls: DP columns are
+cached per code-sequence prefix, and a new sequence resumes from its
+longest cached prefix.
+
+ViterbiDecoder.decode_beam() trades exactness for speed on long inputs:
+hypotheses are pruned to a beam width and a score margin after every
+step, and the k best sentences come back with their scores.
+
+Scoring:
+- 'probability': viterbi.js semantics, log of the stored unigram/bigram
+  probabilities floored at 1e-10
+- 'laplace':     viterbi_module.js Laplace smoothing over raw counts
+                 (laplace_scoring.LaplaceScorer)
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import json
+import math
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from code_ambiguity import build_ambiguity_index
+from laplace_scoring import LaplaceScorer
+from transition_store import DEFAULT_DENSE_CHARS, TransitionStore, rank_chars
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the pure-Python DP is used without it
+    np = None
+
+
+# Probability floor for unseen unigrams/bigrams (viterbi.js)
+MIN_PROB = 1e-10
+
+SMOOTHING_MODES = ['probability', 'laplace']
+
+# Hypotheses kept per step by beam decoding
+DEFAULT_BEAM_WIDTH = 16
+
+# Memory bound for PrefixDecodeCache
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+# ============================================================================
+# Transition scorers
+# ============================================================================
+
+class ProbabilityScorer:
+    """
+    viterbi.js scoring: log of stored probabilities, 1e-10 when missing.
+
+    Log-probabilities are computed once per model. Characters get integer
+    IDs by unigram probability (unknown characters share unknown_id), and
+    bigram log-probabilities live in a TransitionStore, so a lattice step
+    reads IDs instead of probing the table with concatenated strings.
+
+    Like LaplaceTransitionScorer, each method has an ID form (the decoder
+    encodes each code's candidates once) and a character form.
+    """
+
+    def __init__(self, ngram_db: Dict, floor: float = MIN_PROB,
+                 dense_chars: int = DEFAULT_DENSE_CHARS):
+        """
+        Args:
+            ngram_db: N-gram database with 'unigrams' and 'bigrams' probabilities
+            floor: Probability used for missing (or zero) entries
+            dense_chars: Most frequent characters whose bigrams are stored densely
+        """
+        self.floor_log_prob = math.log(floor)
+        unigrams = ngram_db.get('unigrams', {})
+        bigrams = {
+            bigram: p for bigram, p in ngram_db.get('bigrams', {}).items()
+            if len(bigram) == 2 and p > 0
+        }
+
+        bigram_chars = set()
+        for bigram in bigrams:
+            bigram_chars.update(bigram)
+
+        self.chars: List[str] = rank_chars(unigrams, bigram_chars)
+        self.char_ids: Dict[str, int] = {c: i for i, c in enumerate(self.chars)}
+        self.unknown_id = len(self.chars)
+
+        floor_log_prob = self.floor_log_prob
+        self.unigram_log_probs_by_id = array('d', (
+            math.log(unigrams[c]) if unigrams.get(c, 0) > 0 else floor_log_prob
+            for c in self.chars
+        ))
+        self.unigram_log_probs_by_id.append(floor_log_prob)  # unknown_id
+
+        self.transitions = TransitionStore.from_bigrams(
+            bigrams, self.char_ids, floor_log_prob, dense_chars=dense_chars, transform=math.log
+        )
+
+    def encode(self, chars: Sequence[str]) -> List[int]:
+        """ID of each character (unknown_id if not in the model)."""
+        get = self.char_ids.get
+        unknown = self.unknown_id
+        return [get(c, unknown) for c in chars]
+
+    def unigram_scores_ids(self, ids: Sequence[int]) -> array:
+        """log P(c) for each character ID."""
+        table = self.unigram_log_probs_by_id
+        return array('d', [table[i] for i in ids])
+
+    def transition_matrix_ids(self, prev_ids: Sequence[int], next_ids: Sequence[int]) -> array:
+        """Row-major (len(prev) × len(next)) matrix of log P(next | prev) over IDs."""
+        return self.transitions.matrix(prev_ids, next_ids)
+
+    def transition_score_ids(self, prev_id: int, next_id: int) -> float:
+        """log P(next | prev) for one ID pair."""
+        return self.transitions.get(prev_id, next_id)
+
+    def unigram_scores(self, chars: Sequence[str]) -> array:
+        """log P(c) for each character."""
+        return self.unigram_scores_ids(self.encode(chars))
+
+    def transition_matrix(self, prev_chars: Sequence[str], next_chars: Sequence[str]) -> array:
+        """Row-major (len(prev) × len(next)) matrix of log P(next | prev)."""
+        return self.transitions.matrix(self.encode(prev_chars), self.encode(next_chars))
+
+    def transition_score(self, prev_char: str, next_char: str) -> float:
+        """log P(next | prev) for one pair (same value as transition_matrix)."""
+        get = self.char_ids.get
+        unknown = self.unknown_id
+        return self.transitions.get(get(prev_char, unknown), get(next_char, unknown))
+
+
+class LaplaceTransitionScorer:
+    """viterbi_module.js scoring: Laplace-smoothed counts via LaplaceScorer."""
+
+    def __init__(self, ngram_db: Dict):
+        """
+        Args:
+            ngram_db: N-gram database with unigram_counts / bigram_counts
+        """
+        self.scorer = LaplaceScorer(ngram_db)
+
+    def encode(self, chars: Sequence[str]) -> List[int]:
+        """ID of each character (unknown_id if not in the model)."""
+        return self.scorer.encode(chars)
+
+    def unigram_scores_ids(self, ids: Sequence[int]) -> array:
+        """Smoothed log P(c) for each character ID."""
+        return self.scorer.unigram_log_probs(ids)
+
+    def transition_matrix_ids(self, prev_ids: Sequence[int], next_ids: Sequence[int]) -> array:
+        """Row-major (len(prev) × len(next)) matrix of smoothed log P(next | prev) over IDs."""
+        return self.scorer.log_prob_matrix(prev_ids, next_ids)
+
+    def transition_score_ids(self, prev_id: int, next_id: int) -> float:
+        """Smoothed log P(next | prev) for one ID pair."""
+        return self.scorer.log_prob_ids(prev_id, next_id)
+
+    def unigram_scores(self, chars: Sequence[str]) -> array:
+        """Smoothed log P(c) for each character."""
+        return self.unigram_scores_ids(self.encode(chars))
+
+    def transition_matrix(self, prev_chars: Sequence[str], next_chars: Sequence[str]) -> array:
+        """Row-major (len(prev) × len(next)) matrix of smoothed log P(next | prev)."""
+        return self.scorer.log_prob_matrix(self.encode(prev_chars), self.encode(next_chars))
+
+    def transition_score(self, prev_char: str, next_char: str) -> float:
+        """Smoothed log P(next | prev) for one pair (same value as transition_matrix)."""
+        return self.scorer.log_prob(prev_char, next_char)
+
+
+def make_transition_scorer(ngram_db: Dict, smoothing: Optional[str] = None):
+    """
+    Build the scorer for a model.
+
+    Args:
+        ngram_db: Loaded N-gram database
+        smoothing: 'probability', 'laplace', or None to pick 'probability'
+            when the model has a `bigrams` probability table and 'laplace'
+            otherwise. Both builders write `bigrams` next to the counts, so
+            only count files (process_raw_text.py output) default to
+            'laplace'; pass 'laplace' to smooth a built model's counts.
+
+    Raises:
+        ValueError: If the smoothing mode is unknown
+    """
+    if smoothing is None:
+        smoothing = 'probability' if 'bigrams' in ngram_db else 'laplace'
+
+    if smoothing == 'probability':
+        return ProbabilityScorer(ngram_db)
+    if smoothing == 'laplace':
+        return LaplaceTransitionScorer(ngram_db)
+
+    raise ValueError(f"Unknown smoothing '{smoothing}', expected one of {SMOOTHING_MODES}")
+
+
+# ============================================================================
+# Viterbi steps (viterbi.js port)
+# ============================================================================
+
+def build_lattice(codes: Sequence[str], dayi_db: Dict[str, List[Dict]]) -> List[List[str]]:
+    """
+    Build lattice of candidates from input codes.
+
+    Each position lists its distinct candidate characters in dictionary
+    order (viterbi.js keys its DP table by character, so duplicates collapse).
+
+    Args:
+        codes: Dayi codes
+        dayi_db: Code → [{'char', 'freq'}, ...] (dayi_db.json format)
+
+    Returns:
+        Lattice: one list of candidate characters per code
+
+    Raises:
+        ValueError: If any code has no candidates
+    """
+    lattice = []
+
+    for code in codes:
+        candidates = dayi_db.get(code)
+
+        if not candidates:
+            raise ValueError(f"No candidates found for code: {code}")
+
+        lattice.append(list(dict.fromkeys(c['char'] for c in candidates)))
+
+    return lattice
+
+
+def initialize_dp(
+    lattice: List[List[str]],
+    scorer,
+    lattice_ids: Optional[List[List[int]]] = None
+) -> List[Sequence[float]]:
+    """
+    Initialize DP table for the first position with unigram log-probabilities.
+
+    Args:
+        lattice: Candidate lattice
+        scorer: Transition scorer
+        lattice_ids: The lattice as scorer IDs (scorer.encode() per column),
+            if already known
+
+    Returns:
+        DP table: one score column per position (later columns empty)
+    """
+    if lattice_ids is not None:
+        dp = [scorer.unigram_scores_ids(lattice_ids[0])]
+    else:
+        dp = [scorer.unigram_scores(lattice[0])]
+    dp.extend([] for _ in range(1, len(lattice)))
+    return dp
+
+
+def forward_pass(
+    lattice: List[List[str]],
+    dp: List[Sequence[float]],
+    backpointers: List[List[int]],
+    scorer,
+    use_numpy: Optional[bool] = None,
+    lattice_ids: Optional[List[List[int]]] = None
+) -> None:
+    """
+    Fill DP columns 1..n-1 and their backpointers (modified in place).
+
+    backpointers[t][j] is the index in lattice[t-1] of the best predecessor
+    of lattice[t][j].
+
+    Args:
+        lattice: Candidate lattice
+        dp: DP table from initialize_dp()
+        backpointers: One list per position (position 0 stays empty)
+        scorer: Transition scorer
+        use_numpy: Force (True) or avoid (False) NumPy; default: use if installed
+        lattice_ids: The lattice as scorer IDs, if already known
+    """
+    step = _select_dp_step(use_numpy)
+    if lattice_ids is None:
+        lattice_ids = [scorer.encode(chars) for chars in lattice]
+    matrix_ids = scorer.transition_matrix_ids
+    for t in range(1, len(lattice)):
+        matrix = matrix_ids(lattice_ids[t - 1], lattice_ids[t])
+        dp[t], backpointers[t] = step(dp[t - 1], matrix, len(lattice[t]))
+
+
+def _select_dp_step(use_numpy: Optional[bool]):
+    """DP step implementation: NumPy when requested or (by default) installed."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError("use_numpy=True requires NumPy")
+    return _dp_step_numpy if use_numpy else _dp_step
+
+
+def _dp_step(prev_scores: Sequence[float], matrix: array, num_next: int):
+    """One DP column: pure-Python max/argmax over each column of the matrix."""
+    scores = []
+    pointers = []
+
+    for j in range(num_next):
+        column = [p + m for p, m in zip(prev_scores, matrix[j::num_next])]
+        best = max(column)
+        scores.append(best)
+        pointers.append(column.index(best))
+
+    return scores, pointers
+
+
+def _dp_step_numpy(prev_scores: Sequence[float], matrix: array, num_next: int):
+    """One DP column: vectorized max/argmax over (prev × next)."""
+    totals = np.asarray(prev_scores, dtype=np.float64)[:, None] + \
+        np.frombuffer(matrix, dtype=np.float64).reshape(-1, num_next)
+    pointers = totals.argmax(axis=0)
+    scores = totals[pointers, np.arange(num_next)]
+    return scores.tolist(), pointers.tolist()
+
+
+def backtrack(lattice: List[List[str]], dp: List[Sequence[float]], backpointers: List[List[int]]) -> Dict:
+    """
+    Reconstruct the best path.
+
+    Returns:
+        {'sentence': str, 'score': float (log probability), 'chars': List[str]}
+    """
+    last = dp[-1]
+    best = max(last)
+    index = list(last).index(best)
+
+    chars = []
+    for t in range(len(lattice) - 1, -1, -1):
+        chars.append(lattice[t][index])
+        if t > 0:
+            index = backpointers[t][index]
+    chars.reverse()
+
+    return {
+        'sentence': ''.join(chars),
+        'score': best,
+        'chars': chars
+    }
+
+
+def viterbi(
+    codes: Sequence[str],
+    dayi_db: Dict[str, List[Dict]],
+    ngram_db: Dict,
+    smoothing: Optional[str] = None
+) -> Dict:
+    """
+    Run Viterbi algorithm to find the most probable sentence.
+
+    Builds a scorer on every call; use ViterbiDecoder to decode many
+    sequences with one model.
+
+    Example:
+        >>> viterbi(['4jp', 'ad', 'v'], dayi_db, ngram_db)['sentence']
+        '易在大'
+    """
+    return ViterbiDecoder(dayi_db, ngram_db, smoothing=smoothing).decode(codes)
+
+
+# ============================================================================
+# Decoder (model loaded once)
+# ============================================================================
+
+class ViterbiDecoder:
+    """
+    Reusable decoder: the model's scores are prepared once, then any number
+    of code sequences are decoded.
+
+    Example:
+        >>> decoder = ViterbiDecoder(dayi_db, ngram_db)
+        >>> decoder.decode(['4jp', 'ad', 'v'])['sentence']
+        '易在大'
+        >>> [r['sentence'] for r in decoder.decode_many([['v'], ['4jp', 'ad']])]
+        ['大', '易在']
+    """
+
+    def __init__(
+        self,
+        dayi_db: Dict[str, List[Dict]],
+        ngram_db: Dict,
+        smoothing: Optional[str] = None,
+        use_numpy: Optional[bool] = None,
+        ambiguity_index: Optional[Dict] = None
+    ):
+        """
+        Args:
+            dayi_db: Code → candidates (dayi_db.json format)
+            ngram_db: Loaded N-gram database
+            smoothing: See make_transition_scorer()
+            use_numpy: Force (True) or avoid (False) NumPy; default: use if installed
+            ambiguity_index: Index built from this dayi_db at dictionary build
+                time (code_ambiguity.py); built here if not given. Codes whose
+                count disagrees with the dictionary are not trusted: a
+                sequence containing one is decoded without anchors.
+        """
+        self.dayi_db = dayi_db
+        self.scorer = make_transition_scorer(ngram_db, smoothing)
+        self.use_numpy = use_numpy
+        self._step = _select_dp_step(use_numpy)
+        # Code → (candidate chars, their scorer IDs, anchor flag); at most one
+        # entry per dictionary code. Cached columns are shared and must not
+        # be mutated.
+        self._columns: Dict[str, tuple] = {}
+
+        if ambiguity_index is None:
+            ambiguity_index = build_ambiguity_index(dayi_db)
+        self.candidate_counts: Dict[str, int] = ambiguity_index['candidate_counts']
+        self.stale_codes = set()
+
+    def decode(self, codes: Sequence[str], include_lattice: bool = False) -> Dict:
+        """
+        Most probable sentence for a code sequence.
+
+        Args:
+            codes: Dayi codes
+            include_lattice: Add the candidate lattice to the result
+
+        Returns:
+            {'sentence', 'score', 'chars'} (+ 'lattice')
+
+        Raises:
+            ValueError: If codes is empty or a code has no candidates
+        """
+        if not codes:
+            raise ValueError("Codes array cannot be empty")
+
+        columns = [self.column(code) for code in codes]
+        lattice = [column[0] for column in columns]
+        lattice_ids = [column[1] for column in columns]
+        anchored = [column[2] for column in columns]
+
+        if True in anchored and None not in anchored:
+            result = self._decode_anchored(lattice, lattice_ids, anchored)
+        else:
+            dp = initialize_dp(lattice, self.scorer, lattice_ids)
+            backpointers = [[] for _ in lattice]
+            forward_pass(lattice, dp, backpointers, self.scorer,
+                         use_numpy=self.use_numpy, lattice_ids=lattice_ids)
+            result = backtrack(lattice, dp, backpointers)
+
+        if include_lattice:
+            result['lattice'] = [list(chars) for chars in lattice]
+        return result
+
+    def column(self, code: str) -> tuple:
+        """
+        One lattice column, cached per code.
+
+        Returns:
+            (candidate chars, their scorer IDs, anchor) where anchor is True
+            for a single-candidate code, False for an ambiguous one and
+            None when the ambiguity index disagrees with the dictionary
+            (the code is also added to stale_codes)
+
+        Raises:
+            ValueError: If the code has no candidates
+        """
+        column = self._columns.get(code)
+        if column is None:
+            chars = build_lattice([code], self.dayi_db)[0]
+            if self.candidate_counts.get(code) == len(chars):
+                anchor = len(chars) == 1
+            else:
+                anchor = None
+                self.stale_codes.add(code)
+            column = self._columns[code] = (chars, self.scorer.encode(chars), anchor)
+        return column
+
+    def lattice(self, codes: Sequence[str]) -> tuple:
+        """
+        Lattice of a code sequence and the same lattice as scorer IDs.
+
+        Raises:
+            ValueError: If any code has no candidates
+        """
+        columns = [self.column(code) for code in codes]
+        return [column[0] for column in columns], [column[1] for column in columns]
+
+    def _decode_anchored(
+        self,
+        lattice: List[List[str]],
+        lattice_ids: List[List[int]],
+        anchored: List[bool]
+    ) -> Dict:
+        """
+        Viterbi over a lattice whose anchored positions have one candidate.
+
+        A run of anchors adds one transition score per step. An ambiguous
+        stretch starts from the preceding anchor's single state (so its
+        first column is that score plus one matrix row), and the next
+        anchor's single state closes it: the stretch is backtracked from
+        there, without a DP table or backtrack over the whole lattice.
+        Every score is computed with the same additions, in the same order,
+        as the full-lattice DP, so results are identical.
+        """
+        scorer = self.scorer
+        matrix_ids = scorer.transition_matrix_ids
+        step = self._step
+        n = len(lattice)
+        chars = []
+        score = 0.0
+        last_id = None
+        t = 0
+
+        while t < n:
+            if anchored[t]:
+                char_id = lattice_ids[t][0]
+                if chars:
+                    score += scorer.transition_score_ids(last_id, char_id)
+                else:
+                    score = scorer.unigram_scores_ids([char_id])[0]
+                chars.append(lattice[t][0])
+                last_id = char_id
+                t += 1
+                continue
+
+            # Ambiguous stretch t..end-1
+            end = t + 1
+            while end < n and not anchored[end]:
+                end += 1
+
+            if chars:
+                scores = [score + m for m in matrix_ids([last_id], lattice_ids[t])]
+            else:
+                scores = scorer.unigram_scores_ids(lattice_ids[t])
+            pointers = []
+            for u in range(t + 1, end):
+                scores, back = step(scores, matrix_ids(lattice_ids[u - 1], lattice_ids[u]),
+                                    len(lattice_ids[u]))
+                pointers.append(back)
+
+            if end < n:  # closing anchor
+                scores = [p + m for p, m in zip(scores, matrix_ids(lattice_ids[end - 1], lattice_ids[end]))]
+            score = max(scores)
+            index = scores.index(score)
+
+            path = [index]
+            for back in reversed(pointers):
+                index = back[index]
+                path.append(index)
+            path.reverse()
+            chars.extend(lattice[u][i] for u, i in zip(range(t, end), path))
+
+            if end < n:
+                chars.append(lattice[end][0])
+                last_id = lattice_ids[end][0]
+                end += 1
+            t = end
+
+        return {
+            'sentence': ''.join(chars),
+            'score': score,
+            'chars': chars
+        }
+
+    def decode_beam(
+        self,
+        codes: Sequence[str],
+        beam_width: Optional[int] = DEFAULT_BEAM_WIDTH,
+        score_margin: Optional[float] = None,
+        k: int = 1
+    ) -> List[Dict]:
+        """
+        k best sentences with beam pruning.
+
+        After each step, hypotheses ending in the same character keep only
+        their k best (no other path through that character can reach the
+        final top k), then the beam keeps the beam_width best hypotheses
+        and drops any scoring more than score_margin below the best.
+        With beam_width=None and score_margin=None this is exact k-best
+        Viterbi.
+
+        Args:
+            codes: Dayi codes
+            beam_width: Hypotheses kept per step (None = unlimited)
+            score_margin: Drop hypotheses scoring more than this many nats
+                below the step's best (None = no margin pruning)
+            k: Number of sentences to return
+
+        Returns:
+            Up to k results {'sentence', 'score', 'chars'}, best first
+
+        Raises:
+            ValueError: If codes is empty, a code has no candidates, or
+                k / beam_width is below 1
+        """
+        if not codes:
+            raise ValueError("Codes array cannot be empty")
+        if k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        if beam_width is not None and beam_width < 1:
+            raise ValueError(f"beam_width must be >= 1, got {beam_width}")
+
+        lattice, lattice_ids = self.lattice(codes)
+
+        # Hypothesis: (score, last char, back-link) with back-link = previous
+        # hypothesis or None; the sentence is rebuilt only for the final k
+        unigram_scores = self.scorer.unigram_scores_ids(lattice_ids[0])
+        beam = _prune_beam(
+            [(score, char, None) for score, char in zip(unigram_scores, lattice[0])],
+            beam_width, score_margin
+        )
+
+        for t in range(1, len(lattice)):
+            next_chars = lattice[t]
+            prev_chars = list(dict.fromkeys(hyp[1] for hyp in beam))
+            row_of = {c: i for i, c in enumerate(prev_chars)}
+            matrix = self.scorer.transition_matrix_ids(self.scorer.encode(prev_chars), lattice_ids[t])
+            n = len(next_chars)
+
+            by_char = {}
+            for hyp in beam:
+                row = row_of[hyp[1]] * n
+                for j, char in enumerate(next_chars):
+                    by_char.setdefault(char, []).append((hyp[0] + matrix[row + j], char, hyp))
+
+            expanded = []
+            for hyps in by_char.values():
+                hyps.sort(key=_hypothesis_score, reverse=True)
+                expanded.extend(hyps[:k])
+
+            beam = _prune_beam(expanded, beam_width, score_margin)
+
+        beam.sort(key=_hypothesis_score, reverse=True)
+        return [_hypothesis_result(hyp) for hyp in beam[:k]]
+
+    def incremental(self) -> 'IncrementalViterbi':
+        """New keystroke-by-keystroke decoding session on this decoder's model."""
+        return IncrementalViterbi(self)
+
+    def prefix_cache(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> 'PrefixDecodeCache':
+        """New prefix-resuming decode cache on this decoder's model."""
+        return PrefixDecodeCache(self, max_bytes)
+
+    def decode_many(self, code_sequences: Iterable[Sequence[str]]) -> Iterator[Dict]:
+        """Decode each code sequence in turn."""
+        for codes in code_sequences:
+            yield self.decode(codes)
+
+    def score_sentence(self, sentence: str) -> float:
+        """
+        Path score (log probability) of a given sentence under the model,
+        as the decoder would score that path.
+        """
+        if not sentence:
+            raise ValueError("Sentence cannot be empty")
+
+        ids = self.scorer.encode(sentence)
+        score = self.scorer.unigram_scores_ids(ids[:1])[0]
+        for prev_id, next_id in zip(ids, ids[1:]):
+            score += self.scorer.transition_score_ids(prev_id, next_id)
+        return score
+
+
+class IncrementalViterbi:
+    """
+    Online Viterbi for sentence mode: one DP column per typed code.
+
+    Holds the lattice, DP columns and backpointers of the codes typed so
+    far. extend() scores only the new position against the previous
+    column; pop() drops the last position (backspace). best() backtracks
+    the current best sentence, exactly as ViterbiDecoder.decode() would
+    for the same codes.
+
+    Example:
+        >>> session = ViterbiDecoder(dayi_db, ngram_db).incremental()
+        >>> session.extend('4jp')['sentence']
+        '易'
+        >>> session.extend('ad')['sentence']
+        '易在'
+        >>> session.pop()['sentence']
+        '易'
+    """
+
+    def __init__(self, decoder: ViterbiDecoder):
+        """
+        Args:
+            decoder: Decoder supplying the dictionary and model scores
+        """
+        self.decoder = decoder
+        self._step = _select_dp_step(decoder.use_numpy)
+        self.codes: List[str] = []
+        self.lattice: List[List[str]] = []
+        self.lattice_ids: List[List[int]] = []
+        self.dp: List[Sequence[float]] = []
+        self.backpointers: List[List[int]] = []
+
+    def extend(self, code: str) -> Dict:
+        """
+        Append one code and return the new best sentence.
+
+        Raises:
+            ValueError: If the code has no candidates (state is unchanged)
+        """
+        chars, ids, _ = self.decoder.column(code)
+        scorer = self.decoder.scorer
+
+        if not self.lattice:
+            scores, pointers = scorer.unigram_scores_ids(ids), []
+        else:
+            matrix = scorer.transition_matrix_ids(self.lattice_ids[-1], ids)
+            scores, pointers = self._step(self.dp[-1], matrix, len(chars))
+
+        self.codes.append(code)
+        self.lattice.append(chars)
+        self.lattice_ids.append(ids)
+        self.dp.append(scores)
+        self.backpointers.append(pointers)
+        return self.best()
+
+    def pop(self) -> Optional[Dict]:
+        """
+        Remove the last code (backspace).
+
+        Returns:
+            Best sentence for the remaining codes, or None if now empty
+
+        Raises:
+            IndexError: If there is nothing to remove
+        """
+        if not self.codes:
+            raise IndexError("pop from empty decoding session")
+
+        self.codes.pop()
+        self.lattice.pop()
+        self.lattice_ids.pop()
+        self.dp.pop()
+        self.backpointers.pop()
+        return self.best() if self.codes else None
+
+    def best(self) -> Dict:
+        """
+        Current best sentence.
+
+        Raises:
+            ValueError: If no codes have been typed
+        """
+        if not self.codes:
+            raise ValueError("Codes array cannot be empty")
+        return backtrack(self.lattice, self.dp, self.backpointers)
+
+    def reset(self) -> None:
+        """Start a new sentence."""
+        self.codes.clear()
+        self.lattice.clear()
+        self.lattice_ids.clear()
+        self.dp.clear()
+        self.backpointers.clear()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class _PrefixNode:
+    """One cached DP column; parent is the node for the prefix one code shorter."""
+
+    __slots__ = ('parent', 'chars', 'ids', 'scores', 'pointers', 'nbytes')
+
+    def __init__(self, parent, chars, ids, scores, pointers, key):
+        self.parent = parent
+        self.chars = chars
+        self.ids = ids
+        self.scores = scores
+        self.pointers = pointers
+        self.nbytes = (sys.getsizeof(chars) + sys.getsizeof(scores) + sys.getsizeof(pointers)
+                       + sys.getsizeof(key) + 128)
+
+
+class PrefixDecodeCache:
+    """
+    Viterbi decoding that reuses DP columns of previously decoded prefixes.
+
+    Each cached code-sequence prefix maps to its last DP column (candidate
+    chars, scores, backpointers) and links to the entry one code shorter,
+    so a prefix costs one column of memory and shares everything before
+    it. decode() looks up the longest cached prefix of the codes, computes
+    only the remaining columns, and caches those too.
+
+    Entries are evicted least-recently-used once the estimated size
+    exceeds max_bytes. Every decode touches its whole prefix chain, longest
+    first, so an entry's shorter prefixes are always more recent than it
+    and eviction removes the longest prefixes first: a cached entry's
+    chain is always fully cached.
+
+    Results are identical to ViterbiDecoder.decode().
+
+    Example:
+        >>> cache = ViterbiDecoder(dayi_db, ngram_db).prefix_cache()
+        >>> cache.decode(['4jp', 'ad'])['sentence']
+        '易在'
+        >>> cache.decode(['4jp', 'ad', 'v'])['sentence']   # resumes after 'ad'
+        '易在大'
+        >>> cache.stats()['hits'], cache.stats()['misses']
+        (1, 1)
+    """
+
+    def __init__(self, decoder: ViterbiDecoder, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            decoder: Decoder supplying the dictionary and model scores
+            max_bytes: Approximate memory bound for cached columns
+        """
+        self.decoder = decoder
+        self.max_bytes = max_bytes
+        self._step = _select_dp_step(decoder.use_numpy)
+        self._entries = OrderedDict()  # tuple(code prefix) → _PrefixNode
+
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reused_positions = 0
+        self.computed_positions = 0
+
+    def decode(self, codes: Sequence[str]) -> Dict:
+        """
+        Decode codes, resuming from the longest cached prefix.
+
+        Returns:
+            {'sentence', 'score', 'chars'} as ViterbiDecoder.decode()
+
+        Raises:
+            ValueError: If codes is empty or a code has no candidates
+        """
+        if not codes:
+            raise ValueError("Codes array cannot be empty")
+
+        codes = tuple(codes)
+        entries = self._entries
+
+        start, node = 0, None
+        for end in range(len(codes), 0, -1):
+            node = entries.get(codes[:end])
+            if node is not None:
+                start = end
+                break
+
+        # Validates every new code before anything is cached
+        new_columns = [self.decoder.column(code) for code in codes[start:]]
+
+        if start:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.reused_positions += start
+        self.computed_positions += len(new_columns)
+
+        scorer = self.decoder.scorer
+        for offset, (chars, ids, _) in enumerate(new_columns, start + 1):
+            if node is None:
+                scores, pointers = scorer.unigram_scores_ids(ids), []
+            else:
+                matrix = scorer.transition_matrix_ids(node.ids, ids)
+                scores, pointers = self._step(node.scores, matrix, len(chars))
+            key = codes[:offset]
+            node = _PrefixNode(node, chars, ids, scores, pointers, key)
+            entries[key] = node
+            self.bytes += node.nbytes
+
+        for end in range(len(codes), 0, -1):
+            entries.move_to_end(codes[:end])
+        self._evict()
+
+        return self._backtrack(node)
+
+    def stats(self) -> Dict:
+        """Hit / miss counters and memory use."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'reused_positions': self.reused_positions,
+            'computed_positions': self.computed_positions
+        }
+
+    def clear(self) -> None:
+        """Drop every cached prefix (counters are kept)."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while self.bytes > self.max_bytes and entries:
+            _, node = entries.popitem(last=False)
+            self.bytes -= node.nbytes
+
+    @staticmethod
+    def _backtrack(node: _PrefixNode) -> Dict:
+        lattice, dp, backpointers = [], [], []
+        while node is not None:
+            lattice.append(node.chars)
+            dp.append(node.scores)
+            backpointers.append(node.pointers)
+            node = node.parent
+        lattice.reverse()
+        dp.reverse()
+        backpointers.reverse()
+        return backtrack(lattice, dp, backpointers)
+
+
+def _hypothesis_score(hyp) -> float:
+    return hyp[0]
+
+
+def _prune_beam(hyps: List, beam_width: Optional[int], score_margin: Optional[float]) -> List:
+    """Keep the beam_width best hypotheses within score_margin of the best."""
+    hyps.sort(key=_hypothesis_score, reverse=True)
+    if beam_width is not None:
+        hyps = hyps[:beam_width]
+    if score_margin is not None and hyps:
+        floor = hyps[0][0] - score_margin
+        hyps = [hyp for hyp in hyps if hyp[0] >= floor]
+    return hyps
+
+
+def _hypothesis_result(hyp) -> Dict:
+    """Follow a hypothesis' back-links into a result dict."""
+    score = hyp[0]
+    chars = []
+    while hyp is not None:
+        chars.append(hyp[1])
+        hyp = hyp[2]
+    chars.reverse()
+    return {'sentence': ''.join(chars), 'score': score, 'chars': chars}
+
+
+def load_dayi_db(file_path: str) -> Dict[str, List[Dict]]:
+    """Load dayi_db.json (code → [{'char', 'freq'}, ...])."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
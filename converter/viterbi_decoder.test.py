@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Viterbi Sentence Decoder - Test Suite
+
+Ports the viterbi.js test data and checks the column-wise DP against an
+exhaustive search.
+
+Categories:
+  1. Lattice Construction
+  2. DP Steps
+  3. Decoding
+  4. Beam Search
+  5. Incremental Decoding
+  6. Prefix Cache
+
+Design Document: docs/design/DESIGN-viterbi.md
+"""
+
+import unittest
+import itertools
+import math
+import random
+import viterbi_decoder
+from viterbi_decoder import (
+    ViterbiDecoder,
+    ProbabilityScorer,
+    build_lattice,
+    initialize_dp,
+    forward_pass,
+    backtrack,
+    viterbi
+)
+
+
+# Same test data as mvp3-smart-engine/viterbi.test.js
+TEST_DAYI_DB = {
+    '4jp': [{'char': '易', 'freq': 80}, {'char': '義', 'freq': 70}],
+    'ad': [{'char': '在', 'freq': 90}, {'char': '灰', 'freq': 45}],
+    'v': [{'char': '大', 'freq': 100}, {'char': '夫', 'freq': 60}],
+    'a': [{'char': '大', 'freq': 100}, {'char': '人', 'freq': 80}],
+}
+
+TEST_NGRAM_DB = {
+    'unigrams': {
+        '易': 0.01, '義': 0.008, '在': 0.015, '灰': 0.002,
+        '大': 0.02, '夫': 0.005, '人': 0.012
+    },
+    'bigrams': {
+        '易在': 0.5, '易灰': 0.1, '義在': 0.4, '義灰': 0.05,
+        '在大': 0.6, '在夫': 0.2, '灰大': 0.3, '灰夫': 0.1, '大人': 0.7
+    }
+}
+
+
+def exhaustive_paths(codes, dayi_db, ngram_db):
+    """Score every path, best first (reference implementation)."""
+    scorer = ProbabilityScorer(ngram_db)
+    lattice = build_lattice(codes, dayi_db)
+    paths = []
+    for path in itertools.product(*lattice):
+        score = scorer.unigram_scores(path[0])[0]
+        for a, b in zip(path, path[1:]):
+            score += scorer.transition_matrix(a, b)[0]
+        paths.append((''.join(path), score))
+    paths.sort(key=lambda p: p[1], reverse=True)
+    return paths
+
+
+def exhaustive_best(codes, dayi_db, ngram_db):
+    return exhaustive_paths(codes, dayi_db, ngram_db)[0]
+
+
+def random_model(seed):
+    """Random dictionary and probability model over 30 characters."""
+    rng = random.Random(seed)
+    chars = [chr(0x4e00 + i) for i in range(30)]
+    dayi_db = {f'c{i}': [{'char': c} for c in rng.sample(chars, rng.randint(1, 6))]
+               for i in range(10)}
+    ngram_db = {
+        'unigrams': {c: rng.random() for c in chars},
+        'bigrams': {a + b: rng.random() for a in chars for b in chars if rng.random() < 0.3}
+    }
+    return rng, dayi_db, ngram_db
+
+
+# ============================================================================
+# Category 1: Lattice Construction
+# ============================================================================
+
+class TestLatticeConstruction(unittest.TestCase):
+    """Test building the candidate lattice."""
+
+    def test_valid_codes(self):
+        """Test lattice lists candidates per code in dictionary order."""
+        lattice = build_lattice(['4jp', 'ad'], TEST_DAYI_DB)
+        self.assertEqual(lattice, [['易', '義'], ['在', '灰']])
+
+    def test_unknown_code(self):
+        """Test a code without candidates raises ValueError."""
+        with self.assertRaisesRegex(ValueError, 'No candidates found for code: zzz'):
+            build_lattice(['4jp', 'zzz'], TEST_DAYI_DB)
+
+    def test_duplicate_candidates_collapse(self):
+        """Test repeated characters for one code appear once."""
+        dayi_db = {'x': [{'char': '大', 'freq': 9}, {'char': '大', 'freq': 1}]}
+        self.assertEqual(build_lattice(['x'], dayi_db), [['大']])
+
+
+# ============================================================================
+# Category 2: DP Steps
+# ============================================================================
+
+class TestDPSteps(unittest.TestCase):
+    """Test DP initialization, forward pass and backtracking."""
+
+    def setUp(self):
+        self.scorer = ProbabilityScorer(TEST_NGRAM_DB)
+
+    def test_initialize_with_unigrams(self):
+        """Test first column uses unigram log-probabilities (1e-10 floor)."""
+        dp = initialize_dp([['易', '未']], self.scorer)
+        self.assertAlmostEqual(dp[0][0], math.log(0.01))
+        self.assertAlmostEqual(dp[0][1], math.log(1e-10))
+
+    def test_forward_pass_and_backtrack(self):
+        """Test one transition picks the best predecessor."""
+        lattice = build_lattice(['4jp', 'ad'], TEST_DAYI_DB)
+        dp = initialize_dp(lattice, self.scorer)
+        backpointers = [[] for _ in lattice]
+        forward_pass(lattice, dp, backpointers, self.scorer, use_numpy=False)
+
+        # 在: 易 (log .01 + log .5) beats 義 (log .008 + log .4)
+        self.assertEqual(backpointers[1][0], 0)
+        self.assertAlmostEqual(dp[1][0], math.log(0.01) + math.log(0.5))
+
+        result = backtrack(lattice, dp, backpointers)
+        self.assertEqual(result['sentence'], '易在')
+        self.assertEqual(result['chars'], ['易', '在'])
+
+    def test_scorer_ids_match_bigram_table(self):
+        """Test ID lookups equal the string-keyed log-probabilities, dense or sparse."""
+        chars = list(TEST_NGRAM_DB['unigrams']) + ['未']
+        for dense_chars in (0, 3, 8):
+            scorer = ProbabilityScorer(TEST_NGRAM_DB, dense_chars=dense_chars)
+            ids = scorer.encode(chars)
+            matrix = scorer.transition_matrix_ids(ids, ids)
+            for i, a in enumerate(chars):
+                for j, b in enumerate(chars):
+                    expected = math.log(TEST_NGRAM_DB['bigrams'].get(a + b, 1e-10))
+                    self.assertEqual(matrix[i * len(chars) + j], expected)
+                    self.assertEqual(scorer.transition_score(a, b), expected)
+
+    @unittest.skipIf(viterbi_decoder.np is None, "NumPy not installed")
+    def test_numpy_matches_pure_python(self):
+        """Test the vectorized step gives identical results."""
+        codes = ['4jp', 'ad', 'v']
+        pure = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB, use_numpy=False).decode(codes)
+        vectorized = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB, use_numpy=True).decode(codes)
+        self.assertEqual(pure['sentence'], vectorized['sentence'])
+        self.assertAlmostEqual(pure['score'], vectorized['score'])
+
+
+# ============================================================================
+# Category 3: Decoding
+# ============================================================================
+
+class TestDecoding(unittest.TestCase):
+    """Test end-to-end decoding."""
+
+    def test_single_code(self):
+        """Test a single code returns its best unigram."""
+        result = viterbi(['4jp'], TEST_DAYI_DB, TEST_NGRAM_DB)
+        self.assertEqual(result['sentence'], '易')
+        self.assertAlmostEqual(result['score'], math.log(0.01))
+
+    def test_three_codes(self):
+        """Test the viterbi.js example sentence."""
+        result = viterbi(['4jp', 'ad', 'v'], TEST_DAYI_DB, TEST_NGRAM_DB)
+        self.assertEqual(result['sentence'], '易在大')
+
+    def test_empty_codes(self):
+        """Test empty input raises ValueError."""
+        with self.assertRaises(ValueError):
+            viterbi([], TEST_DAYI_DB, TEST_NGRAM_DB)
+
+    def test_matches_exhaustive_search(self):
+        """Test random lattices decode to the exhaustive-search optimum."""
+        rng, dayi_db, ngram_db = random_model(7)
+        decoder = ViterbiDecoder(dayi_db, ngram_db)
+
+        for _ in range(50):
+            codes = [rng.choice(list(dayi_db)) for _ in range(rng.randint(1, 5))]
+            result = decoder.decode(codes)
+            sentence, score = exhaustive_best(codes, dayi_db, ngram_db)
+            self.assertAlmostEqual(result['score'], score)
+            self.assertAlmostEqual(decoder.score_sentence(result['sentence']), score)
+
+    def test_anchored_matches_full_lattice(self):
+        """Test anchor segmentation gives exactly the single-DP result."""
+        rng, dayi_db, ngram_db = random_model(8)
+        decoder = ViterbiDecoder(dayi_db, ngram_db)
+        self.assertIn(1, decoder.candidate_counts.values())
+
+        for _ in range(100):
+            codes = [rng.choice(list(dayi_db)) for _ in range(rng.randint(1, 10))]
+            lattice = build_lattice(codes, dayi_db)
+            dp = initialize_dp(lattice, decoder.scorer)
+            backpointers = [[] for _ in lattice]
+            forward_pass(lattice, dp, backpointers, decoder.scorer)
+            expected = backtrack(lattice, dp, backpointers)
+
+            result = decoder.decode(codes)
+            self.assertEqual(result['sentence'], expected['sentence'])
+            self.assertEqual(result['score'], expected['score'])
+
+    def test_stale_ambiguity_index(self):
+        """Test codes the index gets wrong are not pinned as anchors."""
+        # 'y' gained a second candidate after the index was built; pinning
+        # its first candidate (灰) would be wrong
+        dayi_db = dict(TEST_DAYI_DB, y=[{'char': '灰', 'freq': 1}, {'char': '在', 'freq': 1}],
+                       x=[{'char': '在', 'freq': 1}])
+        stale_index = {'candidate_counts': {'4jp': 2, 'ad': 2, 'v': 2, 'a': 2, 'x': 1, 'y': 1}}
+        decoder = ViterbiDecoder(dayi_db, TEST_NGRAM_DB, ambiguity_index=stale_index)
+
+        self.assertEqual(decoder.decode(['y'])['sentence'], '在')
+        for codes in (['4jp', 'y', 'v'], ['x', 'y'], ['x', 'ad', 'x']):
+            expected = ViterbiDecoder(dayi_db, TEST_NGRAM_DB).decode(codes)
+            self.assertEqual(decoder.decode(codes), expected)
+        self.assertEqual(decoder.stale_codes, {'y'})
+        self.assertIs(decoder.column('x')[2], True)
+
+    def test_laplace_smoothing(self):
+        """Test count-only models (no bigrams table) decode with Laplace smoothing."""
+        ngram_db = {
+            'unigram_counts': {'易': 10, '義': 8, '在': 15, '灰': 2},
+            'bigram_counts': {'義在': 50},
+            'smoothing_alpha': 0.1,
+            'vocab_size': 4
+        }
+        result = ViterbiDecoder(TEST_DAYI_DB, ngram_db).decode(['4jp', 'ad'])
+        self.assertEqual(result['sentence'], '義在')
+
+
+# ============================================================================
+# Category 4: Beam Search
+# ============================================================================
+
+class TestBeamSearch(unittest.TestCase):
+    """Test beam-pruned k-best decoding."""
+
+    def test_unpruned_beam_is_exact_kbest(self):
+        """Test an unlimited beam returns the exhaustive k best paths."""
+        rng, dayi_db, ngram_db = random_model(11)
+        decoder = ViterbiDecoder(dayi_db, ngram_db)
+
+        for _ in range(30):
+            codes = [rng.choice(list(dayi_db)) for _ in range(rng.randint(1, 5))]
+            results = decoder.decode_beam(codes, beam_width=None, k=4)
+            expected = exhaustive_paths(codes, dayi_db, ngram_db)[:4]
+
+            self.assertEqual(len(results), len(expected))
+            for result, (_, score) in zip(results, expected):
+                self.assertAlmostEqual(result['score'], score)
+            self.assertEqual(results[0]['sentence'], decoder.decode(codes)['sentence'])
+
+    def test_results_sorted_and_scored(self):
+        """Test k results come back best first with their path scores."""
+        decoder = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB)
+        results = decoder.decode_beam(['4jp', 'ad', 'v'], k=3)
+
+        self.assertEqual(results[0]['sentence'], '易在大')
+        scores = [r['score'] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for result in results:
+            self.assertAlmostEqual(decoder.score_sentence(result['sentence']), result['score'])
+
+    def test_pruning_limits(self):
+        """Test beam width and score margin bound the results."""
+        decoder = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB)
+        self.assertEqual(len(decoder.decode_beam(['4jp', 'ad', 'v'], beam_width=1, k=5)), 1)
+
+        results = decoder.decode_beam(['4jp', 'ad', 'v'], beam_width=None, score_margin=0.0, k=5)
+        self.assertEqual([r['sentence'] for r in results], ['易在大'])
+
+    def test_invalid_arguments(self):
+        """Test k and beam width must be positive."""
+        decoder = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB)
+        with self.assertRaises(ValueError):
+            decoder.decode_beam(['4jp'], k=0)
+        with self.assertRaises(ValueError):
+            decoder.decode_beam(['4jp'], beam_width=0)
+
+
+# ============================================================================
+# Category 5: Incremental Decoding
+# ============================================================================
+
+class TestIncrementalDecoding(unittest.TestCase):
+    """Test keystroke-by-keystroke decoding with extend/pop."""
+
+    def test_extend_matches_full_decode(self):
+        """Test every prefix decodes exactly like a full decode."""
+        rng, dayi_db, ngram_db = random_model(3)
+        decoder = ViterbiDecoder(dayi_db, ngram_db)
+        session = decoder.incremental()
+
+        codes = [rng.choice(list(dayi_db)) for _ in range(12)]
+        for i, code in enumerate(codes, 1):
+            result = session.extend(code)
+            expected = decoder.decode(codes[:i])
+            self.assertEqual(result['sentence'], expected['sentence'])
+            self.assertAlmostEqual(result['score'], expected['score'])
+
+    def test_pop_restores_previous_result(self):
+        """Test backspace returns to the previous prefix's result."""
+        session = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).incremental()
+        first = session.extend('4jp')
+        session.extend('ad')
+        session.extend('v')
+
+        session.pop()
+        self.assertEqual(session.pop(), first)
+        self.assertIsNone(session.pop())
+        self.assertEqual(len(session), 0)
+
+        with self.assertRaises(IndexError):
+            session.pop()
+
+    def test_unknown_code_leaves_state(self):
+        """Test a failed extend does not change the session."""
+        session = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).incremental()
+        session.extend('4jp')
+        with self.assertRaises(ValueError):
+            session.extend('zzz')
+        self.assertEqual(session.codes, ['4jp'])
+        self.assertEqual(session.extend('ad')['sentence'], '易在')
+
+
+# ============================================================================
+# Category 6: Prefix Cache
+# ============================================================================
+
+class TestPrefixCache(unittest.TestCase):
+    """Test decoding that resumes from cached prefixes."""
+
+    def test_matches_decode(self):
+        """Test cached decodes equal fresh decodes on overlapping sequences."""
+        rng, dayi_db, ngram_db = random_model(4)
+        decoder = ViterbiDecoder(dayi_db, ngram_db)
+        cache = decoder.prefix_cache()
+
+        stems = [[rng.choice(list(dayi_db)) for _ in range(5)] for _ in range(4)]
+        for _ in range(60):
+            codes = rng.choice(stems)[:rng.randint(1, 5)]
+            codes = codes + [rng.choice(list(dayi_db)) for _ in range(rng.randint(0, 3))]
+            result = cache.decode(codes)
+            expected = decoder.decode(codes)
+            self.assertEqual(result['sentence'], expected['sentence'])
+            self.assertAlmostEqual(result['score'], expected['score'])
+
+        stats = cache.stats()
+        self.assertGreater(stats['hits'], 0)
+        self.assertEqual(stats['hits'] + stats['misses'], 60)
+
+    def test_resumes_from_longest_prefix(self):
+        """Test only the positions after the cached prefix are computed."""
+        cache = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).prefix_cache()
+        cache.decode(['4jp', 'ad'])
+        self.assertEqual(cache.decode(['4jp', 'ad', 'v'])['sentence'], '易在大')
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['reused_positions'], 2)
+        self.assertEqual(stats['computed_positions'], 3)
+
+    def test_memory_bound_evicts_longest_first(self):
+        """Test eviction keeps the cache under max_bytes, shortest prefixes last."""
+        cache = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).prefix_cache(max_bytes=1)
+        cache.decode(['4jp', 'ad', 'v'])
+        self.assertEqual(len(cache), 0)
+
+        cache.max_bytes = 10 ** 9
+        cache.decode(['4jp', 'ad', 'v'])
+        per_entry = cache.stats()['bytes'] // len(cache)
+        cache.max_bytes = per_entry * 2
+        cache._evict()
+        self.assertIn(('4jp',), cache._entries)
+        self.assertNotIn(('4jp', 'ad', 'v'), cache._entries)
+        self.assertLessEqual(cache.stats()['bytes'], cache.max_bytes)
+
+    def test_unknown_code_caches_nothing(self):
+        """Test a failed decode leaves the cache unchanged."""
+        cache = ViterbiDecoder(TEST_DAYI_DB, TEST_NGRAM_DB).prefix_cache()
+        with self.assertRaises(ValueError):
+            cache.decode(['4jp', 'zzz'])
+        self.assertEqual(len(cache), 0)
+
+
+# ============================================================================
+# Test Runner
+# ============================================================================
+
+def run_tests():
+    """Run all tests and display results."""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestLatticeConstruction))
+    suite.addTests(loader.loadTestsFromTestCase(TestDPSteps))
+    suite.addTests(loader.loadTestsFromTestCase(TestDecoding))
+    suite.addTests(loader.loadTestsFromTestCase(TestBeamSearch))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalDecoding))
+    suite.addTests(loader.loadTestsFromTestCase(TestPrefixCache))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    print("\n" + "=" * 70)
+    print(f"Total Tests: {result.testsRun}")
+    print(f"Passed: {result.testsRun - len(result.failures) - len(result.errors)}")
+    print(f"Failed: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print("=" * 70)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    import sys
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -373,6 +373,26 @@ async function loadDatabase() {
         });
         state.predictionEngine.setDayiMap(state.dbs.dayi);
 
+        // Optional: precomputed completion index (falls back to scanning dayiMap)
+        try {
+            const completionResp = await fetch(`data/completion_index.json?v=${ts}`);
+            if (completionResp.ok) {
+                state.predictionEngine.setCompletionIndex(await completionResp.json());
+            }
+        } catch (e) {
+            console.warn('[WebDayi] Completion index not loaded:', e);
+        }
+
+        // Optional: bigram-conditioned candidate order (falls back to static order)
+        try {
+            const contextResp = await fetch(`data/context_candidates.json?v=${ts}`);
+            if (contextResp.ok) {
+                state.predictionEngine.setContextTable(await contextResp.json());
+            }
+        } catch (e) {
+            console.warn('[WebDayi] Context table not loaded:', e);
+        }
+
         // Init Ghost Timer
         state.ghostTimer = new GhostTimer(() => {
             // Timeout Callback: Fade out then Clear
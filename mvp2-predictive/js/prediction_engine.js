@@ -21,6 +21,8 @@ class PredictionEngine {
         this.freqMap = config.freqMap || {};
         this.userHistory = config.userHistory || { getScore: () => 0 };
         this.dayiMap = {}; // Map<code, candidates[]>
+        this.completionIndex = null; // Map<prefix, [char, code][]> (completion_index.json)
+        this.contextTable = null; // Map<lastChar, Map<code, char[]>> (context_candidates.json)
 
         // 權重設定
         this.weights = {
@@ -40,6 +42,31 @@ class PredictionEngine {
         this.dayiMap = map;
     }
 
+    /**
+     * 載入預先建好的補全索引 (scripts/build_db.py 產生的 completion_index.json)
+     * 有索引時 getExtendedCandidates 直接查表，不再掃描整個 dayiMap
+     */
+    setCompletionIndex(index) {
+        this.completionIndex = index ? index.prefixes : null;
+    }
+
+    /**
+     * 載入離線建好的上下文候選順序 (converter/context_candidates.py 產生的 context_candidates.json)
+     * 只收錄 Bigram 會改變靜態頻率順序的 (前字, 編碼) 組合
+     */
+    setContextTable(table) {
+        this.contextTable = table ? table.table : null;
+    }
+
+    /**
+     * 查詢 (前字, 編碼) 的上下文排序：回傳依 Bigram 排序的候選字 (前段)，沒有則回傳 null (沿用靜態順序)
+     */
+    getContextOrder(lastChar, buffer) {
+        if (!this.contextTable || !lastChar) return null;
+        const byCode = this.contextTable[lastChar];
+        return (byCode && byCode[buffer]) || null;
+    }
+
     /**
      * 計算分數
      */
@@ -97,9 +124,24 @@ class PredictionEngine {
         }));
 
         // 4. 排序：本字 > 分數
+        // [Update] 有上下文排序時，本字之間以 VIP > 用戶習慣 > 上下文順序 取代靜態頻率
+        const contextOrder = this.getContextOrder(lastChar, buffer);
+        const contextRank = (c) => {
+            const rank = contextOrder.indexOf(c.char);
+            return rank === -1 ? contextOrder.length : rank;
+        };
         scoredCandidates.sort((a, b) => {
             if (a.isExact && !b.isExact) return -1;
             if (!a.isExact && b.isExact) return 1;
+            if (contextOrder && a.isExact && b.isExact) {
+                const aVip = a.score >= 1000000.0;
+                const bVip = b.score >= 1000000.0;
+                if (aVip !== bVip) return aVip ? -1 : 1;
+                const userDiff = this.userHistory.getScore(b.char) - this.userHistory.getScore(a.char);
+                if (userDiff !== 0) return userDiff;
+                const rankDiff = contextRank(a) - contextRank(b);
+                if (rankDiff !== 0) return rankDiff;
+            }
             return b.score - a.score;
         });
 
@@ -232,32 +274,44 @@ class PredictionEngine {
     /**
      * 輔助：找出以 buffer 開頭的所有字
      * [Update] 加入頻率過濾 (Frequency Filtering)
+     * [Update] 有補全索引時改為單次查表 (依頻率排序)，否則掃描 dayiMap
      */
     getExtendedCandidates(buffer) {
         if (!buffer || buffer.length === 0) return [];
         const extensions = [];
 
+        const addExtension = (char, code) => {
+            // [新增] 頻率過濾
+            const staticFreq = this.freqMap[char] || 0;
+            const userScore = this.userHistory.getScore(char);
+
+            // 如果是冷僻字 (頻率低) 且 用戶沒用過 (userScore == 0)，則跳過
+            if (staticFreq < FREQ_THRESHOLD && userScore === 0) {
+                return;
+            }
+
+            extensions.push({
+                char: char,
+                isExact: false,
+                code: code
+            });
+        };
+
+        if (this.completionIndex) {
+            const entries = this.completionIndex[buffer] || [];
+            for (const [char, code] of entries) {
+                addExtension(char, code);
+            }
+            return extensions;
+        }
+
         for (const key in this.dayiMap) {
             if (key.length > buffer.length && key.startsWith(buffer)) {
                 const raw = this.dayiMap[key];
                 const list = Array.isArray(raw) ? raw : [raw];
                 for (const item of list) {
                     const char = typeof item === 'object' ? item.char : item;
-
-                    // [新增] 頻率過濾
-                    const staticFreq = this.freqMap[char] || 0;
-                    const userScore = this.userHistory.getScore(char);
-
-                    // 如果是冷僻字 (頻率低) 且 用戶沒用過 (userScore == 0)，則跳過
-                    if (staticFreq < FREQ_THRESHOLD && userScore === 0) {
-                        continue;
-                    }
-
-                    extensions.push({
-                        char: char,
-                        isExact: false,
-                        code: key
-                    });
+                    addExtension(char, key);
                 }
             }
         }
@@ -1,68 +1,79 @@
-import json
+import argparse
 import os
+import sys
 
-def build_db():
-    cin_path = '/home/clarencechien/webdayi/mvp2-predictive/data/dayi4.cin'
-    freq_path = '/home/clarencechien/webdayi/mvp2-predictive/data/freq_map.json'
-    output_path = '/home/clarencechien/webdayi/mvp2-predictive/data/dayi_db.json'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'converter'))
+from cin_compiler import compile_cin_tables, reverse_index_path, write_dayi_db, write_reverse_index
+from code_ambiguity import ambiguity_index_path, build_ambiguity_index, write_ambiguity_index
+from completion_index import build_completion_index, completion_index_path, write_completion_index
+from context_candidates import build_context_table, context_table_path, load_bigram_scores, write_context_table
 
-    # Load Frequencies
-    print(f"Loading frequencies from {freq_path}...")
-    freq_map = {}
-    try:
-        with open(freq_path, 'r', encoding='utf-8') as f:
-            freq_map = json.load(f)
-    except Exception as e:
-        print(f"Warning: Could not load freq_map: {e}")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 
-    # Parse CIN
-    print(f"Parsing {cin_path}...")
-    db = {}
-    in_chardef = False
-    
-    with open(cin_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            if line == '%chardef begin':
-                in_chardef = True
-                continue
-            if line == '%chardef end':
-                in_chardef = False
-                continue
-            
-            if in_chardef:
-                # Format: code char
-                parts = line.split()
-                if len(parts) >= 2:
-                    code = parts[0]
-                    char = parts[1]
-                    
-                    if code not in db:
-                        db[code] = []
-                    
-                    # Check for duplicates
-                    if not any(c['char'] == char for c in db[code]):
-                        # Get freq (default to 0 if not found)
-                        freq = freq_map.get(char, 0)
-                        db[code].append({
-                            'char': char,
-                            'freq': freq
-                        })
 
-    # Sort candidates by frequency
-    print("Sorting candidates...")
-    for code in db:
-        db[code].sort(key=lambda x: x['freq'], reverse=True)
+def build_db(cin_path, freq_path, output_path, compact=False, completion_top_n=None, ngram_path=None,
+             reverse_index=False, ambiguity_index=False):
+    db, char_codes = compile_cin_tables(cin_path, freq_path, verbose=True)
 
     # Save
     print(f"Saving to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-    
+    write_dayi_db(db, output_path, compact=compact)
+
+    # Reverse index (char → codes, shortest first), from the same parse
+    if reverse_index:
+        char_codes_path = reverse_index_path(output_path)
+        write_reverse_index(char_codes, char_codes_path, compact=compact)
+        print(f"Saved reverse index to {char_codes_path} ({len(char_codes)} chars)")
+
+    # Ambiguity index (code → candidate count, unique codes) for the decoder
+    if ambiguity_index:
+        index_path = ambiguity_index_path(output_path)
+        index = build_ambiguity_index(db)
+        write_ambiguity_index(index, index_path)
+        print(f"Saved ambiguity index to {index_path} "
+              f"({index['stats']['unique_codes']} of {index['stats']['codes']} codes unique)")
+
+    # Completion index (prefix → ranked extensions) for PredictionEngine
+    completion_path = completion_index_path(output_path)
+    completion = build_completion_index(db, top_n=completion_top_n)
+    write_completion_index(completion, completion_path)
+    print(f"Saved completion index to {completion_path} "
+          f"({completion['stats']['prefixes']} prefixes, {completion['stats']['entries']} entries)")
+
+    # Context-conditioned candidate order (needs the bigram model)
+    if ngram_path and os.path.exists(ngram_path):
+        try:
+            bigram_counts = load_bigram_scores(ngram_path)
+        except ValueError as e:
+            print(f"Warning: {e}, skipping context table")
+        else:
+            context_path = context_table_path(output_path)
+            context = build_context_table(db, bigram_counts)
+            write_context_table(context, context_path)
+            print(f"Saved context table to {context_path} "
+                  f"({context['stats']['pairs']} pairs for {context['stats']['prev_chars']} previous chars)")
+    elif ngram_path:
+        print(f"Warning: {ngram_path} not found, skipping context table")
+
     print(f"Done. Total codes: {len(db)}")
 
+
 if __name__ == "__main__":
-    build_db()
+    parser = argparse.ArgumentParser(description='Build mvp2 dayi_db.json from dayi4.cin')
+    parser.add_argument('--cin', default=os.path.join(DATA_DIR, 'dayi4.cin'))
+    parser.add_argument('--freq-map', default=os.path.join(DATA_DIR, 'freq_map.json'))
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'dayi_db.json'))
+    parser.add_argument('--compact', action='store_true', help='Write compact JSON (no indentation)')
+    parser.add_argument('--completion-top-n', type=int,
+                        help='Keep at most N completion candidates per prefix (default: all)')
+    parser.add_argument('--ngram', default=os.path.join(DATA_DIR, 'ngram_pruned.json'),
+                        help='N-gram model for the context candidate table')
+    parser.add_argument('--reverse-index', action='store_true',
+                        help='Also write char_codes.json (char → codes) beside the output')
+    parser.add_argument('--ambiguity-index', action='store_true',
+                        help='Also write code_ambiguity.json (code → candidate count) beside the output')
+    args = parser.parse_args()
+
+    build_db(args.cin, args.freq_map, args.output, compact=args.compact,
+             completion_top_n=args.completion_top_n, ngram_path=args.ngram,
+             reverse_index=args.reverse_index, ambiguity_index=args.ambiguity_index)
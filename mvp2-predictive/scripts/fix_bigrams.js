@@ -9,7 +9,7 @@ const patches = {
     '不': { 'o': '知' }, // 不 -> 知 (or)
     '謝': { 'i': '謝' }, // 謝 -> 謝 (ii)
     '明': { 'e': '天' }, // 明 -> 天 (ev)
-    '台': { 'b': '北', 'x': '灣' }, // 台 -> 北 (bf), 台 -> 灣 (xb)
+    '台': { 'b': '北', 'o': '灣', 'x': '灣' }, // 台 -> 北 (bf), 台 -> 灣 (o, xb)
     '因': { 'b': '為' }, // 因 -> 為 (bi)
     '所': { 'h': '以' }, // 所 -> 以 (h.)
     '但': { 'd': '是' }, // 但 -> 是 (d)
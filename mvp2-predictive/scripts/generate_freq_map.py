@@ -1,27 +1,34 @@
-import json
+import argparse
 import os
+import sys
 
-def extract_freq_map():
-    input_path = '/home/clarencechien/webdayi/mvp2-predictive/data/ngram_pruned.json'
-    output_path = '/home/clarencechien/webdayi/mvp2-predictive/data/freq_map.json'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'converter'))
+from build_ngram_lib import write_freq_map
+from model_manifest import read_model_section
 
-    print(f"Reading from {input_path}...")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+def extract_freq_map(input_path, output_path, compact=False):
+    # New builds can write freq_map.json directly (build_ngram.py --freq-map);
+    # this extracts it from an existing model, streaming only the unigrams.
+    print(f"Reading unigrams from {input_path}...")
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if 'unigrams' in data:
-            unigrams = data['unigrams']
-            print(f"Found {len(unigrams)} unigrams.")
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(unigrams, f, ensure_ascii=False, indent=2)
-            print(f"Successfully wrote to {output_path}")
-        else:
-            print("Error: 'unigrams' key not found in input file.")
-            
-    except Exception as e:
-        print(f"An error occurred: {e}")
+        unigrams = read_model_section(input_path, 'unigrams')
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Found {len(unigrams)} unigrams.")
+    write_freq_map(unigrams, output_path, compact=compact)
+    print(f"Successfully wrote to {output_path}")
+
 
 if __name__ == "__main__":
-    extract_freq_map()
+    parser = argparse.ArgumentParser(description='Extract freq_map.json (unigram probabilities) from an N-gram model')
+    parser.add_argument('--input', default=os.path.join(DATA_DIR, 'ngram_pruned.json'))
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'freq_map.json'))
+    parser.add_argument('--compact', action='store_true', help='Write compact JSON (no indentation)')
+    args = parser.parse_args()
+
+    extract_freq_map(args.input, args.output, compact=args.compact)
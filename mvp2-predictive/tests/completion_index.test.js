@@ -0,0 +1,77 @@
+/**
+ * Completion Index Verification Script
+ * Checks that the precomputed completion_index.json (scripts/build_db.py)
+ * gives the same predictions as scanning dayi_db.json, for every prefix.
+ */
+const fs = require('fs');
+const path = require('path');
+
+const PredictionEngine = require('../js/prediction_engine.js');
+
+const dataDir = path.join(__dirname, '../data');
+const dayiMap = JSON.parse(fs.readFileSync(path.join(dataDir, 'dayi_db.json'), 'utf8'));
+const bigramData = JSON.parse(fs.readFileSync(path.join(dataDir, 'bigram_lite.json'), 'utf8'));
+const freqMap = JSON.parse(fs.readFileSync(path.join(dataDir, 'freq_map.json'), 'utf8'));
+const completionIndex = JSON.parse(fs.readFileSync(path.join(dataDir, 'completion_index.json'), 'utf8'));
+
+// A few rare chars the "user" has typed, so the user-history exception is covered
+const userChars = { '盟': 3, '晶': 1, '冂': 2 };
+const userHistory = { getScore: (char) => userChars[char] || 0 };
+
+function makeEngine(withIndex) {
+    const engine = new PredictionEngine({ bigramData, freqMap, userHistory });
+    engine.setDayiMap(dayiMap);
+    if (withIndex) engine.setCompletionIndex(completionIndex);
+    return engine;
+}
+
+const scanEngine = makeEngine(false);
+const indexEngine = makeEngine(true);
+
+let passed = 0;
+let failed = 0;
+
+function assert(condition, message) {
+    if (condition) {
+        passed++;
+    } else {
+        console.error(`✗ ${message}`);
+        failed++;
+    }
+}
+
+const key = (c) => `${c.char}:${c.code}`;
+
+// All 1-key prefixes, every 10th longer one, plus a buffer with no extensions
+// (the scan side costs ~5 ms per call, so the full 7k prefixes take minutes)
+const buffers = Object.keys(completionIndex.prefixes)
+    .filter((prefix, i) => prefix.length === 1 || i % 10 === 0)
+    .concat(['zzzz']);
+const contexts = [null, '明', '台'];
+
+for (const buffer of buffers) {
+    const scanned = scanEngine.getExtendedCandidates(buffer).map(key).sort();
+    const indexed = indexEngine.getExtendedCandidates(buffer).map(key).sort();
+    assert(JSON.stringify(scanned) === JSON.stringify(indexed),
+        `getExtendedCandidates('${buffer}') matches scan`);
+
+    for (const ctx of contexts) {
+        const a = scanEngine.getBestCompletion(buffer, ctx);
+        const b = indexEngine.getBestCompletion(buffer, ctx);
+        assert((a && a.score) === (b && b.score),
+            `getBestCompletion('${buffer}', ${ctx}) score matches scan`);
+    }
+}
+console.log(`✓ ${buffers.length} buffers checked against dayiMap scan`);
+
+// Rough timing (informational)
+const sample = buffers.slice(0, 2000);
+for (const [name, engine] of [['scan', scanEngine], ['index', indexEngine]]) {
+    const start = process.hrtime.bigint();
+    for (const buffer of sample) engine.getExtendedCandidates(buffer);
+    const ms = Number(process.hrtime.bigint() - start) / 1e6;
+    console.log(`  ${name}: ${(ms / sample.length).toFixed(3)} ms per lookup`);
+}
+
+console.log(`Total: ${passed + failed}, Passed: ${passed}, Failed: ${failed}`);
+if (failed > 0) process.exit(1);
@@ -267,6 +267,27 @@ async function runTests() {
 
     assert(suppressionTestNeutral === null, `Expected null (Suppressed by Ratio 8.0), got '${suppressionTestNeutral ? suppressionTestNeutral.char : 'null'}'`);
 
+    // Test 14: Context Candidate Table (offline bigram re-ranking of exact matches)
+    // 'b' -> "不" (0.01) > "北" (0.002) by static frequency.
+    // context_candidates.json says: after "相", code 'b' should offer "北" first.
+    engine.dayiMap['b'] = [{ char: "不" }, { char: "北" }];
+    engine.freqMap['不'] = 0.01;
+    engine.freqMap['北'] = 0.002;
+    engine.setContextTable({ table: { '相': { 'b': ['北'] } } });
+
+    const contextTop = engine.getCandidates('b', '相')[0];
+    assert(contextTop && contextTop.char === '北', `Expected '北' (Context Table), got '${contextTop ? contextTop.char : 'null'}'`);
+
+    // Fallback: no entry for this context -> static order
+    const staticTop = engine.getCandidates('b', '大')[0];
+    assert(staticTop && staticTop.char === '不', `Expected '不' (Static Fallback), got '${staticTop ? staticTop.char : 'null'}'`);
+
+    // User history still outranks the context order
+    mockHistory.getScore = (char) => char === '不' ? 1 : 0;
+    const userTop = engine.getCandidates('b', '相')[0];
+    assert(userTop && userTop.char === '不', `Expected '不' (User History > Context), got '${userTop ? userTop.char : 'null'}'`);
+    engine.setContextTable(null);
+
     console.log("All tests passed!");
     summary();
 }
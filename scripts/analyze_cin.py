@@ -1,33 +1,34 @@
+import argparse
+import os
+import sys
 
-import re
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(REPO_ROOT, 'converter'))
+from cin_compiler import iter_cin_entries
 
-cin_path = '/home/clarencechien/webdayi/lite/data/dayi4.cin'
-output_path = '/home/clarencechien/webdayi/lite/data/2code_words.txt'
+parser = argparse.ArgumentParser(description='Show CIN lines for target codes and export all 2-code words')
+parser.add_argument('--cin', default=os.path.join(REPO_ROOT, 'lite', 'data', 'dayi4.cin'))
+parser.add_argument('--output', default=os.path.join(REPO_ROOT, 'lite', 'data', '2code_words.txt'))
+parser.add_argument('--targets', nargs='+', default=['cz', 'v,', 'k.'])
+args = parser.parse_args()
 
-targets = ['cz', 'v,', 'k.']
+cin_path = args.cin
+output_path = args.output
+
+targets = args.targets
 target_lines = {}
 two_code_words = []
 
-with open(cin_path, 'r', encoding='utf-8') as f:
-    for line in f:
-        line = line.strip()
-        if not line or line.startswith('%'):
-            continue
-        
-        parts = line.split()
-        if len(parts) >= 2:
-            code = parts[0]
-            char = parts[1]
-            
-            # Check targets
-            if code in targets:
-                if code not in target_lines:
-                    target_lines[code] = []
-                target_lines[code].append(line)
-            
-            # Check 2-code words
-            if len(code) == 2:
-                two_code_words.append(f"{code} {char}")
+for _, code, char in iter_cin_entries(cin_path):
+    # Check targets
+    if code in targets:
+        if code not in target_lines:
+            target_lines[code] = []
+        target_lines[code].append(f"{code} {char}")
+
+    # Check 2-code words
+    if len(code) == 2:
+        two_code_words.append(f"{code} {char}")
 
 print("--- Target Lines Found ---")
 for code in targets:
@@ -1,11 +1,26 @@
+import argparse
+import os
+import sys
 
-cin_path = '/home/clarencechien/webdayi/lite/data/dayi4.cin'
-targets = ['oj']
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(REPO_ROOT, 'converter'))
+from cin_compiler import ReverseIndex, iter_cin_entries
 
-with open(cin_path, 'r', encoding='utf-8') as f:
-    for i, line in enumerate(f, 1):
-        line = line.strip()
-        if not line: continue
-        parts = line.split()
-        if len(parts) >= 1 and parts[0] in targets:
-            print(f"{i}: {line}")
+parser = argparse.ArgumentParser(description='Print CIN lines (with line numbers) for the given codes')
+parser.add_argument('targets', nargs='*', default=['oj'])
+parser.add_argument('--cin', default=os.path.join(REPO_ROOT, 'lite', 'data', 'dayi4.cin'))
+parser.add_argument('--chars', help='Instead, print the codes of each char in this text (reverse lookup)')
+parser.add_argument('--index', help='char_codes.json to use for --chars (default: build from --cin)')
+args = parser.parse_args()
+
+if args.chars:
+    index = ReverseIndex.from_file(args.index) if args.index else ReverseIndex.from_cin(args.cin)
+    for char, codes in index.lookup(args.chars):
+        print(f"{char}: {' '.join(codes) if codes else '(none)'}")
+    sys.exit(0)
+
+targets = set(args.targets)
+
+for i, code, char in iter_cin_entries(args.cin):
+    if code in targets:
+        print(f"{i}: {code} {char}")